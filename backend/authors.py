@@ -0,0 +1,67 @@
+"""
+Author snapshots for post and comment listings
+
+Listings only show an author's id, username and name, so instead of
+selectinloading whole User rows (password hash included) they look authors
+up here: an in-process LRU of id -> (username, name), filled with a single
+three-column query for the misses. A page whose authors are all cached costs
+no user query at all. Entries expire after AUTHOR_CACHE_TTL seconds, which
+bounds staleness across workers; the worker handling a rename drops its
+entry straight away.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable
+
+from sqlalchemy.orm import Session
+
+from .metrics import record_cache
+from .models import User
+
+AUTHOR_CACHE_SIZE = int(os.getenv("AUTHOR_CACHE_SIZE", "10000"))
+AUTHOR_CACHE_TTL = float(os.getenv("AUTHOR_CACHE_TTL", "300"))
+
+
+class AuthorCache:
+    def __init__(self, size: int = AUTHOR_CACHE_SIZE, ttl: float = AUTHOR_CACHE_TTL):
+        self.size = size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple[str, str, float]]" = OrderedDict()  # id -> (username, name, expires_at)
+
+    def get_many(self, db: Session, user_ids: Iterable[str]) -> Dict[str, dict]:
+        """{user_id: {"id", "username", "name"}} for every id that exists"""
+        wanted = set(user_ids)
+        authors = {}
+        now = time.monotonic()
+        with self._lock:
+            for user_id in wanted:
+                entry = self._entries.get(user_id)
+                if entry is not None and entry[2] > now:
+                    self._entries.move_to_end(user_id)
+                    authors[user_id] = {"id": user_id, "username": entry[0], "name": entry[1]}
+        missing = wanted - authors.keys()
+        for _ in authors:
+            record_cache("authors", True)
+        if missing:
+            rows = db.query(User.id, User.username, User.name).filter(User.id.in_(missing)).all()
+            expires_at = now + self.ttl
+            with self._lock:
+                for user_id, username, name in rows:
+                    self._entries[user_id] = (username, name, expires_at)
+                    self._entries.move_to_end(user_id)
+                    authors[user_id] = {"id": user_id, "username": username, "name": name}
+                while len(self._entries) > self.size:
+                    self._entries.popitem(last=False)
+            for _ in missing:
+                record_cache("authors", False)
+        return authors
+
+    def invalidate(self, user_id: str):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+
+author_cache = AuthorCache()
@@ -0,0 +1,99 @@
+"""
+Conversation context for multi-turn chat
+
+Recent turns are kept in a per-user ring buffer (LRU across users) that is
+filled from chat_messages on first use. The prompt receives the newest turns
+that fit a token budget, so neither the prompt nor the history query grows
+with the length of a user's chat history.
+"""
+import os
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Deque, List, Optional
+
+from sqlalchemy import desc
+from sqlalchemy.orm import Session
+
+from .metrics import record_cache
+from .models import ChatMessage
+
+CHAT_CONTEXT_ENABLED = os.getenv("CHAT_CONTEXT_ENABLED", "true").lower() == "true"
+CHAT_CONTEXT_TURNS = int(os.getenv("CHAT_CONTEXT_TURNS", "12"))
+CHAT_CONTEXT_TOKENS = int(os.getenv("CHAT_CONTEXT_TOKENS", "1200"))
+CHAT_CONTEXT_USERS = int(os.getenv("CHAT_CONTEXT_USERS", "10000"))
+
+
+@dataclass(frozen=True)
+class Turn:
+    content: str
+    is_ai_response: bool
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English/Devanagari mixes)"""
+    return max(1, len(text) // 4)
+
+
+def build_window(turns: List[Turn], budget_tokens: int = CHAT_CONTEXT_TOKENS) -> List[Turn]:
+    """Newest turns that fit the token budget, in chronological order"""
+    window: List[Turn] = []
+    used = 0
+    for turn in reversed(turns):
+        cost = estimate_tokens(turn.content)
+        if used + cost > budget_tokens:
+            break
+        window.append(turn)
+        used += cost
+    window.reverse()
+    return window
+
+
+class ConversationStore:
+    def __init__(self, max_turns: int = CHAT_CONTEXT_TURNS, max_users: int = CHAT_CONTEXT_USERS):
+        self.max_turns = max_turns
+        self.max_users = max_users
+        self._buffers: "OrderedDict[str, Deque[Turn]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _load(self, db: Session, user_id: str) -> Deque[Turn]:
+        rows = db.query(ChatMessage.content, ChatMessage.is_ai_response).filter(
+            ChatMessage.user_id == user_id
+        ).order_by(desc(ChatMessage.created_at), desc(ChatMessage.id)).limit(self.max_turns).all()
+        return deque((Turn(content, is_ai) for content, is_ai in reversed(rows)), maxlen=self.max_turns)
+
+    def recent(self, db: Session, user_id: str) -> List[Turn]:
+        with self._lock:
+            buffer = self._buffers.get(user_id)
+            if buffer is not None:
+                self._buffers.move_to_end(user_id)
+                record_cache("chat_context", True)
+                return list(buffer)
+        record_cache("chat_context", False)
+        buffer = self._load(db, user_id)
+        with self._lock:
+            self._buffers[user_id] = buffer
+            self._buffers.move_to_end(user_id)
+            while len(self._buffers) > self.max_users:
+                self._buffers.popitem(last=False)
+            return list(buffer)
+
+    def window(self, db: Session, user_id: str, budget_tokens: int = CHAT_CONTEXT_TOKENS) -> List[Turn]:
+        return build_window(self.recent(db, user_id), budget_tokens)
+
+    def append(self, user_id: str, *turns: Turn):
+        """Record new turns; a user whose buffer was evicted reloads from the DB next time"""
+        with self._lock:
+            buffer = self._buffers.get(user_id)
+            if buffer is not None:
+                buffer.extend(turns)
+
+    def invalidate(self, user_id: Optional[str] = None):
+        with self._lock:
+            if user_id is None:
+                self._buffers.clear()
+            else:
+                self._buffers.pop(user_id, None)
+
+
+conversations = ConversationStore()
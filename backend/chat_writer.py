@@ -0,0 +1,295 @@
+"""
+Write-behind persistence for chat messages
+
+The chat route builds both message rows in memory (ids and timestamps are
+assigned up front) and hands them to a background writer, which inserts
+queued rows in batched transactions. Rows are appended to a local journal
+before the response returns and replayed idempotently on the next start, so
+messages survive a crash as well as a normal shutdown (which drains the
+queue). Each worker process journals to its own file; journals left by
+processes that are no longer running are replayed at startup. Readers that
+need a user's latest messages call wait_for_user first.
+
+Set CHAT_WRITE_BEHIND=false to write both rows synchronously in a single
+transaction instead.
+"""
+import asyncio
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Deque, Dict, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .metrics import REGISTRY, Counter, Gauge
+from .models import ChatMessage, generate_uuid
+
+CHAT_WRITE_BEHIND = os.getenv("CHAT_WRITE_BEHIND", "true").lower() == "true"
+CHAT_WRITE_BATCH_SIZE = int(os.getenv("CHAT_WRITE_BATCH_SIZE", "200"))
+CHAT_WRITE_FLUSH_SECONDS = float(os.getenv("CHAT_WRITE_FLUSH_SECONDS", "0.05"))
+CHAT_WRITE_JOURNAL_DIR = os.getenv("CHAT_WRITE_JOURNAL_DIR", str(Path(__file__).parent.parent / "data" / "chat_journal"))
+CHAT_WRITE_FSYNC = os.getenv("CHAT_WRITE_FSYNC", "false").lower() == "true"
+CHAT_READ_WAIT_SECONDS = float(os.getenv("CHAT_READ_WAIT_SECONDS", "2"))
+
+chat_write_queue_depth = REGISTRY.register(Gauge(
+    "saarthi_chat_write_queue_depth", "Chat messages waiting for the background writer", ()))
+chat_write_rows_total = REGISTRY.register(Counter(
+    "saarthi_chat_write_rows_total", "Chat messages handled by the background writer by outcome",
+    ("outcome",)))
+
+_COLUMNS = ("id", "content", "user_id", "is_ai_response", "created_at")
+
+
+def utcnow() -> datetime:
+    """Naive UTC, matching what the database's now() default stores"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def new_chat_message(user_id: str, content: str, is_ai_response: bool) -> ChatMessage:
+    """A transient ChatMessage with id and created_at assigned, ready to return before it is stored"""
+    return ChatMessage(
+        id=generate_uuid(),
+        content=content,
+        user_id=user_id,
+        is_ai_response=is_ai_response,
+        created_at=utcnow(),
+    )
+
+
+def _row(message: ChatMessage) -> dict:
+    return {column: getattr(message, column) for column in _COLUMNS}
+
+
+def _encode(row: dict) -> str:
+    return json.dumps({**row, "created_at": row["created_at"].isoformat()}, ensure_ascii=False)
+
+
+def _decode(line: str) -> dict:
+    row = json.loads(line)
+    row["created_at"] = datetime.fromisoformat(row["created_at"])
+    return row
+
+
+class ChatMessageWriter:
+    def __init__(self, journal_dir: Optional[str] = CHAT_WRITE_JOURNAL_DIR,
+                 batch_size: int = CHAT_WRITE_BATCH_SIZE, flush_interval: float = CHAT_WRITE_FLUSH_SECONDS):
+        self.journal_dir = Path(journal_dir) if journal_dir else None
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.session_factory = None
+        self._queue: Deque[dict] = deque()
+        self._pending_users: Dict[str, int] = {}
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._journal = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # ---------------------------------------------------------------- lifecycle
+
+    def start(self, session_factory):
+        if self.running:
+            return
+        self.session_factory = session_factory
+        if self.journal_dir is not None:
+            self.journal_dir.mkdir(parents=True, exist_ok=True)
+            self._replay_journals()
+            self._journal = open(self.journal_dir / f"{os.getpid()}.ndjson", "a", encoding="utf-8")
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="chat-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self, timeout: float = 30.0):
+        """Drain the queue and stop the writer (called on shutdown)"""
+        if not self.running:
+            return
+        self._stop.set()
+        with self._changed:
+            self._changed.notify_all()
+        self._thread.join(timeout)
+        with self._changed:
+            pending = len(self._queue) + self._in_flight
+            if pending:
+                print(f"Chat writer stopped with {pending} messages left in the journal for replay")
+            if self._journal is not None:
+                self._journal.close()
+                # Keep the journal while a batch may still be mid-write; the next start replays it
+                if not self._thread.is_alive() and not pending:
+                    os.unlink(self._journal.name)
+                self._journal = None
+
+    def _replay_journals(self):
+        for path in sorted(self.journal_dir.iterdir()):
+            # <pid>.ndjson is a worker's journal, <pid>.replay-<pid> one claimed for replay
+            owner = path.suffix.rpartition("-")[2] if path.suffix.startswith(".replay-") else path.stem
+            if path.suffix != ".ndjson" and not path.suffix.startswith(".replay-"):
+                continue
+            if owner.isdigit() and int(owner) != os.getpid() and _process_alive(int(owner)):
+                continue  # in use by another live worker
+            claimed = path.with_suffix(f".replay-{os.getpid()}")
+            try:
+                os.replace(path, claimed)  # claim it so concurrent workers don't replay it twice
+            except FileNotFoundError:
+                continue
+            self._replay(claimed)
+
+    def _replay(self, path: Path):
+        """Insert journaled rows that never reached the database (idempotent by id)"""
+        rows = []
+        with open(path, encoding="utf-8") as handle:
+            for line in handle:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    rows.append(_decode(line))
+                except (ValueError, KeyError):
+                    print("Skipping unreadable chat journal line")  # torn write from a crash
+        if rows:
+            db = self.session_factory()
+            try:
+                existing = {row_id for (row_id,) in db.query(ChatMessage.id).filter(
+                    ChatMessage.id.in_([row["id"] for row in rows])
+                ).all()}
+                missing = [row for row in rows if row["id"] not in existing]
+                if missing:
+                    self._insert(db, missing)
+                print(f"Chat journal replayed: {len(missing)} of {len(rows)} messages restored")
+            finally:
+                db.close()
+        path.unlink()
+
+    # ------------------------------------------------------------------- write
+
+    def save(self, db: Session, *messages: ChatMessage):
+        """Persist messages: queue them for the writer, or insert them in one transaction if it is not running"""
+        rows = [_row(message) for message in messages]
+        if not (CHAT_WRITE_BEHIND and self.running):
+            db.bulk_insert_mappings(ChatMessage, rows)
+            db.commit()
+            return
+        with self._changed:
+            if self._journal is not None:
+                self._journal.write("".join(_encode(row) + "\n" for row in rows))
+                self._journal.flush()
+                if CHAT_WRITE_FSYNC:
+                    os.fsync(self._journal.fileno())
+            self._queue.extend(rows)
+            for row in rows:
+                self._pending_users[row["user_id"]] = self._pending_users.get(row["user_id"], 0) + 1
+            chat_write_queue_depth.set(len(self._queue))
+            if len(self._queue) >= self.batch_size:
+                self._changed.notify_all()
+
+    def has_pending(self, user_id: Optional[str] = None) -> bool:
+        if user_id is None:
+            return bool(self._queue) or self._in_flight > 0
+        return self._pending_users.get(user_id, 0) > 0
+
+    def wait_for_user(self, user_id: Optional[str] = None, timeout: float = CHAT_READ_WAIT_SECONDS) -> bool:
+        """Block until the user's (or everyone's) queued messages are stored; False on timeout"""
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            self._changed.notify_all()  # flush now rather than at the next interval
+            while self.has_pending(user_id):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._changed.wait(remaining)
+        return True
+
+    async def wait_for_user_async(self, user_id: Optional[str] = None) -> bool:
+        if not self.has_pending(user_id):
+            return True
+        return await asyncio.to_thread(self.wait_for_user, user_id)
+
+    # ------------------------------------------------------------------ writer
+
+    def _run(self):
+        backoff = self.flush_interval
+        while True:
+            with self._changed:
+                if not self._queue and not self._stop.is_set():
+                    self._changed.wait(self.flush_interval)
+                if not self._queue:
+                    if self._stop.is_set():
+                        return
+                    continue
+                batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+                self._in_flight = len(batch)
+            try:
+                self._write(batch)
+                backoff = self.flush_interval
+            except Exception as error:
+                print(f"Chat writer error, will retry {len(batch)} messages: {error}")
+                chat_write_rows_total.inc(len(batch), outcome="retried")
+                with self._changed:
+                    self._queue.extendleft(reversed(batch))
+                    self._in_flight = 0
+                if self._stop.wait(backoff):
+                    return  # shutting down with the database unavailable: the journal keeps the rows
+                backoff = min(backoff * 2, 5.0)
+                continue
+            with self._changed:
+                self._in_flight = 0
+                for row in batch:
+                    count = self._pending_users.get(row["user_id"], 0) - 1
+                    if count > 0:
+                        self._pending_users[row["user_id"]] = count
+                    else:
+                        self._pending_users.pop(row["user_id"], None)
+                if not self._queue and self._journal is not None:
+                    self._journal.truncate(0)  # everything journaled so far is stored
+                chat_write_queue_depth.set(len(self._queue))
+                self._changed.notify_all()
+
+    def _write(self, batch: List[dict]):
+        db = self.session_factory()
+        try:
+            self._insert(db, batch)
+        finally:
+            db.close()
+
+    def _insert(self, db: Session, rows: List[dict]):
+        try:
+            db.bulk_insert_mappings(ChatMessage, rows)
+            db.commit()
+            chat_write_rows_total.inc(len(rows), outcome="stored")
+            return
+        except IntegrityError:
+            db.rollback()
+        # One bad row (e.g. its user was deleted meanwhile) must not block the rest of the batch
+        for row in rows:
+            try:
+                db.bulk_insert_mappings(ChatMessage, [row])
+                db.commit()
+                chat_write_rows_total.inc(outcome="stored")
+            except IntegrityError as error:
+                db.rollback()
+                chat_write_rows_total.inc(outcome="dropped")
+                print(f"Dropping chat message {row['id']}: {error.orig}")
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+chat_writer = ChatMessageWriter()
@@ -0,0 +1,207 @@
+"""
+Precomputed daily wisdom
+
+A background job keeps a pool of LLM-generated thoughts of the day scheduled
+ahead (one per target_date) in thoughts_of_the_day, generating during
+off-peak hours or whenever the pool runs low. The current thought is cached
+per day, so serving daily content never waits on the LLM or a rotation write.
+
+Every worker runs the job, so a day is reserved before its thought is
+generated: an inactive, empty row that the unique index on
+(category, target_date) lets only one worker insert. The others stop at the
+first day already claimed, so each day costs one LLM call. Reservations left
+by a worker that died mid-generation are released after
+DAILY_WISDOM_RESERVATION_MINUTES.
+"""
+import os
+import threading
+from datetime import date, datetime, timedelta
+from typing import Callable, Optional, Tuple
+
+from sqlalchemy import and_, func
+from sqlalchemy.exc import IntegrityError
+
+from .metrics import record_cache
+from .models import ThoughtOfTheDay
+
+DAILY_WISDOM_ENABLED = os.getenv("DAILY_WISDOM_ENABLED", "true").lower() == "true"
+DAILY_WISDOM_POOL_DAYS = int(os.getenv("DAILY_WISDOM_POOL_DAYS", "14"))
+DAILY_WISDOM_LOW_WATERMARK = int(os.getenv("DAILY_WISDOM_LOW_WATERMARK", "3"))
+DAILY_WISDOM_OFF_PEAK_HOURS = os.getenv("DAILY_WISDOM_OFF_PEAK_HOURS", "2-5")  # local hours, inclusive
+DAILY_WISDOM_CHECK_SECONDS = float(os.getenv("DAILY_WISDOM_CHECK_SECONDS", "1800"))
+DAILY_THOUGHT_CACHE_SECONDS = float(os.getenv("DAILY_THOUGHT_CACHE_SECONDS", "300"))
+DAILY_WISDOM_RESERVATION_MINUTES = float(os.getenv("DAILY_WISDOM_RESERVATION_MINUTES", "30"))
+GENERATED_CATEGORY = "daily_wisdom"
+GENERATED_AUTHOR = "Saarthi"
+
+
+def parse_hours(spec: str) -> Tuple[int, int]:
+    start, _, end = spec.partition("-")
+    return int(start), int(end or start)
+
+
+def is_off_peak(hour: int, spec: str = DAILY_WISDOM_OFF_PEAK_HOURS) -> bool:
+    start, end = parse_hours(spec)
+    if start <= end:
+        return start <= hour <= end
+    return hour >= start or hour <= end  # window wraps midnight, e.g. "23-4"
+
+
+def pending_days(db, today: date) -> Tuple[int, Optional[date]]:
+    """(number of days from today on that have a generated thought or a reservation, last such date)"""
+    count, last = db.query(func.count(ThoughtOfTheDay.id), func.max(ThoughtOfTheDay.target_date)).filter(
+        and_(
+            ThoughtOfTheDay.category == GENERATED_CATEGORY,
+            ThoughtOfTheDay.target_date >= today
+        )
+    ).one()
+    return count or 0, last
+
+
+def ensure_unique_days(session_factory):
+    """Create the one-thought-per-day index on databases created before it existed"""
+    index = next(index for index in ThoughtOfTheDay.__table__.indexes if index.name == "ux_thoughts_generated_date")
+    db = session_factory()
+    try:
+        index.create(bind=db.get_bind(), checkfirst=True)
+    except Exception as error:
+        print(f"Warning: could not create {index.name} (duplicate generated thoughts for a day?): {error}")
+    finally:
+        db.close()
+
+
+def release_stale_reservations(db):
+    cutoff = datetime.utcnow() - timedelta(minutes=DAILY_WISDOM_RESERVATION_MINUTES)
+    db.query(ThoughtOfTheDay).filter(
+        and_(
+            ThoughtOfTheDay.category == GENERATED_CATEGORY,
+            ThoughtOfTheDay.is_active == False,
+            ThoughtOfTheDay.content == "",
+            ThoughtOfTheDay.created_at < cutoff
+        )
+    ).delete(synchronize_session=False)
+    db.commit()
+
+
+def reserve_day(db, target_date: date) -> Optional[ThoughtOfTheDay]:
+    """Claim a day with an inactive placeholder row; None if another worker already has it"""
+    reservation = ThoughtOfTheDay(
+        content="",
+        author=GENERATED_AUTHOR,
+        category=GENERATED_CATEGORY,
+        target_date=target_date,
+        is_active=False,
+        is_featured=False,
+    )
+    db.add(reservation)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return None
+    return reservation
+
+
+def refill_pool(session_factory, generate: Callable[[], Optional[str]], pool_days: int = DAILY_WISDOM_POOL_DAYS) -> int:
+    """Generate thoughts for the unscheduled days in the pool window; returns how many were stored"""
+    today = date.today()
+    db = session_factory()
+    try:
+        release_stale_reservations(db)
+        pending, last = pending_days(db, today)
+        next_date = max(today, last + timedelta(days=1)) if last else today
+        stored = 0
+        for _ in range(max(0, pool_days - pending)):
+            reservation = reserve_day(db, next_date)
+            if reservation is None:
+                break  # another worker is filling the pool from this day on
+            content = generate()
+            if not content:
+                db.delete(reservation)
+                db.commit()
+                break  # LLM unavailable: try again on the next run
+            reservation.content = content.strip()
+            reservation.is_active = True
+            db.commit()  # commit per item so a failure later keeps what was generated
+            next_date += timedelta(days=1)
+            stored += 1
+        return stored
+    finally:
+        db.close()
+
+
+class DailyWisdomJob:
+    """Background thread that keeps the daily wisdom pool filled"""
+
+    def __init__(self, session_factory, generate: Callable[[], Optional[str]],
+                 interval: float = DAILY_WISDOM_CHECK_SECONDS):
+        self.session_factory = session_factory
+        self.generate = generate
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self, force: bool = False) -> int:
+        db = self.session_factory()
+        try:
+            pending, _ = pending_days(db, date.today())
+        finally:
+            db.close()
+        if not force and pending >= DAILY_WISDOM_LOW_WATERMARK and not is_off_peak(datetime.now().hour):
+            return 0
+        stored = refill_pool(self.session_factory, self.generate)
+        if stored:
+            print(f"Daily wisdom pool: generated {stored} thoughts")
+        return stored
+
+    def _run(self):
+        ensure_unique_days(self.session_factory)
+        while True:
+            try:
+                self.run_once()
+            except Exception as error:
+                print(f"Daily wisdom job failed: {error}")
+            if self._stop.wait(self.interval):
+                return
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="daily-wisdom", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+class DailyThoughtCache:
+    """Today's thought payload, shared by all requests until the date changes or an admin edits thoughts"""
+
+    def __init__(self, ttl: float = DAILY_THOUGHT_CACHE_SECONDS):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entry = None  # (date, payload, expires_at)
+        self._generation = 0
+
+    def get(self, today: date):
+        with self._lock:
+            entry = self._entry
+        hit = entry is not None and entry[0] == today and entry[2] > datetime.now().timestamp()
+        record_cache("thought_of_the_day", hit)
+        return entry[1] if hit else None
+
+    def generation(self) -> int:
+        return self._generation
+
+    def set(self, today: date, payload, generation: int):
+        with self._lock:
+            if generation == self._generation:
+                self._entry = (today, payload, datetime.now().timestamp() + self.ttl)
+
+    def invalidate(self):
+        with self._lock:
+            self._entry = None
+            self._generation += 1
+
+
+daily_thoughts = DailyThoughtCache()
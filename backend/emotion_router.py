@@ -0,0 +1,234 @@
+"""
+Route feeling-style chat messages to Krishna Path verses without an LLM call
+
+A small keyword classifier maps messages like "I feel so alone" onto the
+Emotion rows (lonely, anxious, angry, ...). When it is confident, chat answers
+with a verse for that emotion from an in-memory cache instead of waiting on
+Gemini. Questions, long messages and ambiguous matches still go to the LLM.
+"""
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+from .metrics import REGISTRY, Counter, record_cache
+from .models import Emotion, Verse
+from .verse_index import fold
+
+CHAT_EMOTION_ROUTING = os.getenv("CHAT_EMOTION_ROUTING", "true").lower() == "true"
+CHAT_EMOTION_MIN_CONFIDENCE = float(os.getenv("CHAT_EMOTION_MIN_CONFIDENCE", "0.6"))
+CHAT_EMOTION_MAX_WORDS = int(os.getenv("CHAT_EMOTION_MAX_WORDS", "25"))
+EMOTION_VERSE_CACHE_TTL = float(os.getenv("EMOTION_VERSE_CACHE_TTL", "300"))
+
+chat_routes_total = REGISTRY.register(Counter(
+    "saarthi_chat_routes_total", "Chat replies by route (emotion verse or LLM)",
+    ("route",)))
+
+# Keywords per seeded emotion name; admin-created emotions match on their own name
+LEXICON: Dict[str, Dict[str, float]] = {
+    "happy": dict.fromkeys("happy happiness joy joyful glad grateful thankful excited blessed cheerful "
+                           "delighted wonderful".split(), 1.0),
+    "peace": dict.fromkeys("peace peaceful calm serene tranquil relaxed centered centred".split(), 1.0),
+    "anxious": dict.fromkeys("anxious anxiety worried worry nervous afraid scared fear panic panicking "
+                             "stressed stress overwhelmed tense uneasy restless dread".split(), 1.0),
+    "angry": dict.fromkeys("angry anger furious mad irritated annoyed rage frustrated frustration "
+                           "resentful resentment hate livid".split(), 1.0),
+    "sad": dict.fromkeys("sad sadness depressed depression unhappy heartbroken grief grieving miserable "
+                         "hopeless crying cry tears hurt broken empty".split(), 1.0),
+    "protection": dict.fromkeys("protect protection unsafe danger threatened vulnerable helpless "
+                                "insecure defenseless attacked".split(), 1.0),
+    "lazy": dict.fromkeys("lazy laziness unmotivated procrastinating procrastinate lethargic sluggish "
+                          "bored unproductive".split(), 1.0),
+    "lonely": dict.fromkeys("lonely loneliness alone isolated abandoned unloved friendless ignored "
+                            "nobody excluded".split(), 1.0),
+}
+
+_WORD = re.compile(r"[a-z']+")
+NEGATIONS = frozenset("not no never don't dont isn't isnt wasn't wasnt aren't arent can't cant won't "
+                      "wont without hardly".split())
+NEGATION_WINDOW = 3
+# First-person feeling cues; short messages ("so alone") count as feelings on their own
+FEELING_CUES = frozenset("feel feeling feels felt i'm im am being getting so very really".split())
+SHORT_MESSAGE_WORDS = 6
+
+
+@dataclass(frozen=True)
+class EmotionMatch:
+    name: str
+    confidence: float
+
+
+def _folded_lexicon(lexicon: Dict[str, Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+    folded: Dict[str, Dict[str, float]] = {}
+    for emotion, words in lexicon.items():
+        for word, weight in words.items():
+            folded.setdefault(fold(word), {})[emotion] = weight
+    return folded
+
+
+_FOLDED_LEXICON = _folded_lexicon(LEXICON)
+
+
+def classify(text: str, keywords: Optional[Dict[str, Dict[str, float]]] = None,
+             min_confidence: float = CHAT_EMOTION_MIN_CONFIDENCE, feelings_only: bool = True) -> Optional[EmotionMatch]:
+    """Emotion name for a feeling-style message, or None if it is not one / not confident"""
+    keywords = _FOLDED_LEXICON if keywords is None else keywords
+    words = _WORD.findall(text.lower())
+    if feelings_only:
+        if "?" in text or not words or len(words) > CHAT_EMOTION_MAX_WORDS:
+            return None
+        if len(words) > SHORT_MESSAGE_WORDS and not FEELING_CUES.intersection(words):
+            return None
+
+    scores: Dict[str, float] = {}
+    negated_until = -1
+    for position, word in enumerate(words):
+        if word in NEGATIONS:
+            negated_until = position + NEGATION_WINDOW
+            continue
+        if position <= negated_until:
+            continue
+        for emotion, weight in keywords.get(fold(word), {}).items():
+            scores[emotion] = scores.get(emotion, 0.0) + weight
+    if not scores:
+        return None
+    name, top = max(scores.items(), key=lambda item: item[1])
+    confidence = top / sum(scores.values())
+    if confidence < min_confidence:
+        return None
+    return EmotionMatch(name, confidence)
+
+
+@dataclass(frozen=True)
+class CachedVerse:
+    id: str
+    chapter: Optional[str]
+    verse_number: Optional[str]
+    english: str
+    explanation: str
+
+
+@dataclass(frozen=True)
+class CachedEmotion:
+    id: str
+    name: str
+    display_name: str
+    verses: List[CachedVerse]
+
+
+class EmotionVerseCache:
+    """Active emotions and their active verses, loaded in two queries and refreshed on admin edits"""
+
+    def __init__(self, ttl: float = EMOTION_VERSE_CACHE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._emotions: Optional[Dict[str, CachedEmotion]] = None
+        self._keywords: Dict[str, Dict[str, float]] = _FOLDED_LEXICON
+        self._loaded_at = 0.0
+        self._generation = 0
+
+    def _load(self, db: Session):
+        emotions = db.query(Emotion.id, Emotion.name, Emotion.display_name).filter(Emotion.is_active == True).all()
+        verses: Dict[str, List[CachedVerse]] = {}
+        for row in db.query(
+            Verse.emotion_id, Verse.id, Verse.chapter, Verse.verse_number, Verse.english, Verse.explanation
+        ).filter(Verse.is_active == True).order_by(Verse.id).all():  # stable order for verse_sequence
+            verses.setdefault(row.emotion_id, []).append(
+                CachedVerse(row.id, row.chapter, row.verse_number, row.english, row.explanation))
+        cached = {
+            name: CachedEmotion(emotion_id, name, display_name, verses.get(emotion_id, []))
+            for emotion_id, name, display_name in emotions
+        }
+        lexicon = {name: dict(LEXICON.get(name, {})) for name in cached}
+        for entry in cached.values():
+            for word in _WORD.findall(f"{entry.name} {entry.display_name}".lower()):
+                lexicon[entry.name].setdefault(word, 1.0)
+        return cached, _folded_lexicon(lexicon)
+
+    def emotions(self, db: Session) -> Dict[str, CachedEmotion]:
+        with self._lock:
+            if self._emotions is not None and time.monotonic() - self._loaded_at < self.ttl:
+                record_cache("emotion_verses", True)
+                return self._emotions
+            generation = self._generation
+        record_cache("emotion_verses", False)
+        emotions, keywords = self._load(db)
+        with self._lock:
+            # An admin edit during the load means this snapshot may already be stale
+            if generation == self._generation:
+                self._emotions, self._keywords = emotions, keywords
+                self._loaded_at = time.monotonic()
+        return emotions
+
+    @property
+    def keywords(self) -> Dict[str, Dict[str, float]]:
+        """Folded keyword table for the emotions loaded by the last emotions() call"""
+        return self._keywords
+
+    def invalidate(self):
+        with self._lock:
+            self._emotions = None
+            self._generation += 1
+
+
+emotion_verses = EmotionVerseCache()
+
+
+@dataclass(frozen=True)
+class RoutedReply:
+    emotion: Optional[CachedEmotion]
+    verse: CachedVerse
+    content: str
+
+
+def format_verse_reply(emotion: CachedEmotion, verse: CachedVerse) -> str:
+    reference = f" {verse.chapter}:{verse.verse_number}" if verse.chapter and verse.verse_number else ""
+    return (
+        f"It sounds like you are feeling {emotion.display_name.lower()}. "
+        f"Krishna offers this in the Bhagavad Geeta{reference}: \"{verse.english}\"\n\n{verse.explanation}"
+    )
+
+
+def route_message(db: Session, text: str) -> Optional[RoutedReply]:
+    """A cached verse reply for a confidently classified feeling, or None to use the LLM"""
+    if not CHAT_EMOTION_ROUTING:
+        return None
+    emotions = emotion_verses.emotions(db)
+    match = classify(text, emotion_verses.keywords)
+    emotion = emotions.get(match.name) if match else None
+    if emotion is None or not emotion.verses:
+        chat_routes_total.inc(route="llm")
+        return None
+    chat_routes_total.inc(route="emotion")
+    verse = random.choice(emotion.verses)
+    return RoutedReply(emotion, verse, format_verse_reply(emotion, verse))
+
+
+def format_fallback_reply(verse) -> str:
+    reference = f" {verse.chapter}:{verse.verse_number}" if verse.chapter and verse.verse_number else ""
+    return (
+        "I can't give you a full answer right now, but these words of Krishna from the "
+        f"Bhagavad Geeta{reference} may help: \"{verse.english}\"\n\n{verse.explanation}"
+    )
+
+
+def fallback_reply(db: Session, text: str, candidates: Sequence = ()) -> Optional[RoutedReply]:
+    """A verse to answer with when the LLM is unavailable: best retrieved verse, else the closest emotion's"""
+    chat_routes_total.inc(route="fallback")
+    if candidates:
+        return RoutedReply(None, candidates[0], format_fallback_reply(candidates[0]))
+    emotions = emotion_verses.emotions(db)
+    match = classify(text, emotion_verses.keywords, min_confidence=0.0, feelings_only=False)
+    emotion = emotions.get(match.name) if match else None
+    if emotion is None or not emotion.verses:
+        with_verses = [entry for entry in emotions.values() if entry.verses]
+        if not with_verses:
+            return None
+        emotion = random.choice(with_verses)
+    verse = random.choice(emotion.verses)
+    return RoutedReply(emotion, verse, format_fallback_reply(verse))
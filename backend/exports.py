@@ -0,0 +1,109 @@
+"""
+Streaming admin exports
+
+Rows are read with a server-side cursor (stream_results + yield_per) as plain
+column tuples, never ORM objects, and written out as NDJSON or CSV in chunks,
+so memory stays flat however large the export is.
+"""
+import csv
+import io
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Iterator, Optional, Sequence
+
+from sqlalchemy import select
+
+from .models import ChatMessage, Emotion, Interaction, JournalEntry, User
+from .responses import dumps
+
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", "1000"))
+EXPORT_CHUNK_BYTES = 64 * 1024
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+
+@dataclass(frozen=True)
+class ExportSpec:
+    columns: Callable[[], Sequence]  # labelled columns, in output order
+    model: type
+    user_column: Callable[[], object]
+    joins: Callable[[object], object] = lambda statement: statement
+
+
+EXPORTS = {
+    "chat_messages": ExportSpec(
+        columns=lambda: (ChatMessage.id, ChatMessage.user_id, User.username.label("username"),
+                         ChatMessage.is_ai_response, ChatMessage.content, ChatMessage.created_at),
+        model=ChatMessage,
+        user_column=lambda: ChatMessage.user_id,
+        joins=lambda statement: statement.join(User, User.id == ChatMessage.user_id),
+    ),
+    "journal_entries": ExportSpec(
+        columns=lambda: (JournalEntry.id, JournalEntry.author_id, User.username.label("username"),
+                         JournalEntry.title, JournalEntry.mood, JournalEntry.content, JournalEntry.created_at),
+        model=JournalEntry,
+        user_column=lambda: JournalEntry.author_id,
+        joins=lambda statement: statement.join(User, User.id == JournalEntry.author_id),
+    ),
+    "interactions": ExportSpec(
+        columns=lambda: (Interaction.id, Interaction.user_id, Interaction.session_id,
+                         Emotion.name.label("emotion"), Interaction.verse_id, Interaction.ip_address,
+                         Interaction.user_agent, Interaction.created_at),
+        model=Interaction,
+        user_column=lambda: Interaction.user_id,
+        joins=lambda statement: statement.join(Emotion, Emotion.id == Interaction.emotion_id),
+    ),
+}
+
+
+def build_statement(spec: ExportSpec, start: Optional[datetime], end: Optional[datetime], user_id: Optional[str]):
+    statement = spec.joins(select(*spec.columns()).select_from(spec.model))
+    created_at = spec.model.created_at
+    if start is not None:
+        statement = statement.where(created_at >= start)
+    if end is not None:
+        statement = statement.where(created_at < end)
+    if user_id:
+        statement = statement.where(spec.user_column() == user_id)
+    return statement.order_by(created_at, spec.model.id).execution_options(
+        stream_results=True, yield_per=EXPORT_BATCH_ROWS
+    )
+
+
+def _ndjson_lines(keys: Sequence[str], rows) -> Iterator[bytes]:
+    for row in rows:
+        yield dumps(dict(zip(keys, row))) + b"\n"
+
+
+def _csv_lines(keys: Sequence[str], rows) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(keys)
+    for row in rows:
+        writer.writerow([value.isoformat() if isinstance(value, datetime) else value for value in row])
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")  # header only: no rows matched
+
+
+def stream_export(session_factory, dataset: str, export_format: str, start: Optional[datetime] = None,
+                  end: Optional[datetime] = None, user_id: Optional[str] = None) -> Iterator[bytes]:
+    """Yield the export body in ~64 KiB chunks; owns its session so it can outlive the request handler"""
+    statement = build_statement(EXPORTS[dataset], start, end, user_id)
+    db = session_factory()
+    try:
+        result = db.execute(statement)
+        keys = list(result.keys())
+        lines = _csv_lines(keys, result) if export_format == "csv" else _ndjson_lines(keys, result)
+        chunk = bytearray()
+        for line in lines:
+            chunk += line
+            if len(chunk) >= EXPORT_CHUNK_BYTES:
+                yield bytes(chunk)
+                chunk.clear()
+        if chunk:
+            yield bytes(chunk)
+    finally:
+        db.close()
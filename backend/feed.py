@@ -0,0 +1,253 @@
+"""
+Realtime community feed
+
+Routes publish small events (new post, new comment, like, deleted post) to the
+hub. Every FEED_FLUSH_SECONDS the hub coalesces whatever arrived into a single
+batch (likes are summed per post), serializes it once and hands the same
+bytes to every connected client, over WebSocket or server-sent events:
+
+    {"type": "batch", "posts": [...], "comments": [...], "likes": {post_id: delta}, "deleted_posts": [...]}
+
+A client that falls FEED_MAX_PENDING batches behind gets {"type": "resync"}
+and is disconnected; it should refetch and reconnect.
+
+With FEED_REDIS_URL set (and redis-py installed) batches are published to a
+Redis channel and every worker fans out what it receives there, so clients
+see activity from all workers.
+"""
+import asyncio
+import os
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set
+
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+from .metrics import REGISTRY, Counter, Gauge
+from .responses import dumps
+
+try:
+    import redis.asyncio as redis_async
+except ImportError:
+    redis_async = None
+
+FEED_FLUSH_SECONDS = float(os.getenv("FEED_FLUSH_SECONDS", "0.25"))
+FEED_MAX_PENDING = int(os.getenv("FEED_MAX_PENDING", "100"))
+FEED_KEEPALIVE_SECONDS = float(os.getenv("FEED_KEEPALIVE_SECONDS", "25"))
+FEED_REDIS_URL = os.getenv("FEED_REDIS_URL")
+FEED_REDIS_CHANNEL = os.getenv("FEED_REDIS_CHANNEL", "saarthi:feed")
+
+RESYNC = dumps({"type": "resync"})
+
+feed_subscribers = REGISTRY.register(Gauge(
+    "saarthi_feed_subscribers", "Connected realtime feed clients by transport", ("transport",)))
+feed_batches_total = REGISTRY.register(Counter(
+    "saarthi_feed_batches_total", "Feed batches fanned out, and slow clients dropped",
+    ("outcome",)))
+
+
+class FeedSubscriber:
+    def __init__(self, transport: str, max_pending: int = FEED_MAX_PENDING):
+        self.transport = transport
+        self.max_pending = max_pending
+        self.closed = False
+        self._messages: Deque[bytes] = deque()
+        self._ready = asyncio.Event()
+
+    def push(self, data: bytes):
+        if self.closed:
+            return
+        if len(self._messages) >= self.max_pending:
+            # Too slow to keep up: replace the backlog with a resync notice and let the connection end
+            self._messages.clear()
+            self._messages.append(RESYNC)
+            self.closed = True
+            feed_batches_total.inc(outcome="subscriber_dropped")
+        else:
+            self._messages.append(data)
+        self._ready.set()
+
+    @property
+    def finished(self) -> bool:
+        return self.closed and not self._messages
+
+    async def next(self, timeout: float = FEED_KEEPALIVE_SECONDS) -> Optional[bytes]:
+        """Next message, or None if none arrived within `timeout` (time for a keepalive)"""
+        if not self._messages:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self._messages.popleft()
+
+
+class FeedHub:
+    def __init__(self, flush_interval: float = FEED_FLUSH_SECONDS, redis_url: Optional[str] = FEED_REDIS_URL):
+        self.flush_interval = flush_interval
+        self.redis_url = redis_url
+        self.subscribers: Set[FeedSubscriber] = set()
+        self._lock = threading.Lock()  # publishers may be worker threads (background jobs)
+        self._posts: List[dict] = []
+        self._comments: List[dict] = []
+        self._likes: Dict[str, int] = {}
+        self._deleted_posts: List[str] = []
+        self._tasks: List[asyncio.Task] = []
+        self._redis = None
+
+    # ------------------------------------------------------------------ publish
+
+    @property
+    def _listening(self) -> bool:
+        return bool(self.subscribers) or self._redis is not None
+
+    def publish_post(self, post: dict):
+        if self._listening:
+            with self._lock:
+                self._posts.append(post)
+
+    def publish_comment(self, comment: dict):
+        if self._listening:
+            with self._lock:
+                self._comments.append(comment)
+
+    def publish_like(self, post_id: str, delta: int = 1):
+        if self._listening:
+            with self._lock:
+                self._likes[post_id] = self._likes.get(post_id, 0) + delta
+
+    def publish_post_deleted(self, post_id: str):
+        if self._listening:
+            with self._lock:
+                self._deleted_posts.append(post_id)
+
+    def _take_batch(self) -> Optional[bytes]:
+        with self._lock:
+            if not (self._posts or self._comments or self._likes or self._deleted_posts):
+                return None
+            deleted = set(self._deleted_posts)
+            batch = {
+                "type": "batch",
+                "posts": [post for post in self._posts if post["id"] not in deleted],
+                "comments": [comment for comment in self._comments if comment["post_id"] not in deleted],
+                "likes": {post_id: delta for post_id, delta in self._likes.items() if post_id not in deleted},
+                "deleted_posts": self._deleted_posts,
+            }
+            self._posts, self._comments, self._likes, self._deleted_posts = [], [], {}, []
+        return dumps(batch)
+
+    # ------------------------------------------------------------------ fan-out
+
+    def subscribe(self, transport: str) -> FeedSubscriber:
+        subscriber = FeedSubscriber(transport)
+        self.subscribers.add(subscriber)
+        feed_subscribers.set(sum(1 for item in self.subscribers if item.transport == transport), transport=transport)
+        return subscriber
+
+    def unsubscribe(self, subscriber: FeedSubscriber):
+        self.subscribers.discard(subscriber)
+        transport = subscriber.transport
+        feed_subscribers.set(sum(1 for item in self.subscribers if item.transport == transport), transport=transport)
+
+    def fan_out(self, data: bytes):
+        for subscriber in list(self.subscribers):
+            subscriber.push(data)
+        feed_batches_total.inc(outcome="delivered")
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            data = self._take_batch()
+            if data is None:
+                continue
+            try:
+                if self._redis is not None:
+                    await self._redis.publish(FEED_REDIS_CHANNEL, data)
+                else:
+                    self.fan_out(data)
+            except Exception as error:
+                print(f"Feed publish failed: {error}")
+
+    async def _redis_listener(self, pubsub):
+        while True:
+            try:
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self.fan_out(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                print(f"Feed pub/sub connection lost, reconnecting: {error}")
+                await asyncio.sleep(1.0)
+                await pubsub.subscribe(FEED_REDIS_CHANNEL)
+
+    # ---------------------------------------------------------------- lifecycle
+
+    async def start(self):
+        if self._tasks:
+            return
+        if self.redis_url:
+            if redis_async is None:
+                print("Warning: FEED_REDIS_URL is set but redis is not installed; feed updates stay per worker")
+            else:
+                self._redis = redis_async.from_url(self.redis_url)
+                pubsub = self._redis.pubsub()
+                await pubsub.subscribe(FEED_REDIS_CHANNEL)
+                self._tasks.append(asyncio.create_task(self._redis_listener(pubsub)))
+        self._tasks.append(asyncio.create_task(self._flush_loop()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+
+async def serve_websocket(hub: FeedHub, websocket: WebSocket):
+    """Push feed batches to one WebSocket client until it disconnects or falls too far behind"""
+    await websocket.accept()
+    subscriber = hub.subscribe("websocket")
+
+    async def wait_for_disconnect():
+        try:
+            while True:
+                await websocket.receive_text()  # clients don't send anything meaningful
+        except WebSocketDisconnect:
+            pass
+
+    disconnected = asyncio.create_task(wait_for_disconnect())
+    try:
+        while not disconnected.done() and not subscriber.finished:
+            next_message = asyncio.create_task(subscriber.next())
+            await asyncio.wait({next_message, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+            if not next_message.done():
+                next_message.cancel()
+                break
+            data = next_message.result()
+            await websocket.send_text((data or b'{"type":"ping"}').decode("utf-8"))
+        if subscriber.closed and not disconnected.done():
+            await websocket.close(code=1013)  # try again later
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        disconnected.cancel()
+        hub.unsubscribe(subscriber)
+
+
+async def sse_stream(hub: FeedHub, request):
+    """Server-sent events version of the feed, for clients that can't use WebSockets"""
+    subscriber = hub.subscribe("sse")
+    try:
+        yield b"retry: 3000\n\n"
+        while not subscriber.finished:
+            data = await subscriber.next()
+            if await request.is_disconnected():
+                return
+            yield b": keepalive\n\n" if data is None else b"data: " + data + b"\n\n"
+    finally:
+        hub.unsubscribe(subscriber)
+
+
+feed_hub = FeedHub()
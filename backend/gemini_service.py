@@ -1,65 +1,159 @@
-try:
-    import google.generativeai as genai
-except ImportError:
-    print("Warning: google-generativeai not installed. AI features will not work.")
-    genai = None
-
+import asyncio
 import os
+import time
+from typing import Dict, Optional, Sequence
+
+from .llm_providers import LLMProvider, provider_for
+from .metrics import observe_llm_call
+from .resilience import CircuitBreaker, CircuitOpenError, LatencyTracker, hedged, retry_async
+
+GEMINI_TIMEOUT_SECONDS = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "8"))  # per call; well under the deadline so retries fit
+GEMINI_DEADLINE_SECONDS = float(os.getenv("GEMINI_DEADLINE_SECONDS", "20"))  # whole chat call, retries included
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "2"))
+GEMINI_RETRY_BASE_SECONDS = float(os.getenv("GEMINI_RETRY_BASE_SECONDS", "0.25"))
+GEMINI_RETRY_MAX_SECONDS = float(os.getenv("GEMINI_RETRY_MAX_SECONDS", "2"))
+GEMINI_HEDGE_ENABLED = os.getenv("GEMINI_HEDGE_ENABLED", "true").lower() == "true"
+GEMINI_HEDGE_PERCENTILE = float(os.getenv("GEMINI_HEDGE_PERCENTILE", "0.95"))
+GEMINI_HEDGE_DEFAULT_SECONDS = float(os.getenv("GEMINI_HEDGE_DEFAULT_SECONDS", "6"))
+
+_breakers: Dict[str, CircuitBreaker] = {}
+chat_latency = LatencyTracker()
+
+def breaker_for(provider: LLMProvider) -> CircuitBreaker:
+    """One circuit breaker per provider, shared by every operation that uses it"""
+    breaker = _breakers.get(provider.name)
+    if breaker is None:
+        breaker = _breakers.setdefault(provider.name, CircuitBreaker(
+            provider.name,
+            failure_threshold=int(os.getenv("GEMINI_BREAKER_FAILURES", "5")),
+            reset_timeout=float(os.getenv("GEMINI_BREAKER_RESET_SECONDS", "30")),
+        ))
+    return breaker
+
+def chat_circuit_open() -> bool:
+    """Whether chat calls would be rejected by an open circuit right now (fallbacks need no admission)"""
+    provider, _ = provider_for("chat")
+    return provider.available and provider.configured and breaker_for(provider).state == "open"
+
+class AIServiceUnavailable(Exception):
+    """The AI provider failed or its circuit is open; callers should serve a fallback"""
+
+# Client-side errors that will not succeed on retry
+_NON_RETRYABLE = ("InvalidArgument", "PermissionDenied", "Unauthenticated", "NotFound", "BlockedPromptException")
+
+def _is_timeout(error: Exception) -> bool:
+    return isinstance(error, TimeoutError) or type(error).__name__ in ("DeadlineExceeded", "ReadTimeout", "Timeout")
+
+def _is_retryable(error: Exception) -> bool:
+    return type(error).__name__ not in _NON_RETRYABLE
+
+def _hedge_delay() -> float:
+    return chat_latency.percentile(GEMINI_HEDGE_PERCENTILE) or GEMINI_HEDGE_DEFAULT_SECONDS
+
+def _generate(operation: str, provider: LLMProvider, model: Optional[str], prompt: str,
+              timeout: float = GEMINI_TIMEOUT_SECONDS) -> str:
+    """Call the LLM provider and record latency and outcome metrics"""
+    start = time.perf_counter()
+    try:
+        response = provider.generate(prompt, model=model, timeout=timeout)
+    except Exception as error:
+        outcome = "timeout" if _is_timeout(error) else "error"
+        observe_llm_call(operation, time.perf_counter() - start, outcome)
+        raise
+    observe_llm_call(operation, time.perf_counter() - start, "success")
+    return response
+
+def format_history(history: Optional[Sequence]) -> str:
+    """Render earlier turns (objects with .content and .is_ai_response) for the prompt"""
+    if not history:
+        return ""
+    lines = [f"{'Saarthi' if turn.is_ai_response else 'User'}: {turn.content}" for turn in history]
+    return "Conversation so far:\n" + "\n".join(lines) + "\n\n"
 
-# Load environment variables if they exist
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-except ImportError:
-    pass
-
-# Configure Gemini API
-if genai:
-    gemini_api_key = os.getenv("GEMINI_API_KEY")
-    if gemini_api_key:
-        genai.configure(api_key=gemini_api_key)
-
-async def get_scripture_response(question: str) -> str:
-    """Get AI response for scripture-related questions"""
-    if not genai:
+def format_verses(verses: Optional[Sequence]) -> str:
+    """Render retrieved verses (objects with .chapter, .verse_number, .english, .explanation) for the prompt"""
+    if not verses:
+        return ""
+    lines = [f"[{verse.chapter}:{verse.verse_number}] {verse.english} ({verse.explanation})" for verse in verses]
+    return "Relevant verses from the Bhagavad Geeta:\n" + "\n".join(lines) + "\n\n"
+
+async def get_scripture_response(question: str, history: Optional[Sequence] = None,
+                                 verses: Optional[Sequence] = None) -> str:
+    """Get AI response for scripture-related questions, optionally continuing a conversation and grounded in retrieved verses
+
+    Raises AIServiceUnavailable when the provider keeps failing or its circuit breaker is open.
+    """
+    provider, model = provider_for("chat")
+    if not provider.available:
         return "AI service is currently unavailable. Please try again later."
     
-    if not os.getenv("GEMINI_API_KEY"):
+    if not provider.configured:
         return "AI service is not configured. Please contact administrator."
     
+    breaker = breaker_for(provider)
     try:
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        
         system_prompt = """You are a supportive and friendly chatbot drawing wisdom and guidance from the Bhagavad Geeta.
 
-    Respond to the following user question with a helpful and encouraging message, incorporating relevant teachings from the Geeta where appropriate. Keep your responses concise and to the point, ideally under 100 words.
+    Respond to the following user question with a helpful and encouraging message, incorporating relevant teachings from the Geeta where appropriate. Keep your responses concise and to the point, ideally under 100 words. If earlier conversation is included, use it to stay consistent with what was already discussed. If relevant verses are included, ground your answer in them and cite them as [chapter:verse]."""
 
-    Question: {question}"""
-
-        full_prompt = f"{system_prompt}\n\nQuestion: {question}"
+        full_prompt = f"{system_prompt}\n\n{format_verses(verses)}{format_history(history)}Question: {question}"
         
-        response = model.generate_content(full_prompt)
-        return response.text or "I apologize, but I couldn't generate a response at this time. Please try asking your question again."
+        deadline = time.monotonic() + GEMINI_DEADLINE_SECONDS
+
+        def call():
+            start = time.perf_counter()
+            # Never let one call outlive what is left of the deadline
+            timeout = max(0.1, min(GEMINI_TIMEOUT_SECONDS, deadline - time.monotonic()))
+            response = _generate("chat", provider, model, full_prompt, timeout=timeout)
+            chat_latency.observe(time.perf_counter() - start)
+            return response
+
+        async def attempt():
+            # No hedging while half-open: a single probe decides whether to close the circuit
+            hedge_after = _hedge_delay() if GEMINI_HEDGE_ENABLED and breaker.state == "closed" else None
+            return await hedged(call, hedge_after, provider.name)
+
+        response = await asyncio.wait_for(
+            retry_async(
+                attempt,
+                provider.name,
+                retries=GEMINI_MAX_RETRIES,
+                base_delay=GEMINI_RETRY_BASE_SECONDS,
+                max_delay=GEMINI_RETRY_MAX_SECONDS,
+                deadline=deadline,
+                retryable=_is_retryable,
+                breaker=breaker,
+            ),
+            timeout=GEMINI_DEADLINE_SECONDS,
+        )
+        return response or "I apologize, but I couldn't generate a response at this time. Please try asking your question again."
     
+    except CircuitOpenError:
+        raise AIServiceUnavailable("circuit open")
+    except asyncio.TimeoutError:
+        breaker.record_failure()
+        print(f"{provider.name} API error: no response within {GEMINI_DEADLINE_SECONDS}s")
+        raise AIServiceUnavailable("deadline exceeded")
     except Exception as error:
-        print(f"Gemini API error: {error}")
-        return "I'm experiencing some technical difficulties right now. Please try again in a moment, and I'll do my best to help you with your spiritual inquiry."
+        print(f"{provider.name} API error: {error}")
+        raise AIServiceUnavailable(str(error)) from error
 
-async def generate_daily_wisdom() -> str:
-    """Generate daily spiritual wisdom"""
-    if not genai:
-        return "May your day be filled with peace and spiritual growth."
-    
-    if not os.getenv("GEMINI_API_KEY"):
-        return "May your day be filled with peace and spiritual growth."
-        
+def generate_daily_wisdom_candidate() -> Optional[str]:
+    """Generate one daily wisdom text (blocking); None if the AI service is unavailable or fails"""
+    provider, model = provider_for("daily_wisdom")
+    if not provider.available or not provider.configured:
+        return None
+    breaker = breaker_for(provider)
+    if not breaker.allow():
+        return None
     try:
-        model = genai.GenerativeModel('gemini-2.5-flash')
         prompt = "Share a brief, inspiring piece of wisdom from Hindu scriptures that would be meaningful for someone starting their day. Include the source text."
         
-        response = model.generate_content(prompt)
-        return response.text or "May your day be filled with peace and spiritual growth."
+        response = _generate("daily_wisdom", provider, model, prompt)
+        breaker.record_success()
+        return response or None
     
     except Exception as error:
+        breaker.record_failure()
         print(f"Error generating daily wisdom: {error}")
-        return "May your day be filled with peace and spiritual growth."
\ No newline at end of file
+        return None
@@ -0,0 +1,233 @@
+"""
+In-process background jobs for heavy admin operations
+
+Jobs are rows in the `jobs` table (status, progress, result), so they can be
+polled from any worker and survive restarts. Each process runs a few worker
+threads; a job is claimed with a conditional UPDATE, so only one worker ever
+runs it. Handlers get their own session and should commit in small batches,
+reporting progress as they go, instead of holding one long transaction.
+
+A running job records the process that claimed it, and that process
+refreshes heartbeat_at every JOB_HEARTBEAT_SECONDS. Only a job whose heartbeat
+is older than JOB_STALE_SECONDS is treated as orphaned and marked failed, so
+other live workers and overlapping processes in a rolling restart keep their
+jobs. Jobs still "queued" at startup are picked up again.
+"""
+import os
+import queue
+import socket
+import threading
+import time
+import traceback
+import uuid
+from datetime import timedelta
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import and_, inspect, or_, text, update
+from sqlalchemy.orm import Session
+
+from .chat_writer import utcnow
+from .metrics import REGISTRY, Counter
+from .models import Job
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_BATCH_SIZE = int(os.getenv("JOB_BATCH_SIZE", "500"))
+JOB_PROGRESS_INTERVAL_SECONDS = 0.5
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", "10"))
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", "60"))
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+
+jobs_total = REGISTRY.register(Counter(
+    "saarthi_jobs_total", "Background jobs finished by kind and status",
+    ("kind", "status")))
+
+
+class JobContext:
+    """Passed to handlers: a dedicated session plus progress reporting"""
+
+    def __init__(self, session_factory, job_id: str, worker_id: str):
+        self.db: Session = session_factory()
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.processed = 0
+        self.total: Optional[int] = None
+        self._reported_at = 0.0
+
+    def set_total(self, total: int):
+        self.total = total
+        self._report(force=True)
+
+    def advance(self, count: int = 1):
+        self.processed += count
+        self._report()
+
+    def _report(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._reported_at < JOB_PROGRESS_INTERVAL_SECONDS:
+            return
+        self._reported_at = now
+        self.db.execute(update(Job).where(Job.id == self.job_id, Job.worker_id == self.worker_id, Job.status == RUNNING).values(
+            processed=self.processed, total=self.total, heartbeat_at=utcnow()))
+        self.db.commit()
+
+
+JobHandler = Callable[[JobContext, dict], Optional[dict]]
+
+
+class JobRunner:
+    def __init__(self, workers: int = JOB_WORKERS):
+        self.workers = workers
+        self.handlers: Dict[str, JobHandler] = {}
+        self.session_factory = None
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._threads = []
+        self._stop = threading.Event()
+        self._heartbeat_thread: Optional[threading.Thread] = None
+
+    def handler(self, kind: str):
+        """Register a job handler: fn(ctx, params) -> result dict"""
+        def decorator(fn: JobHandler) -> JobHandler:
+            self.handlers[kind] = fn
+            return fn
+        return decorator
+
+    def submit(self, db: Session, kind: str, params: dict, created_by: Optional[str] = None) -> Job:
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind '{kind}'")
+        job = Job(kind=kind, params=params, status=QUEUED, created_by=created_by)
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        self._queue.put(job.id)
+        return job
+
+    # ---------------------------------------------------------------- lifecycle
+
+    def start(self, session_factory):
+        if self._threads:
+            return
+        self.session_factory = session_factory
+        self._stop.clear()
+        self._add_liveness_columns()
+        self.fail_orphaned()
+        db = session_factory()
+        try:
+            for (job_id,) in db.query(Job.id).filter(Job.status == QUEUED).order_by(Job.created_at).all():
+                self._queue.put(job_id)
+        finally:
+            db.close()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        self._heartbeat_thread = threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True)
+        self._heartbeat_thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """Let running jobs finish (up to `timeout`); queued ones stay queued for the next start"""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        self._stop.set()
+
+    # --------------------------------------------------------------- liveness
+
+    def _add_liveness_columns(self):
+        """Add worker_id/heartbeat_at to a jobs table created before they existed"""
+        db = self.session_factory()
+        try:
+            existing = {column["name"] for column in inspect(db.get_bind()).get_columns(Job.__tablename__)}
+            for name, column_type in (("worker_id", "VARCHAR"), ("heartbeat_at", "TIMESTAMP")):
+                if name not in existing:
+                    db.execute(text(f"ALTER TABLE {Job.__tablename__} ADD COLUMN {name} {column_type}"))
+            db.commit()
+        finally:
+            db.close()
+
+    def fail_orphaned(self) -> int:
+        """Mark failed the running jobs whose process stopped heartbeating"""
+        cutoff = utcnow() - timedelta(seconds=JOB_STALE_SECONDS)
+        db = self.session_factory()
+        try:
+            failed = db.execute(update(Job).where(
+                Job.status == RUNNING,
+                or_(Job.heartbeat_at < cutoff, and_(Job.heartbeat_at == None, Job.started_at < cutoff))
+            ).values(status=FAILED, error="Interrupted: the worker running it stopped", finished_at=utcnow())).rowcount
+            db.commit()
+            return failed
+        finally:
+            db.close()
+
+    def _heartbeat(self):
+        while not self._stop.wait(JOB_HEARTBEAT_SECONDS):
+            db = self.session_factory()
+            try:
+                db.execute(update(Job).where(Job.status == RUNNING, Job.worker_id == self.worker_id).values(
+                    heartbeat_at=utcnow()))
+                db.commit()
+            except Exception as error:
+                print(f"Job heartbeat failed: {error}")
+            finally:
+                db.close()
+            try:
+                self.fail_orphaned()
+            except Exception as error:
+                print(f"Orphaned job check failed: {error}")
+
+    # ------------------------------------------------------------------ worker
+
+    def _work(self):
+        while True:
+            job_id = self._queue.get()
+            if job_id is None:
+                return
+            try:
+                self._run(job_id)
+            except Exception as error:
+                print(f"Job runner error for {job_id}: {error}")
+
+    def _claim(self, job_id: str) -> Optional[Job]:
+        db = self.session_factory()
+        try:
+            now = utcnow()
+            claimed = db.execute(update(Job).where(Job.id == job_id, Job.status == QUEUED).values(
+                status=RUNNING, started_at=now, heartbeat_at=now, worker_id=self.worker_id)).rowcount
+            db.commit()
+            if not claimed:
+                return None  # already taken by another worker or process
+            job = db.query(Job).filter(Job.id == job_id).first()
+            db.expunge(job)
+            return job
+        finally:
+            db.close()
+
+    def _run(self, job_id: str):
+        job = self._claim(job_id)
+        if job is None:
+            return
+        ctx = JobContext(self.session_factory, job.id, self.worker_id)
+        values = {}
+        try:
+            result = self.handlers[job.kind](ctx, job.params or {})
+            values = {"status": SUCCEEDED, "result": result or {}}
+        except Exception as error:
+            ctx.db.rollback()
+            traceback.print_exc()
+            values = {"status": FAILED, "error": str(error) or type(error).__name__}
+        finally:
+            finished = ctx.db.execute(update(Job).where(
+                Job.id == job.id, Job.worker_id == self.worker_id, Job.status == RUNNING
+            ).values(
+                processed=ctx.processed, total=ctx.total, finished_at=utcnow(), **values)).rowcount
+            ctx.db.commit()
+            if not finished:
+                print(f"Job {job.id} was reclaimed as orphaned before it finished; result not recorded")
+            ctx.db.close()
+            jobs_total.inc(kind=job.kind, status=values.get("status", FAILED))
+
+
+job_runner = JobRunner()
@@ -0,0 +1,222 @@
+"""
+LLM provider interface
+
+Every backend exposes the same blocking calls (callers run them off the event
+loop):
+
+    generate(prompt, model=None, timeout=None) -> str
+    stream(prompt, model=None, timeout=None)   -> iterator of text chunks
+    embed(texts, model=None)                   -> list of float vectors
+
+Providers are picked per operation from the environment, so one route can use
+a cheaper or faster model than another:
+
+    LLM_PROVIDER=gemini|local            default for every operation
+    LLM_PROVIDER_<OPERATION>=...         e.g. LLM_PROVIDER_DAILY_WISDOM=local
+    LLM_MODEL_<OPERATION>=...            e.g. LLM_MODEL_CHAT=gemini-2.5-flash-lite
+
+The local provider is deterministic (replies derive from the prompt) with
+configurable latency and error rate, for load tests and CI without network.
+"""
+import hashlib
+import math
+import os
+import random
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import google.generativeai as genai
+except ImportError:
+    print("Warning: google-generativeai not installed. AI features will not work.")
+    genai = None
+
+# Load environment variables if they exist
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    pass
+
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini").lower()
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+GEMINI_EMBEDDING_MODEL = os.getenv("GEMINI_EMBEDDING_MODEL", "models/text-embedding-004")
+LOCAL_LLM_LATENCY = float(os.getenv("LOCAL_LLM_LATENCY", "0"))
+LOCAL_LLM_JITTER = float(os.getenv("LOCAL_LLM_JITTER", "0"))
+LOCAL_LLM_ERROR_RATE = float(os.getenv("LOCAL_LLM_ERROR_RATE", "0"))
+LOCAL_LLM_SEED = int(os.getenv("LOCAL_LLM_SEED", "42"))
+LOCAL_EMBEDDING_DIMENSIONS = 256
+
+
+class ProviderError(Exception):
+    """A provider call failed (retryable unless the provider says otherwise)"""
+
+
+class LLMProvider(ABC):
+    name = "base"
+
+    @property
+    def available(self) -> bool:
+        """Client library present"""
+        return True
+
+    @property
+    def configured(self) -> bool:
+        """Credentials present"""
+        return True
+
+    @abstractmethod
+    def generate(self, prompt: str, model: Optional[str] = None, timeout: Optional[float] = None) -> str:
+        ...
+
+    def stream(self, prompt: str, model: Optional[str] = None, timeout: Optional[float] = None) -> Iterator[str]:
+        yield self.generate(prompt, model=model, timeout=timeout)
+
+    @abstractmethod
+    def embed(self, texts: Sequence[str], model: Optional[str] = None) -> List[List[float]]:
+        ...
+
+
+class GeminiProvider(LLMProvider):
+    name = "gemini"
+
+    def __init__(self, default_model: str = GEMINI_MODEL, embedding_model: str = GEMINI_EMBEDDING_MODEL):
+        self.default_model = default_model
+        self.embedding_model = embedding_model
+        self._configured_key: Optional[str] = None
+        self._models: Dict[str, object] = {}
+
+    @property
+    def available(self) -> bool:
+        return genai is not None
+
+    @property
+    def configured(self) -> bool:
+        return bool(os.getenv("GEMINI_API_KEY"))
+
+    def _model(self, name: Optional[str]):
+        api_key = os.getenv("GEMINI_API_KEY")
+        if api_key != self._configured_key:
+            genai.configure(api_key=api_key)
+            self._configured_key = api_key
+            self._models = {}
+        name = name or self.default_model
+        model = self._models.get(name)
+        if model is None:
+            model = self._models[name] = genai.GenerativeModel(name)
+        return model
+
+    @staticmethod
+    def _options(timeout: Optional[float]):
+        return {"timeout": timeout} if timeout else None
+
+    def generate(self, prompt: str, model: Optional[str] = None, timeout: Optional[float] = None) -> str:
+        response = self._model(model).generate_content(prompt, request_options=self._options(timeout))
+        return response.text or ""
+
+    def stream(self, prompt: str, model: Optional[str] = None, timeout: Optional[float] = None) -> Iterator[str]:
+        response = self._model(model).generate_content(prompt, stream=True, request_options=self._options(timeout))
+        for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+    def embed(self, texts: Sequence[str], model: Optional[str] = None) -> List[List[float]]:
+        self._model(None)  # make sure the API key is configured
+        result = genai.embed_content(model=model or self.embedding_model, content=list(texts))
+        return result["embedding"]
+
+
+_LOCAL_REPLIES = (
+    "The Geeta teaches us to do our duty without attachment to results (2:47). "
+    "Take the next right step and offer the outcome to Krishna.",
+    "Krishna reminds Arjuna that the soul is eternal and untouched by passing troubles (2:20). "
+    "This moment will pass; meet it with steadiness.",
+    "A calm mind is built through practice and detachment (6:35). "
+    "Give yourself a few quiet minutes each day to return to your breath.",
+    "Krishna says that whoever offers with devotion, even a leaf or a flower, is accepted (9:26). "
+    "Small sincere efforts matter.",
+    "Be equal in success and failure; that evenness is yoga (2:48). "
+    "Let go of what you cannot control and act on what you can.",
+)
+_WORD = re.compile(r"[a-z]+")
+
+
+class LocalProvider(LLMProvider):
+    """Deterministic offline provider with configurable latency, jitter and error rate"""
+    name = "local"
+
+    def __init__(self, latency: float = LOCAL_LLM_LATENCY, jitter: float = LOCAL_LLM_JITTER,
+                 error_rate: float = LOCAL_LLM_ERROR_RATE, seed: int = LOCAL_LLM_SEED):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _simulate(self):
+        with self._lock:
+            self.calls += 1
+            delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+            fail = self._rng.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+        if fail:
+            raise ProviderError("local provider injected failure")
+
+    @staticmethod
+    def _digest(text: str) -> int:
+        return int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+
+    def generate(self, prompt: str, model: Optional[str] = None, timeout: Optional[float] = None) -> str:
+        self._simulate()
+        return _LOCAL_REPLIES[self._digest(prompt) % len(_LOCAL_REPLIES)]
+
+    def stream(self, prompt: str, model: Optional[str] = None, timeout: Optional[float] = None) -> Iterator[str]:
+        for word in self.generate(prompt, model=model, timeout=timeout).split(" "):
+            yield word + " "
+
+    def embed(self, texts: Sequence[str], model: Optional[str] = None) -> List[List[float]]:
+        """Hashed bag-of-words vectors, L2-normalised"""
+        self._simulate()
+        vectors = []
+        for text in texts:
+            vector = [0.0] * LOCAL_EMBEDDING_DIMENSIONS
+            for word in _WORD.findall(text.lower()):
+                vector[self._digest(word) % LOCAL_EMBEDDING_DIMENSIONS] += 1.0
+            norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+            vectors.append([value / norm for value in vector])
+        return vectors
+
+
+PROVIDER_CLASSES = {"gemini": GeminiProvider, "local": LocalProvider}
+
+_providers: Dict[str, LLMProvider] = {}
+_providers_lock = threading.Lock()
+
+
+def get_provider(name: str) -> LLMProvider:
+    """Shared provider instance by name"""
+    with _providers_lock:
+        provider = _providers.get(name)
+        if provider is None:
+            if name not in PROVIDER_CLASSES:
+                raise ValueError(f"Unknown LLM provider '{name}' (expected one of {', '.join(PROVIDER_CLASSES)})")
+            provider = _providers[name] = PROVIDER_CLASSES[name]()
+        return provider
+
+
+def install_provider(provider: LLMProvider, name: Optional[str] = None):
+    """Register (or replace) the shared instance for a provider name"""
+    with _providers_lock:
+        _providers[name or provider.name] = provider
+
+
+def provider_for(operation: str) -> Tuple[LLMProvider, Optional[str]]:
+    """(provider, model override) configured for an operation, e.g. chat or daily_wisdom"""
+    key = operation.upper()
+    name = os.getenv(f"LLM_PROVIDER_{key}", LLM_PROVIDER).lower()
+    return get_provider(name), os.getenv(f"LLM_MODEL_{key}") or None
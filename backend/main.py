@@ -6,13 +6,12 @@ Main FastAPI application for Saarthi
 from dotenv import load_dotenv
 load_dotenv()
 
-from fastapi import FastAPI, HTTPException, Depends, status, Request
+from fastapi import FastAPI, HTTPException, Depends, status, Request, Response, Query, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Optional, Tuple
 import os
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
@@ -21,7 +20,7 @@ import uvicorn
 
 # Import our modules
 from .database import get_db, engine, SessionLocal
-from .models import Base, User, Post, Comment, ChatMessage, JournalEntry, Emotion, Verse, Admin, Interaction, ThoughtOfTheDay, Scripture
+from .models import Base, User, Post, Comment, ChatMessage, JournalEntry, Emotion, Verse, Admin, Interaction, ThoughtOfTheDay, Scripture, Job, generate_uuid
 from .schemas import (
     UserCreate, UserLogin, UserResponse, UserUpdate, AdminUserResponse,
     PostCreate, PostResponse, PostWithAuthor,
@@ -29,39 +28,60 @@ from .schemas import (
     ChatMessageCreate, ChatMessageResponse, ChatMessageWithUser,
     JournalEntryCreate, JournalEntryResponse,
     EmotionCreate, EmotionResponse, EmotionUpdate,
-    VerseCreate, VerseResponse, VerseUpdate, VerseWithEmotion,
+    VerseCreate, VerseResponse, VerseUpdate, VerseWithEmotion, VerseCitation, VerseSummary, VerseRecommendations,
     AdminCreate, AdminLogin, AdminResponse,
     InteractionCreate, InteractionResponse, InteractionWithDetails,
     ThoughtOfTheDayCreate, ThoughtOfTheDayResponse, ThoughtOfTheDayUpdate, ThoughtOfTheDayWithCreator,
-    ScriptureCreate, ScriptureResponse, ScriptureUpdate, ScriptureWithCreator,
+    ScriptureCreate, ScriptureResponse, ScriptureUpdate, ScriptureWithCreator, ScriptureSummary,
     DashboardStats, AdminDashboardStats, AdminStats, ContentModerationAction,
+    VerseImport, JobResponse,
     Token
 )
-from .gemini_service import get_scripture_response
-from sqlalchemy.orm import Session, selectinload
-from sqlalchemy import desc, func, and_
+from .gemini_service import AIServiceUnavailable, chat_circuit_open, get_scripture_response, generate_daily_wisdom_candidate
+from .static_assets import StaticAssets, AssetResponse
+from .responses import CompressionMiddleware, FastJSONResponse, dump_orm, dumps, trusted_response
+from .metrics import MetricsMiddleware, instrument_engine, render_metrics
+from . import query_budget as query_budget_detector
+from .query_budget import QueryBudgetMiddleware, query_budget
+from .rate_limit import chat_admission_controller
+from .chat_context import CHAT_CONTEXT_ENABLED, Turn, conversations
+from .verse_index import verse_index
+from .emotion_router import emotion_verses, fallback_reply, route_message
+from .daily_wisdom import DAILY_WISDOM_ENABLED, DailyWisdomJob, daily_thoughts
+from .chat_writer import chat_writer, new_chat_message
+from .exports import EXPORTS, MEDIA_TYPES, stream_export
+from .jobs import JOB_BATCH_SIZE, JobContext, job_runner
+from .recommendations import RECOMMENDATIONS_ENABLED, RECOMMENDATIONS_TOP_N, most_viewed_verses, recommender
+from .retention import RETENTION_ENABLED, RetentionJob, newest
+from .feed import feed_hub, serve_websocket, sse_stream
+from .authors import author_cache
+from .response_cache import cache_key, response_cache
+from .verse_sequence import verse_at
+from .verse_payloads import SUMMARY_FIELDS, TEXT_FIELDS, select_fields, verse_payload, verse_payloads
+from sqlalchemy.orm import Session, joinedload, load_only, selectinload, undefer_group
+from sqlalchemy import desc, func, and_, or_
 import random
-import uuid
 
 # Create tables
 Base.metadata.create_all(bind=engine)
 
 
-app = FastAPI(title="Saarthi API", description="Hindu Scripture Companion API")
-# Serve static files from the frontend build output at /static
+app = FastAPI(
+    title="Saarthi API",
+    description="Hindu Scripture Companion API",
+    default_response_class=FastJSONResponse
+)
+# Serve the frontend build output from memory (loaded and precompressed at startup)
 import pathlib
 frontend_dist = pathlib.Path(__file__).parent.parent / "dist" / "public"
-app.mount("/static", StaticFiles(directory=frontend_dist, html=True), name="static")
+static_assets = StaticAssets(frontend_dist)
+app.mount("/static", static_assets.app(), name="static")
+app.mount("/assets", static_assets.app("assets"), name="assets")
 
 # Serve ads.txt at the root for AdSense
-from fastapi.responses import FileResponse
 @app.get("/ads.txt")
 async def ads_txt():
-    ads_path = frontend_dist / "ads.txt"
-    if ads_path.exists():
-        return FileResponse(str(ads_path), media_type="text/plain")
-    else:
-        return FileResponse("", media_type="text/plain", status_code=404)
+    return AssetResponse(static_assets, static_assets.get("ads.txt"))
 
 # CORS middleware
 app.add_middleware(
@@ -72,6 +92,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request metrics (latency, in-flight, DB usage per request)
+instrument_engine(engine)
+app.add_middleware(MetricsMiddleware)
+
+# Query budget / N+1 detection (QUERY_BUDGET_MODE=warn|raise in dev and tests)
+query_budget_detector.instrument_engine(engine)
+app.add_middleware(QueryBudgetMiddleware)
+
+# Negotiated brotli/gzip compression for API payloads above COMPRESSION_MIN_BYTES
+app.add_middleware(CompressionMiddleware)
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
 # Security
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here-change-in-production")
 ALGORITHM = "HS256"
@@ -128,6 +160,46 @@ async def get_admin_user(
         )
     return current_user
 
+def get_comment_counts(db: Session, post_ids: List[str]) -> dict:
+    """Comment counts for several posts in a single grouped query"""
+    if not post_ids:
+        return {}
+    rows = db.query(Comment.post_id, func.count(Comment.id)).filter(
+        Comment.post_id.in_(post_ids)
+    ).group_by(Comment.post_id).all()
+    return {post_id: count for post_id, count in rows}
+
+def with_authors(db: Session, comments: List[Comment]) -> List[dict]:
+    """Comment rows as dicts with cached author snapshots instead of loaded User rows"""
+    authors = author_cache.get_many(db, (comment.author_id for comment in comments))
+    return [
+        {**dump_orm(CommentResponse, comment), "author": authors.get(comment.author_id)}
+        for comment in comments
+    ]
+
+def get_user_content_counts(db: Session, user_ids: List[str]) -> dict:
+    """Per-user content statistics, one grouped query per content type"""
+    counts = {user_id: {
+        "posts_count": 0,
+        "comments_count": 0,
+        "chat_messages_count": 0,
+        "journal_entries_count": 0
+    } for user_id in user_ids}
+    if not user_ids:
+        return counts
+    for key, id_column, owner_column in (
+        ("posts_count", Post.id, Post.author_id),
+        ("comments_count", Comment.id, Comment.author_id),
+        ("chat_messages_count", ChatMessage.id, ChatMessage.user_id),
+        ("journal_entries_count", JournalEntry.id, JournalEntry.author_id),
+    ):
+        rows = db.query(owner_column, func.count(id_column)).filter(
+            owner_column.in_(user_ids)
+        ).group_by(owner_column).all()
+        for user_id, count in rows:
+            counts[user_id][key] = count
+    return counts
+
 # Auth routes
 @app.post("/api/auth/register", response_model=Token)
 async def register(user: UserCreate, db: Session = Depends(get_db)):
@@ -179,12 +251,15 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
 
 # Posts routes
 @app.get("/api/posts", response_model=List[PostWithAuthor])
+@query_budget(3)
 async def get_posts(db: Session = Depends(get_db)):
-    posts = db.query(Post).options(selectinload(Post.author)).order_by(desc(Post.created_at)).all()
+    posts = db.query(Post).order_by(desc(Post.created_at)).all()
+    comment_counts = get_comment_counts(db, [post.id for post in posts])
+    authors = author_cache.get_many(db, (post.author_id for post in posts))
     
     result = []
     for post in posts:
-        comment_count = db.query(func.count(Comment.id)).filter(Comment.post_id == post.id).scalar()
+        comment_count = comment_counts.get(post.id, 0)
         post_dict = {
             "id": post.id,
             "title": post.title,
@@ -194,12 +269,12 @@ async def get_posts(db: Session = Depends(get_db)):
             "video_url": post.video_url,
             "likes": post.likes,
             "created_at": post.created_at,
-            "author": post.author,
+            "author": authors.get(post.author_id),
             "comments": comment_count
         }
         result.append(post_dict)
     
-    return result
+    return trusted_response(PostWithAuthor, result)
 
 @app.post("/api/posts", response_model=PostResponse)
 async def create_post(
@@ -217,6 +292,7 @@ async def create_post(
     db.add(db_post)
     db.commit()
     db.refresh(db_post)
+    feed_hub.publish_post(dump_orm(PostWithAuthor, {**dump_orm(PostResponse, db_post), "author": current_user, "comments": 0}))
     return db_post
 
 @app.post("/api/posts/{post_id}/like")
@@ -233,15 +309,17 @@ async def like_post(
     current_likes = getattr(post, 'likes', 0) or 0
     setattr(post, 'likes', current_likes + 1)
     db.commit()
+    feed_hub.publish_like(post_id)
     return {"message": "Post liked successfully"}
 
 # Comments routes
 @app.get("/api/posts/{post_id}/comments", response_model=List[CommentWithAuthor])
+@query_budget(2)
 async def get_comments(post_id: str, db: Session = Depends(get_db)):
-    comments = db.query(Comment).options(selectinload(Comment.author)).filter(
+    comments = db.query(Comment).filter(
         Comment.post_id == post_id
     ).order_by(Comment.created_at).all()
-    return comments
+    return trusted_response(CommentWithAuthor, with_authors(db, comments))
 
 @app.post("/api/posts/{post_id}/comments", response_model=CommentResponse)
 async def create_comment(
@@ -263,22 +341,72 @@ async def create_comment(
     db.add(db_comment)
     db.commit()
     db.refresh(db_comment)
+    feed_hub.publish_comment(dump_orm(CommentWithAuthor, {**dump_orm(CommentResponse, db_comment), "author": current_user}))
     return db_comment
 
+# Realtime feed: new posts, comments and like deltas pushed in coalesced batches
+@app.websocket("/api/feed/ws")
+async def feed_websocket(websocket: WebSocket):
+    await serve_websocket(feed_hub, websocket)
+
+@app.get("/api/feed/events")
+async def feed_events(request: Request):
+    """Server-sent events fallback for the realtime feed"""
+    return StreamingResponse(
+        sse_stream(feed_hub, request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # Chat routes
 @app.get("/api/chat/messages", response_model=List[ChatMessageWithUser])
+@query_budget(3)
 async def get_chat_messages(
+    response: Response,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    limit: int = Query(50, ge=1, le=200),
+    before: Optional[str] = None
 ):
-    messages = db.query(ChatMessage).options(selectinload(ChatMessage.user)).filter(
+    """Most recent messages (oldest first); pass X-Next-Before as `before` for older pages"""
+    await chat_writer.wait_for_user_async(current_user.id)  # read your own just-sent messages
+    query = db.query(ChatMessage).options(selectinload(ChatMessage.user)).filter(
         ChatMessage.user_id == current_user.id
-    ).order_by(ChatMessage.created_at).all()
+    )
+    if before:
+        # Compare against the cursor row inside the database so stored timestamp formats match
+        cursor_created_at = db.query(ChatMessage.created_at).filter(
+            ChatMessage.id == before
+        ).scalar_subquery()
+        query = query.filter(or_(
+            ChatMessage.created_at < cursor_created_at,
+            and_(ChatMessage.created_at == cursor_created_at, ChatMessage.id < before)
+        ))
+    messages = query.order_by(desc(ChatMessage.created_at), desc(ChatMessage.id)).limit(limit).all()
+    messages.reverse()
+    if len(messages) == limit:
+        response.headers["X-Next-Before"] = messages[0].id
     return messages
 
+CHAT_RETRIEVAL_K = int(os.getenv("CHAT_RETRIEVAL_K", "3"))
+
 class ChatResponse(BaseModel):
     user_message: ChatMessageResponse
     ai_message: ChatMessageResponse
+    citations: List[VerseCitation] = []
+    emotion: Optional[str] = None  # Set when the reply was a Krishna Path verse for a detected feeling
+
+def retrieve_verses(db: Session, text: str, k: int = CHAT_RETRIEVAL_K) -> List[Verse]:
+    """Top-k verses for a chat message from the local index, in relevance order"""
+    if k <= 0:
+        return []
+    verse_ids = [verse_id for verse_id, _ in verse_index.search(text, k=k)]
+    if not verse_ids:
+        return []
+    verses = {verse.id: verse for verse in db.query(Verse).filter(
+        Verse.id.in_(verse_ids), Verse.is_active == True
+    ).all()}
+    return [verses[verse_id] for verse_id in verse_ids if verse_id in verses]
 
 @app.post("/api/chat/messages", response_model=ChatResponse)
 async def create_chat_message(
@@ -286,30 +414,51 @@ async def create_chat_message(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    # Save user message
-    user_message = ChatMessage(
-        content=message.content,
-        user_id=current_user.id,
-        is_ai_response=False
-    )
-    db.add(user_message)
-    db.commit()
-    db.refresh(user_message)
+    # Feelings like "I feel so alone" are answered from cached verses without calling the LLM
+    routed = route_message(db, message.content)
+    
+    # Bounded window of earlier turns
+    history = []
+    if routed is None and CHAT_CONTEXT_ENABLED and message.conversational:
+        await chat_writer.wait_for_user_async(current_user.id)
+        history = conversations.window(db, current_user.id)
+    verses = [routed.verse] if routed else retrieve_verses(db, message.content)
+    
+    # Rows are built now and stored together once the reply exists
+    user_message = new_chat_message(current_user.id, message.content, is_ai_response=False)
     
     # Get AI response
-    ai_response_content = await get_scripture_response(message.content)
-    ai_message = ChatMessage(
-        content=ai_response_content,
-        user_id=current_user.id,
-        is_ai_response=True
+    if routed is not None:
+        ai_response_content = routed.content
+    else:
+        try:
+            if chat_circuit_open():
+                raise AIServiceUnavailable("circuit open")
+            # Only LLM calls pass per-user/global rate limits and bounded concurrency; cached replies are free
+            async with chat_admission_controller.slot(current_user.id):
+                ai_response_content = await get_scripture_response(message.content, history=history, verses=verses)
+        except AIServiceUnavailable:
+            # Provider down or circuit open: answer at once with a relevant cached verse
+            fallback = fallback_reply(db, message.content, verses)
+            if fallback is None:
+                ai_response_content = "I'm experiencing some technical difficulties right now. Please try again in a moment, and I'll do my best to help you with your spiritual inquiry."
+            else:
+                ai_response_content = fallback.content
+                verses = [fallback.verse]
+    ai_message = new_chat_message(current_user.id, ai_response_content, is_ai_response=True)
+    # Write-behind: both rows go to the background writer in one batch, off the response path
+    chat_writer.save(db, user_message, ai_message)
+    conversations.append(
+        current_user.id,
+        Turn(user_message.content, False),
+        Turn(ai_message.content, True)
     )
-    db.add(ai_message)
-    db.commit()
-    db.refresh(ai_message)
     
     return ChatResponse(
         user_message=user_message,
-        ai_message=ai_message
+        ai_message=ai_message,
+        citations=verses,
+        emotion=routed.emotion.name if routed else None
     )
 
 # Journal endpoints
@@ -370,10 +519,13 @@ async def get_current_admin(
 
 # Emotions
 @app.get("/api/krishna-path/emotions", response_model=List[EmotionResponse])
-async def get_emotions(db: Session = Depends(get_db)):
+@query_budget(1)
+async def get_emotions(request: Request, db: Session = Depends(get_db)):
     """Get all active emotions"""
-    emotions = db.query(Emotion).filter(Emotion.is_active == True).all()
-    return emotions
+    def build():
+        emotions = db.query(Emotion).filter(Emotion.is_active == True).all()
+        return dumps([dump_orm(EmotionResponse, emotion) for emotion in emotions])
+    return response_cache.serve(request, cache_key(request), build)
 
 @app.post("/api/krishna-path/emotions", response_model=EmotionResponse)
 async def create_emotion(
@@ -388,6 +540,9 @@ async def create_emotion(
     db.add(db_emotion)
     db.commit()
     db.refresh(db_emotion)
+    emotion_verses.invalidate()
+    verse_payloads.invalidate()
+    response_cache.invalidate()
     return db_emotion
 
 @app.get("/api/krishna-path/admin/emotions", response_model=List[EmotionResponse])
@@ -421,6 +576,9 @@ async def update_emotion(
     
     db.commit()
     db.refresh(db_emotion)
+    emotion_verses.invalidate()
+    verse_payloads.invalidate()
+    response_cache.invalidate()
     return db_emotion
 
 @app.delete("/api/krishna-path/emotions/{emotion_id}")
@@ -451,29 +609,111 @@ async def delete_emotion(
     
     db.delete(db_emotion)
     db.commit()
+    emotion_verses.invalidate()
+    verse_payloads.invalidate()
+    response_cache.invalidate()
+    if verse_count > 0:
+        verse_index.rebuild_in_background(SessionLocal)
     return {"message": f"Emotion deleted successfully{' along with ' + str(verse_count) + ' verses' if verse_count > 0 and force else ''}"}
 
 # Verses
-@app.get("/api/krishna-path/verses/{emotion_id}", response_model=List[VerseWithEmotion])
-async def get_verses_by_emotion(emotion_id: str, db: Session = Depends(get_db)):
-    """Get all verses for a specific emotion"""
-    verses = db.query(Verse).options(selectinload(Verse.emotion)).filter(
-        and_(Verse.emotion_id == emotion_id, Verse.is_active == True)
-    ).all()
-    return verses
+def verse_text_fields(
+    lang: Optional[str] = Query(None, description="Only this language: sanskrit, hindi or english"),
+    fields: Optional[str] = Query(None, description="Comma-separated text fields: sanskrit, hindi, english, explanation")
+) -> Optional[Tuple[str, ...]]:
+    """Text fields a verse endpoint should return (None: the endpoint's default)"""
+    try:
+        return select_fields(lang, fields)
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error))
+
+def verse_response(
+    request: Request, db: Session, verse_id: str, text_fields: Optional[Tuple[str, ...]], active_only: bool = False
+) -> Optional[Response]:
+    """A verse with its emotion and the requested texts, served from the payload cache when possible"""
+    text_fields = text_fields or TEXT_FIELDS
+
+    def build():
+        columns = [getattr(Verse, name) for name in (*SUMMARY_FIELDS, "created_at", *text_fields)]
+        query = db.query(Verse).options(load_only(*columns), joinedload(Verse.emotion)).filter(Verse.id == verse_id)
+        if active_only:
+            query = query.filter(Verse.is_active == True)
+        verse = query.first()
+        if not verse:
+            return None
+        return dumps({**verse_payload(verse, text_fields), "emotion": dump_orm(EmotionResponse, verse.emotion)})
+    return verse_payloads.serve(request, ("verse", verse_id, text_fields, active_only), build)
+
+@app.get("/api/krishna-path/verses/{emotion_id}", response_model=List[VerseSummary])
+@query_budget(1)
+async def get_verses_by_emotion(
+    emotion_id: str,
+    request: Request,
+    text_fields: Optional[Tuple[str, ...]] = Depends(verse_text_fields),
+    db: Session = Depends(get_db)
+):
+    """Get all verses for a specific emotion (list view: English text unless lang/fields ask otherwise)"""
+    text_fields = text_fields or ("english",)
+
+    def build():
+        columns = [getattr(Verse, name) for name in (*SUMMARY_FIELDS, *text_fields)]
+        verses = db.query(Verse).options(load_only(*columns)).filter(
+            and_(Verse.emotion_id == emotion_id, Verse.is_active == True)
+        ).all()
+        return dumps([verse_payload(verse, text_fields, SUMMARY_FIELDS) for verse in verses])
+    return verse_payloads.serve(request, ("list", emotion_id, text_fields), build)
+
+@app.get("/api/krishna-path/verse/{verse_id}", response_model=VerseWithEmotion)
+@query_budget(1)
+async def get_verse(
+    verse_id: str,
+    request: Request,
+    text_fields: Optional[Tuple[str, ...]] = Depends(verse_text_fields),
+    db: Session = Depends(get_db)
+):
+    """Get a single active verse (all texts unless lang/fields ask otherwise)"""
+    response = verse_response(request, db, verse_id, text_fields, active_only=True)
+    if response is None:
+        raise HTTPException(status_code=404, detail="Verse not found")
+    return response
 
 @app.get("/api/krishna-path/verses/{emotion_id}/random", response_model=VerseWithEmotion)
-async def get_random_verse(emotion_id: str, db: Session = Depends(get_db)):
-    """Get a random verse for a specific emotion"""
-    verses = db.query(Verse).options(selectinload(Verse.emotion)).filter(
+@query_budget(3)
+async def get_random_verse(
+    emotion_id: str,
+    request: Request,
+    session_id: Optional[str] = Query(None, description="Walk a non-repeating order of verses for this session"),
+    cursor: int = Query(0, ge=0, description="Position in the session's order; the next one is in X-Verse-Cursor"),
+    text_fields: Optional[Tuple[str, ...]] = Depends(verse_text_fields),
+    db: Session = Depends(get_db)
+):
+    """Get a random verse for a specific emotion (all texts unless lang/fields ask otherwise)"""
+    if session_id:
+        for _ in range(2):
+            emotion = next((entry for entry in emotion_verses.emotions(db).values() if entry.id == emotion_id), None)
+            if emotion is None or not emotion.verses:
+                raise HTTPException(status_code=404, detail="No verses found for this emotion")
+            verse_id = verse_at([verse.id for verse in emotion.verses], session_id, emotion_id, cursor)
+            response = verse_response(request, db, verse_id, text_fields)
+            if response is not None:
+                response.headers["X-Verse-Cursor"] = str(cursor + 1)
+                return response
+            # The cached verse list is stale (verse deleted on another worker): reload it and try again
+            emotion_verses.invalidate()
+        # Still inconsistent: answer like a session-less draw below
+
+    # Pick among ids, then load only the chosen verse's texts
+    verse_ids = [verse_id for (verse_id,) in db.query(Verse.id).filter(
         and_(Verse.emotion_id == emotion_id, Verse.is_active == True)
-    ).all()
+    ).all()]
     
-    if not verses:
+    if not verse_ids:
         raise HTTPException(status_code=404, detail="No verses found for this emotion")
     
-    selected_verse = random.choice(verses)
-    return selected_verse
+    response = verse_response(request, db, random.choice(verse_ids), text_fields)
+    if response is None:
+        raise HTTPException(status_code=404, detail="Verse not found")  # deleted since the id query
+    return response
 
 @app.get("/api/krishna-path/verses/count/{emotion_id}")
 async def get_verse_count_for_emotion(emotion_id: str, db: Session = Depends(get_db)):
@@ -502,9 +742,14 @@ async def create_verse(
     db.add(db_verse)
     db.commit()
     db.refresh(db_verse)
+    verse_index.upsert(db_verse.id, db_verse.english, db_verse.explanation, db_verse.is_active, SessionLocal)
+    emotion_verses.invalidate()
+    verse_payloads.invalidate()
+    response_cache.invalidate()
     return db_verse
 
 @app.get("/api/krishna-path/admin/verses", response_model=List[VerseWithEmotion])
+@query_budget(3)
 async def get_all_verses_admin(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -513,7 +758,7 @@ async def get_all_verses_admin(
     if not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Admin access required")
     verses = db.query(Verse).options(selectinload(Verse.emotion)).all()
-    return verses
+    return trusted_response(VerseWithEmotion, verses)
 
 @app.put("/api/krishna-path/verses/{verse_id}", response_model=VerseResponse)
 async def update_verse(
@@ -542,6 +787,10 @@ async def update_verse(
     
     db.commit()
     db.refresh(db_verse)
+    verse_index.upsert(db_verse.id, db_verse.english, db_verse.explanation, db_verse.is_active, SessionLocal)
+    emotion_verses.invalidate()
+    verse_payloads.invalidate()
+    response_cache.invalidate()
     return db_verse
 
 @app.delete("/api/krishna-path/verses/{verse_id}")
@@ -559,8 +808,39 @@ async def delete_verse(
     
     db.delete(db_verse)
     db.commit()
+    verse_index.remove(verse_id)
+    emotion_verses.invalidate()
+    verse_payloads.invalidate()
+    response_cache.invalidate()
     return {"message": "Verse deleted successfully"}
 
+# Recommendations
+@app.get("/api/krishna-path/recommendations/{emotion_id}", response_model=VerseRecommendations)
+async def get_recommendations(
+    emotion_id: str,
+    request: Request,
+    limit: int = Query(RECOMMENDATIONS_TOP_N, ge=1, le=RECOMMENDATIONS_TOP_N),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Verses for an emotion picked from what users with similar history went on to read, served from memory"""
+    result = recommender.recommend(current_user.id, emotion_id, limit)
+    if result is None and not recommender.available:
+        # Disabled on this worker, or the first build is still running: most-viewed verses for everyone
+        def build():
+            verses = most_viewed_verses(db, emotion_id, limit)
+            if not verses:
+                return None
+            return dumps({"emotion_id": emotion_id, "personalized": False, "verses": verses})
+        response = response_cache.serve(request, cache_key(request), build)
+        if response is None:
+            raise HTTPException(status_code=404, detail="No verses found for this emotion")
+        return response
+    if result is None:
+        raise HTTPException(status_code=404, detail="No verses found for this emotion")
+    verses, personalized = result
+    return {"emotion_id": emotion_id, "personalized": personalized, "verses": verses}
+
 # Interactions (for analytics)
 @app.post("/api/krishna-path/interactions", response_model=InteractionResponse)
 async def create_interaction(
@@ -623,11 +903,11 @@ async def get_dashboard_stats(
     ).join(Interaction).group_by(Emotion.id, Emotion.display_name).order_by(desc('count')).limit(5).all()
     
     # Recent interactions
-    recent_interactions = db.query(Interaction).options(
+    recent_interactions = newest(db.query(Interaction).options(
         selectinload(Interaction.emotion),
         selectinload(Interaction.verse),
         selectinload(Interaction.user)
-    ).order_by(desc(Interaction.created_at)).limit(10).all()
+    ), Interaction.created_at, 10)
     
     return DashboardStats(
         total_interactions=total_interactions or 0,
@@ -661,7 +941,7 @@ async def seed_initial_data():
         emotions = []
         for emotion_data in emotions_data:
             emotion = Emotion(
-                id=str(uuid.uuid4()),
+                id=generate_uuid(),
                 **emotion_data
             )
             db.add(emotion)
@@ -679,7 +959,7 @@ async def seed_initial_data():
         for verse_data in verses_data:
             emotion = emotion_lookup[verse_data["emotion_name"]]
             verse = Verse(
-                id=str(uuid.uuid4()),
+                id=generate_uuid(),
                 emotion_id=emotion.id,
                 sanskrit=verse_data["sanskrit"],
                 hindi=verse_data["hindi"],
@@ -692,7 +972,7 @@ async def seed_initial_data():
         
         # Create default admin user (in User table, not Admin table)
         admin_user = User(
-            id=str(uuid.uuid4()),
+            id=generate_uuid(),
             username="admin",
             name="Administrator", 
             password=get_password_hash("krishna123"),
@@ -710,14 +990,45 @@ async def seed_initial_data():
     finally:
         db.close()
 
+daily_wisdom_job = DailyWisdomJob(SessionLocal, generate_daily_wisdom_candidate)
+retention_job = RetentionJob(engine, SessionLocal)
+
 @app.on_event("startup")
 async def startup_event():
+    static_assets.load()
     await seed_initial_data()
+    # Verse retrieval index: build once in the background if none exists yet
+    if not verse_index.load():
+        verse_index.rebuild_in_background(SessionLocal)
+    # Background chat writer; replays messages journaled by a previous process first
+    chat_writer.start(SessionLocal)
+    # Keep a pool of generated thoughts of the day scheduled ahead, off the request path
+    if DAILY_WISDOM_ENABLED:
+        daily_wisdom_job.start()
+    # Background admin jobs; picks up jobs still queued from a previous run
+    job_runner.start(SessionLocal)
+    # Monthly partitions ahead of time, and archival of interactions/chat messages past retention
+    if RETENTION_ENABLED:
+        retention_job.start()
+    # Verse recommendations: full build now, then incremental refreshes from new interactions
+    if RECOMMENDATIONS_ENABLED:
+        recommender.start(SessionLocal)
+    await feed_hub.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await feed_hub.stop()
+    daily_wisdom_job.stop()
+    retention_job.stop()
+    recommender.stop()
+    job_runner.stop()
+    chat_writer.stop()
 
 # ==================== ADMIN API ENDPOINTS ====================
 
 # Admin Dashboard
 @app.get("/api/admin/dashboard", response_model=AdminDashboardStats)
+@query_budget(30)
 async def get_admin_dashboard(
     admin: User = Depends(get_admin_user),
     db: Session = Depends(get_db)
@@ -765,14 +1076,14 @@ async def get_admin_dashboard(
     ).join(Interaction).group_by(Emotion.id, Emotion.display_name).order_by(desc('count')).limit(5).all()
     
     # Recent interactions - filter out interactions with null emotion or verse
-    recent_interactions = db.query(Interaction).options(
+    recent_interactions = newest(db.query(Interaction).options(
         selectinload(Interaction.emotion),
         selectinload(Interaction.verse),
         selectinload(Interaction.user)
     ).filter(
         Interaction.emotion_id.isnot(None),
         Interaction.verse_id.isnot(None)
-    ).order_by(desc(Interaction.created_at)).limit(10).all()
+    ), Interaction.created_at, 10)
     
     # Additional safety check - only include interactions with valid emotion and verse
     valid_interactions = [
@@ -790,10 +1101,12 @@ async def get_admin_dashboard(
     )
     
     # Recent posts with authors
-    recent_posts = db.query(Post).options(selectinload(Post.author)).order_by(desc(Post.created_at)).limit(5).all()
+    recent_posts = db.query(Post).order_by(desc(Post.created_at)).limit(5).all()
+    comment_counts = get_comment_counts(db, [post.id for post in recent_posts])
+    authors = author_cache.get_many(db, (post.author_id for post in recent_posts))
     recent_posts_with_comments = []
     for post in recent_posts:
-        comment_count = db.query(func.count(Comment.id)).filter(Comment.post_id == post.id).scalar()
+        comment_count = comment_counts.get(post.id, 0)
         post_dict = {
             "id": post.id,
             "title": post.title,
@@ -803,20 +1116,16 @@ async def get_admin_dashboard(
             "video_url": post.video_url,
             "likes": post.likes,
             "created_at": post.created_at,
-            "author": post.author,
+            "author": authors.get(post.author_id),
             "comments": comment_count or 0
         }
         recent_posts_with_comments.append(post_dict)
     
     # Recent users with statistics
     recent_users = db.query(User).order_by(desc(User.created_at)).limit(5).all()
+    user_counts = get_user_content_counts(db, [user.id for user in recent_users])
     recent_users_with_stats = []
     for user in recent_users:
-        posts_count = db.query(func.count(Post.id)).filter(Post.author_id == user.id).scalar()
-        comments_count = db.query(func.count(Comment.id)).filter(Comment.author_id == user.id).scalar()
-        chat_messages_count = db.query(func.count(ChatMessage.id)).filter(ChatMessage.user_id == user.id).scalar()
-        journal_entries_count = db.query(func.count(JournalEntry.id)).filter(JournalEntry.author_id == user.id).scalar()
-        
         user_dict = {
             "id": user.id,
             "username": user.username,
@@ -825,10 +1134,7 @@ async def get_admin_dashboard(
             "is_active": user.is_active,
             "last_login": user.last_login,
             "created_at": user.created_at,
-            "posts_count": posts_count or 0,
-            "comments_count": comments_count or 0,
-            "chat_messages_count": chat_messages_count or 0,
-            "journal_entries_count": journal_entries_count or 0
+            **user_counts[user.id]
         }
         recent_users_with_stats.append(user_dict)
     
@@ -841,6 +1147,7 @@ async def get_admin_dashboard(
 
 # User Management Endpoints
 @app.get("/api/admin/users", response_model=List[AdminUserResponse])
+@query_budget(6)
 async def get_all_users(
     admin: User = Depends(get_admin_user),
     db: Session = Depends(get_db),
@@ -868,13 +1175,9 @@ async def get_all_users(
     users = query.order_by(desc(User.created_at)).offset(skip).limit(limit).all()
     
     # Add statistics for each user
+    user_counts = get_user_content_counts(db, [user.id for user in users])
     users_with_stats = []
     for user in users:
-        posts_count = db.query(func.count(Post.id)).filter(Post.author_id == user.id).scalar()
-        comments_count = db.query(func.count(Comment.id)).filter(Comment.author_id == user.id).scalar()
-        chat_messages_count = db.query(func.count(ChatMessage.id)).filter(ChatMessage.user_id == user.id).scalar()
-        journal_entries_count = db.query(func.count(JournalEntry.id)).filter(JournalEntry.author_id == user.id).scalar()
-        
         user_dict = {
             "id": user.id,
             "username": user.username,
@@ -883,10 +1186,7 @@ async def get_all_users(
             "is_active": user.is_active,
             "last_login": user.last_login,
             "created_at": user.created_at,
-            "posts_count": posts_count or 0,
-            "comments_count": comments_count or 0,
-            "chat_messages_count": chat_messages_count or 0,
-            "journal_entries_count": journal_entries_count or 0
+            **user_counts[user.id]
         }
         users_with_stats.append(user_dict)
     
@@ -914,6 +1214,8 @@ async def update_user(
     
     db.commit()
     db.refresh(user)
+    author_cache.invalidate(user.id)
+    response_cache.invalidate()  # scripture pages embed their creator
     
     # Get user statistics
     posts_count = db.query(func.count(Post.id)).filter(Post.author_id == user.id).scalar()
@@ -937,6 +1239,7 @@ async def update_user(
 
 # Content Moderation Endpoints
 @app.get("/api/admin/posts", response_model=List[PostWithAuthor])
+@query_budget(4)
 async def get_all_posts_admin(
     admin: User = Depends(get_admin_user),
     db: Session = Depends(get_db),
@@ -945,7 +1248,7 @@ async def get_all_posts_admin(
     search: Optional[str] = None
 ):
     """Get all posts for moderation"""
-    query = db.query(Post).options(selectinload(Post.author))
+    query = db.query(Post)
     
     if search:
         query = query.filter(
@@ -954,10 +1257,12 @@ async def get_all_posts_admin(
         )
     
     posts = query.order_by(desc(Post.created_at)).offset(skip).limit(limit).all()
+    comment_counts = get_comment_counts(db, [post.id for post in posts])
+    authors = author_cache.get_many(db, (post.author_id for post in posts))
     
     result = []
     for post in posts:
-        comment_count = db.query(func.count(Comment.id)).filter(Comment.post_id == post.id).scalar()
+        comment_count = comment_counts.get(post.id, 0)
         post_dict = {
             "id": post.id,
             "title": post.title,
@@ -967,7 +1272,7 @@ async def get_all_posts_admin(
             "video_url": post.video_url,
             "likes": post.likes,
             "created_at": post.created_at,
-            "author": post.author,
+            "author": authors.get(post.author_id),
             "comments": comment_count or 0
         }
         result.append(post_dict)
@@ -990,10 +1295,12 @@ async def delete_post_admin(
     # Delete the post
     db.delete(post)
     db.commit()
+    feed_hub.publish_post_deleted(post_id)
     
     return {"message": "Post deleted successfully"}
 
 @app.get("/api/admin/comments", response_model=List[CommentWithAuthor])
+@query_budget(3)
 async def get_all_comments_admin(
     admin: User = Depends(get_admin_user),
     db: Session = Depends(get_db),
@@ -1002,13 +1309,13 @@ async def get_all_comments_admin(
     search: Optional[str] = None
 ):
     """Get all comments for moderation"""
-    query = db.query(Comment).options(selectinload(Comment.author))
+    query = db.query(Comment)
     
     if search:
         query = query.filter(Comment.content.contains(search))
     
     comments = query.order_by(desc(Comment.created_at)).offset(skip).limit(limit).all()
-    return comments
+    return trusted_response(CommentWithAuthor, with_authors(db, comments))
 
 @app.delete("/api/admin/comments/{comment_id}")
 async def delete_comment_admin(
@@ -1028,6 +1335,7 @@ async def delete_comment_admin(
 
 # Chat Messages Management
 @app.get("/api/admin/chat-messages", response_model=List[ChatMessageWithUser])
+@query_budget(3)
 async def get_all_chat_messages_admin(
     admin: User = Depends(get_admin_user),
     db: Session = Depends(get_db),
@@ -1036,13 +1344,14 @@ async def get_all_chat_messages_admin(
     user_id: Optional[str] = None
 ):
     """Get all chat messages for monitoring"""
+    await chat_writer.wait_for_user_async(user_id)
     query = db.query(ChatMessage).options(selectinload(ChatMessage.user))
     
     if user_id:
         query = query.filter(ChatMessage.user_id == user_id)
     
     messages = query.order_by(desc(ChatMessage.created_at)).offset(skip).limit(limit).all()
-    return messages
+    return trusted_response(ChatMessageWithUser, messages)
 
 # Journal Entries Management  
 @app.get("/api/admin/journal-entries", response_model=List[JournalEntryResponse])
@@ -1078,14 +1387,195 @@ async def delete_journal_entry_admin(
     
     return {"message": "Journal entry deleted successfully"}
 
+# Data Export
+@app.get("/api/admin/export/{dataset}")
+async def export_admin_data(
+    dataset: str,
+    admin: User = Depends(get_admin_user),
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    user_id: Optional[str] = None
+):
+    """Stream chat messages, journal entries or interactions as NDJSON or CSV (created_at in [start, end))"""
+    if dataset not in EXPORTS:
+        raise HTTPException(status_code=404, detail=f"Unknown export '{dataset}'. Available: {', '.join(EXPORTS)}")
+    if dataset == "chat_messages":
+        await chat_writer.wait_for_user_async(user_id)
+    filename = f"{dataset}-{datetime.utcnow():%Y%m%d-%H%M%S}.{export_format}"
+    return StreamingResponse(
+        stream_export(SessionLocal, dataset, export_format, start=start, end=end, user_id=user_id),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+# Background Jobs
+def delete_in_batches(ctx: JobContext, model, *criteria) -> int:
+    """Delete matching rows JOB_BATCH_SIZE at a time, committing and reporting progress per batch"""
+    deleted = 0
+    while True:
+        ids = [row_id for (row_id,) in ctx.db.query(model.id).filter(*criteria).limit(JOB_BATCH_SIZE).all()]
+        if not ids:
+            return deleted
+        ctx.db.query(model).filter(model.id.in_(ids)).delete(synchronize_session=False)
+        ctx.db.commit()
+        deleted += len(ids)
+        ctx.advance(len(ids))
+
+@job_runner.handler("delete_emotion")
+def run_delete_emotion(ctx: JobContext, params: dict) -> dict:
+    emotion_id = params["emotion_id"]
+    # Interactions reference both the emotion and its verses, so they have to go first
+    interaction_filter = or_(
+        Interaction.emotion_id == emotion_id,
+        Interaction.verse_id.in_(ctx.db.query(Verse.id).filter(Verse.emotion_id == emotion_id).scalar_subquery())
+    )
+    ctx.set_total(
+        ctx.db.query(Interaction).filter(interaction_filter).count()
+        + ctx.db.query(Verse).filter(Verse.emotion_id == emotion_id).count()
+    )
+    interactions = delete_in_batches(ctx, Interaction, interaction_filter)
+    verses = delete_in_batches(ctx, Verse, Verse.emotion_id == emotion_id)
+    ctx.db.query(Emotion).filter(Emotion.id == emotion_id).delete(synchronize_session=False)
+    ctx.db.commit()
+    emotion_verses.invalidate()
+    verse_payloads.invalidate()
+    response_cache.invalidate()
+    if verses:
+        verse_index.rebuild_in_background(SessionLocal)
+    return {"verses_deleted": verses, "interactions_deleted": interactions}
+
+@job_runner.handler("delete_post")
+def run_delete_post(ctx: JobContext, params: dict) -> dict:
+    post_id = params["post_id"]
+    ctx.set_total(ctx.db.query(Comment).filter(Comment.post_id == post_id).count())
+    comments = delete_in_batches(ctx, Comment, Comment.post_id == post_id)
+    ctx.db.query(Post).filter(Post.id == post_id).delete(synchronize_session=False)
+    ctx.db.commit()
+    feed_hub.publish_post_deleted(post_id)
+    return {"comments_deleted": comments}
+
+@job_runner.handler("import_verses")
+def run_import_verses(ctx: JobContext, params: dict) -> dict:
+    verses = params["verses"]
+    ctx.set_total(len(verses))
+    emotions = ctx.db.query(Emotion.id, Emotion.name).all()
+    emotion_ids = {emotion_id for emotion_id, _ in emotions}
+    by_name = {name.lower(): emotion_id for emotion_id, name in emotions}
+    imported, skipped = 0, []
+    for start in range(0, len(verses), JOB_BATCH_SIZE):
+        rows = []
+        for position, item in enumerate(verses[start:start + JOB_BATCH_SIZE], start):
+            item = dict(item)
+            emotion_id = item.pop("emotion_id", None)
+            emotion_name = item.pop("emotion_name", None)
+            if emotion_id not in emotion_ids:
+                emotion_id = by_name.get((emotion_name or "").lower())
+            if emotion_id is None:
+                skipped.append(position)
+                continue
+            rows.append({**item, "id": generate_uuid(), "emotion_id": emotion_id})
+        if rows:
+            ctx.db.bulk_insert_mappings(Verse, rows)
+            ctx.db.commit()
+            imported += len(rows)
+        ctx.advance(min(JOB_BATCH_SIZE, len(verses) - start))
+    if imported:
+        emotion_verses.invalidate()
+        verse_payloads.invalidate()
+        response_cache.invalidate()
+        verse_index.rebuild_in_background(SessionLocal)
+    return {"imported": imported, "skipped": skipped}
+
+@app.post("/api/admin/jobs/delete-emotion/{emotion_id}", response_model=JobResponse, status_code=202)
+async def submit_delete_emotion_job(
+    emotion_id: str,
+    admin: User = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Delete an emotion with all its verses and interactions in the background"""
+    if not db.query(Emotion.id).filter(Emotion.id == emotion_id).first():
+        raise HTTPException(status_code=404, detail="Emotion not found")
+    return job_runner.submit(db, "delete_emotion", {"emotion_id": emotion_id}, admin.id)
+
+@app.post("/api/admin/jobs/delete-post/{post_id}", response_model=JobResponse, status_code=202)
+async def submit_delete_post_job(
+    post_id: str,
+    admin: User = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Delete a post and all its comments in the background"""
+    if not db.query(Post.id).filter(Post.id == post_id).first():
+        raise HTTPException(status_code=404, detail="Post not found")
+    return job_runner.submit(db, "delete_post", {"post_id": post_id}, admin.id)
+
+@app.post("/api/admin/jobs/import-verses", response_model=JobResponse, status_code=202)
+async def submit_import_verses_job(
+    payload: VerseImport,
+    admin: User = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Bulk import verses in the background (each needs an emotion_id or emotion_name)"""
+    if not payload.verses:
+        raise HTTPException(status_code=400, detail="No verses to import")
+    return job_runner.submit(db, "import_verses", payload.dict(), admin.id)
+
+@app.get("/api/admin/jobs", response_model=List[JobResponse])
+async def get_jobs(
+    admin: User = Depends(get_admin_user),
+    db: Session = Depends(get_db),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    limit: int = 50
+):
+    """Recent background jobs, newest first"""
+    query = db.query(Job)
+    if status_filter:
+        query = query.filter(Job.status == status_filter)
+    return query.order_by(desc(Job.created_at)).limit(limit).all()
+
+@app.get("/api/admin/jobs/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: str,
+    admin: User = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Poll a background job's status and progress"""
+    job = db.query(Job).filter(Job.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
 # Thought of the Day routes
+def pick_next_thought(db: Session, today, exclude_id: Optional[str] = None) -> Optional[ThoughtOfTheDay]:
+    """The thought scheduled for today, else a random active thought not scheduled for a later day"""
+    scheduled = db.query(ThoughtOfTheDay).filter(
+        and_(ThoughtOfTheDay.is_active == True, ThoughtOfTheDay.target_date == today)
+    ).first()
+    if scheduled:
+        return scheduled
+    query = db.query(ThoughtOfTheDay).filter(
+        and_(
+            ThoughtOfTheDay.is_active == True,
+            or_(ThoughtOfTheDay.target_date == None, ThoughtOfTheDay.target_date < today)
+        )
+    )
+    if exclude_id:
+        query = query.filter(ThoughtOfTheDay.id != exclude_id)
+    thoughts = query.all()
+    return random.choice(thoughts) if thoughts else None
+
 @app.get("/api/thought-of-the-day/current", response_model=ThoughtOfTheDayResponse)
 async def get_current_thought(db: Session = Depends(get_db)):
     """Get the current featured thought of the day with automatic rotation"""
     from datetime import datetime, date, timedelta
     
-    # Check if there's a featured thought for today
     today = date.today()
+    cached = daily_thoughts.get(today)
+    if cached is not None:
+        return cached
+    generation = daily_thoughts.generation()
+    
+    # Check if there's a featured thought for today
     featured_thought = db.query(ThoughtOfTheDay).filter(
         and_(
             ThoughtOfTheDay.is_featured == True, 
@@ -1097,32 +1587,22 @@ async def get_current_thought(db: Session = Depends(get_db)):
     if featured_thought:
         last_update = featured_thought.updated_at.date() if featured_thought.updated_at else featured_thought.created_at.date()
         if today > last_update:
-            # More than 24 hours, rotate to a new thought
-            db.query(ThoughtOfTheDay).filter(ThoughtOfTheDay.id == featured_thought.id).update(
-                {"is_featured": False}
-            )
-            
-            # Get next available active thought
-            next_thoughts = db.query(ThoughtOfTheDay).filter(
-                and_(
-                    ThoughtOfTheDay.is_active == True,
-                    ThoughtOfTheDay.id != featured_thought.id
+            # More than 24 hours, rotate to a new thought (today's scheduled one if the pool has it)
+            new_featured = pick_next_thought(db, today, exclude_id=featured_thought.id)
+            if new_featured:
+                db.query(ThoughtOfTheDay).filter(ThoughtOfTheDay.id == featured_thought.id).update(
+                    {"is_featured": False}
                 )
-            ).all()
-            
-            if next_thoughts:
-                new_featured = random.choice(next_thoughts)
                 db.query(ThoughtOfTheDay).filter(ThoughtOfTheDay.id == new_featured.id).update(
                     {"is_featured": True}
                 )
                 db.commit()
                 featured_thought = new_featured
     
-    # If no featured thought, get a random active thought and feature it
+    # If no featured thought, pick one and feature it
     if not featured_thought:
-        thoughts = db.query(ThoughtOfTheDay).filter(ThoughtOfTheDay.is_active == True).all()
-        if thoughts:
-            featured_thought = random.choice(thoughts)
+        featured_thought = pick_next_thought(db, today)
+        if featured_thought:
             db.query(ThoughtOfTheDay).filter(ThoughtOfTheDay.id == featured_thought.id).update(
                 {"is_featured": True}
             )
@@ -1131,7 +1611,10 @@ async def get_current_thought(db: Session = Depends(get_db)):
     if not featured_thought:
         raise HTTPException(status_code=404, detail="No thoughts available")
     
-    return featured_thought
+    db.refresh(featured_thought)
+    payload = ThoughtOfTheDayResponse.model_validate(featured_thought)
+    daily_thoughts.set(today, payload, generation)
+    return payload
 
 @app.get("/api/thought-of-the-day", response_model=List[ThoughtOfTheDayResponse])
 async def get_all_thoughts(
@@ -1173,6 +1656,7 @@ async def create_thought(
     db.add(db_thought)
     db.commit()
     db.refresh(db_thought)
+    daily_thoughts.invalidate()
     return db_thought
 
 @app.get("/api/admin/thought-of-the-day", response_model=List[ThoughtOfTheDayWithCreator])
@@ -1219,6 +1703,7 @@ async def update_thought(
     
     db.commit()
     db.refresh(thought)
+    daily_thoughts.invalidate()
     return thought
 
 @app.delete("/api/admin/thought-of-the-day/{thought_id}")
@@ -1237,6 +1722,7 @@ async def delete_thought(
     
     db.delete(thought)
     db.commit()
+    daily_thoughts.invalidate()
     return {"message": "Thought deleted successfully"}
 
 @app.put("/api/admin/thought-of-the-day/{thought_id}/feature")
@@ -1263,41 +1749,77 @@ async def feature_thought(
         {"is_featured": True}
     )
     db.commit()
+    daily_thoughts.invalidate()
     
     return {"message": "Thought featured successfully"}
 
 # Scripture routes
-@app.get("/api/scriptures", response_model=List[ScriptureResponse])
+@app.get("/api/scriptures", response_model=List[ScriptureSummary])
+@query_budget(1)
 async def get_scriptures(
+    request: Request,
     db: Session = Depends(get_db),
     active_only: bool = True
 ):
-    """Get all scriptures ordered by order_index"""
-    query = db.query(Scripture)
-    
-    if active_only:
-        query = query.filter(Scripture.is_active == True)
-    
-    scriptures = query.order_by(Scripture.order_index, Scripture.created_at).all()
-    return scriptures
+    """Get all scriptures ordered by order_index (list view, without the document body)"""
+    def build():
+        query = db.query(Scripture)
+        if active_only:
+            query = query.filter(Scripture.is_active == True)
+        scriptures = query.order_by(Scripture.order_index, Scripture.created_at).all()
+        return dumps([dump_orm(ScriptureSummary, scripture) for scripture in scriptures])
+    return response_cache.serve(request, cache_key(request), build)
 
 @app.get("/api/scriptures/{scripture_id}", response_model=ScriptureWithCreator)
-async def get_scripture(scripture_id: str, db: Session = Depends(get_db)):
+async def get_scripture(scripture_id: str, request: Request, db: Session = Depends(get_db)):
     """Get a specific scripture by ID"""
-    scripture = db.query(Scripture).options(selectinload(Scripture.creator)).filter(Scripture.id == scripture_id).first()
-    if not scripture:
+    def build():
+        scripture = db.query(Scripture).options(undefer_group("body"), selectinload(Scripture.creator)).filter(
+            Scripture.id == scripture_id
+        ).first()
+        return dumps(dump_orm(ScriptureWithCreator, scripture)) if scripture else None
+    response = response_cache.serve(request, cache_key(request), build)
+    if response is None:
         raise HTTPException(status_code=404, detail="Scripture not found")
-    return scripture
+    return response
 
 @app.get("/api/scriptures/slug/{slug}", response_model=ScriptureWithCreator)
-async def get_scripture_by_slug(slug: str, db: Session = Depends(get_db)):
+async def get_scripture_by_slug(slug: str, request: Request, db: Session = Depends(get_db)):
     """Get a specific scripture by slug"""
-    scripture = db.query(Scripture).options(selectinload(Scripture.creator)).filter(
-        and_(Scripture.slug == slug, Scripture.is_active == True)
+    def build():
+        scripture = db.query(Scripture).options(undefer_group("body"), selectinload(Scripture.creator)).filter(
+            and_(Scripture.slug == slug, Scripture.is_active == True)
+        ).first()
+        return dumps(dump_orm(ScriptureWithCreator, scripture)) if scripture else None
+    response = response_cache.serve(request, cache_key(request), build)
+    if response is None:
+        raise HTTPException(status_code=404, detail="Scripture not found")
+    return response
+
+def get_scripture_item(db: Session, scripture_id: str, document, index: int):
+    """One element of a scripture's JSON array, extracted by the database rather than parsing the whole document"""
+    if index < 0:
+        raise HTTPException(status_code=404, detail=f"No item at index {index}")
+    row = db.query(document[index]).filter(
+        and_(Scripture.id == scripture_id, Scripture.is_active == True)
     ).first()
-    if not scripture:
+    if row is None:
         raise HTTPException(status_code=404, detail="Scripture not found")
-    return scripture
+    if row[0] is None:
+        raise HTTPException(status_code=404, detail=f"No item at index {index}")
+    return {"index": index, "item": row[0]}
+
+@app.get("/api/scriptures/{scripture_id}/teachings/{index}")
+@query_budget(1)
+async def get_scripture_teaching(scripture_id: str, index: int, db: Session = Depends(get_db)):
+    """Get a single key teaching of a scripture by position"""
+    return get_scripture_item(db, scripture_id, Scripture.key_teachings, index)
+
+@app.get("/api/scriptures/{scripture_id}/verses/{index}")
+@query_budget(1)
+async def get_scripture_famous_verse(scripture_id: str, index: int, db: Session = Depends(get_db)):
+    """Get a single famous verse of a scripture by position"""
+    return get_scripture_item(db, scripture_id, Scripture.famous_verses, index)
 
 # Admin routes for managing scriptures
 @app.post("/api/admin/scriptures", response_model=ScriptureResponse)
@@ -1332,6 +1854,7 @@ async def create_scripture(
     db.add(db_scripture)
     db.commit()
     db.refresh(db_scripture)
+    response_cache.invalidate()
     
     return db_scripture
 
@@ -1346,7 +1869,7 @@ async def get_all_scriptures_admin(
     if not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    scriptures = db.query(Scripture).options(selectinload(Scripture.creator)).order_by(
+    scriptures = db.query(Scripture).options(undefer_group("body"), selectinload(Scripture.creator)).order_by(
         Scripture.order_index, Scripture.created_at
     ).offset(skip).limit(limit).all()
     
@@ -1363,7 +1886,7 @@ async def update_scripture(
     if not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    scripture = db.query(Scripture).filter(Scripture.id == scripture_id).first()
+    scripture = db.query(Scripture).options(undefer_group("body")).filter(Scripture.id == scripture_id).first()
     if not scripture:
         raise HTTPException(status_code=404, detail="Scripture not found")
     
@@ -1380,6 +1903,7 @@ async def update_scripture(
     scripture.updated_at = func.now()
     db.commit()
     db.refresh(scripture)
+    response_cache.invalidate()
     
     return scripture
 
@@ -1399,6 +1923,7 @@ async def delete_scripture(
     
     db.delete(scripture)
     db.commit()
+    response_cache.invalidate()
     
     return {"message": "Scripture deleted successfully"}
 
@@ -1407,17 +1932,21 @@ async def delete_scripture(
 async def health_check():
     return {"status": "healthy", "service": "Saarthi API"}
 
-# Serve static files and frontend
-@app.get("/assets/{file_path:path}")
-async def serve_assets(file_path: str):
-    return FileResponse(f"dist/public/assets/{file_path}")
+# Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    if METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
 
 # Catch-all route for React SPA - this must be last
 @app.get("/{full_path:path}")
 async def catch_all(full_path: str):
-    # For non-API routes, serve the React app
+    # For non-API routes, serve the React app (index.html is held in memory)
     if not full_path.startswith("api/"):
-        return FileResponse("dist/public/index.html")
+        if static_assets.index is None:
+            raise HTTPException(status_code=404, detail="Frontend build not found")
+        return AssetResponse(static_assets, static_assets.index)
     # If it's an API route that doesn't exist, return 404
     raise HTTPException(status_code=404, detail="API endpoint not found")
 
@@ -0,0 +1,75 @@
+"""
+Migrate interaction and chat message ids to time-ordered UUIDv7
+
+Existing rows keep random UUID4 ids after switching ID_FORMAT to uuid7, so
+their primary key indexes stay scattered. This rewrites those ids to UUIDv7
+derived from each row's created_at (nothing references these ids, so no
+foreign keys need updating). It is resumable: only ids that are not yet
+version 7 are touched, in batches.
+
+    python -m backend.migrate_ids                  # rewrite ids
+    python -m backend.migrate_ids --native-uuid    # then, on Postgres, convert the columns to native uuid
+
+Stop the app first so the chat writer has drained. After --native-uuid, run
+the app with NATIVE_UUID_IDS=true.
+"""
+import argparse
+from datetime import timezone
+
+from sqlalchemy import String, cast, func, text
+
+from .database import SessionLocal, engine
+from .models import ChatMessage, Interaction, uuid7
+
+TABLES = (ChatMessage, Interaction)
+
+
+def rewrite_ids(model, batch_size: int) -> int:
+    """Replace every non-v7 id of `model` with a UUIDv7 for its created_at; returns rows changed"""
+    changed = 0
+    db = SessionLocal()
+    try:
+        while True:
+            rows = db.query(model.id, model.created_at).filter(
+                func.substr(cast(model.id, String), 15, 1) != "7"  # version nibble
+            ).limit(batch_size).all()
+            if not rows:
+                return changed
+            updates = [
+                {"old_id": row_id, "new_id": uuid7(int(created_at.replace(tzinfo=timezone.utc).timestamp() * 1000))}
+                for row_id, created_at in rows
+            ]
+            db.execute(
+                text(f"UPDATE {model.__tablename__} SET id = :new_id WHERE id = :old_id"),
+                updates
+            )
+            db.commit()
+            changed += len(updates)
+            print(f"{model.__tablename__}: {changed} ids rewritten")
+    finally:
+        db.close()
+
+
+def convert_to_native_uuid(model):
+    if engine.dialect.name != "postgresql":
+        print(f"{model.__tablename__}: native uuid columns are only supported on Postgres, skipping")
+        return
+    with engine.begin() as connection:
+        connection.execute(text(f"ALTER TABLE {model.__tablename__} ALTER COLUMN id TYPE uuid USING id::uuid"))
+    print(f"{model.__tablename__}: id column converted to uuid")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rewrite interaction and chat message ids as UUIDv7")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--native-uuid", action="store_true", help="convert the id columns to native uuid (Postgres)")
+    args = parser.parse_args()
+    for model in TABLES:
+        rewrite_ids(model, args.batch_size)
+        if args.native_uuid:
+            convert_to_native_uuid(model)
+    print("Done")
+
+
+if __name__ == "__main__":
+    main()
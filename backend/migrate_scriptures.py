@@ -0,0 +1,57 @@
+"""
+Migrate scripture key_teachings / famous_verses from JSON text to JSON columns
+
+Older databases store both as JSON encoded in TEXT columns. SQLite reads
+those values through the JSON type as they are, once they are valid JSON
+arrays; Postgres needs the columns converted to jsonb. This normalizes every
+value to a JSON array (a non-JSON value becomes a one-element array holding
+the original text), then on Postgres alters the column types.
+
+    python -m backend.migrate_scriptures
+"""
+import json
+
+from sqlalchemy import text
+
+from .database import engine
+
+COLUMNS = ("key_teachings", "famous_verses")
+
+
+def normalize(raw: str) -> str:
+    if raw is None:
+        return "[]"
+    try:
+        value = json.loads(raw)
+    except ValueError:
+        value = [raw]
+    if not isinstance(value, list):
+        value = [value]
+    return json.dumps(value, ensure_ascii=False)
+
+
+def main():
+    with engine.begin() as connection:
+        rows = connection.execute(text(f"SELECT id, {', '.join(COLUMNS)} FROM scriptures")).all()
+        changed = 0
+        for row in rows:
+            if not any(isinstance(getattr(row, column), str) or getattr(row, column) is None for column in COLUMNS):
+                continue  # already converted: the driver returns parsed JSON
+            values = {column: normalize(getattr(row, column)) for column in COLUMNS}
+            if any(values[column] != getattr(row, column) for column in COLUMNS):
+                connection.execute(
+                    text(f"UPDATE scriptures SET {', '.join(f'{column} = :{column}' for column in COLUMNS)} WHERE id = :id"),
+                    {**values, "id": row.id}
+                )
+                changed += 1
+        print(f"scriptures: {changed} of {len(rows)} rows normalized")
+        if engine.dialect.name == "postgresql":
+            for column in COLUMNS:
+                connection.execute(text(
+                    f"ALTER TABLE scriptures ALTER COLUMN {column} TYPE jsonb USING {column}::jsonb"
+                ))
+            print("scriptures: key_teachings and famous_verses converted to jsonb")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,52 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Text, DateTime, Date, func
-from sqlalchemy.orm import relationship
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, JSON, String, Text, DateTime, Date, Uuid, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import deferred, relationship
 from .database import Base
+import os
+import secrets
+import threading
+import time
 import uuid
 
+# uuid7 (default): time-ordered ids, so new rows append to the right edge of primary key indexes
+# uuid4: fully random ids, as before
+ID_FORMAT = os.getenv("ID_FORMAT", "uuid7").lower()
+# Store interaction and chat message ids as native 16-byte UUIDs on Postgres
+# (run `python -m backend.migrate_ids --native-uuid` first); other tables keep strings
+NATIVE_UUID_IDS = os.getenv("NATIVE_UUID_IDS", "false").lower() == "true"
+
+_uuid7_lock = threading.Lock()
+_uuid7_last_ms = 0
+_uuid7_sequence = 0
+
+def uuid7(timestamp_ms=None):
+    """Time-ordered UUID (RFC 9562 version 7): 48-bit ms timestamp, 12-bit sequence, 62 random bits"""
+    global _uuid7_last_ms, _uuid7_sequence
+    if timestamp_ms is None:
+        with _uuid7_lock:
+            timestamp_ms = time.time_ns() // 1_000_000
+            if timestamp_ms > _uuid7_last_ms:
+                _uuid7_last_ms, _uuid7_sequence = timestamp_ms, secrets.randbits(11)
+            else:
+                # Same millisecond (or clock stepped back): keep ids strictly increasing in this process
+                _uuid7_sequence += 1
+                if _uuid7_sequence > 0xFFF:
+                    _uuid7_last_ms, _uuid7_sequence = _uuid7_last_ms + 1, 0
+                timestamp_ms = _uuid7_last_ms
+            sequence = _uuid7_sequence
+    else:
+        sequence = secrets.randbits(12)
+    value = (timestamp_ms & 0xFFFFFFFFFFFF) << 80 | 0x7 << 76 | sequence << 64 | 0b10 << 62 | secrets.randbits(62)
+    return str(uuid.UUID(int=value))
+
 def generate_uuid():
-    return str(uuid.uuid4())
+    return uuid7() if ID_FORMAT == "uuid7" else str(uuid.uuid4())
+
+# Structured documents: JSONB on Postgres, JSON1 text elsewhere
+JSONDocument = JSON().with_variant(JSONB(), "postgresql")
+
+# Primary key type for the high-volume append-only tables
+HighVolumeId = String().with_variant(Uuid(as_uuid=False), "postgresql") if NATIVE_UUID_IDS else String
 
 class User(Base):
     __tablename__ = "users"
@@ -53,7 +95,7 @@ class Comment(Base):
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
 
-    id = Column(String, primary_key=True, default=generate_uuid)
+    id = Column(HighVolumeId, primary_key=True, default=generate_uuid)
     content = Column(Text, nullable=False)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
     is_ai_response = Column(Boolean, default=False, nullable=False)
@@ -61,6 +103,10 @@ class ChatMessage(Base):
 
     user = relationship("User", back_populates="chat_messages")
 
+    __table_args__ = (
+        Index("ix_chat_messages_user_created", "user_id", "created_at"),
+    )
+
 class JournalEntry(Base):
     __tablename__ = "journal_entries"
 
@@ -116,7 +162,7 @@ class Admin(Base):
 class Interaction(Base):
     __tablename__ = "interactions"
     
-    id = Column(String, primary_key=True, default=generate_uuid)
+    id = Column(HighVolumeId, primary_key=True, default=generate_uuid)
     user_id = Column(String, ForeignKey("users.id"), nullable=True)  # Can be anonymous
     emotion_id = Column(String, ForeignKey("emotions.id"), nullable=False)
     verse_id = Column(String, ForeignKey("verses.id"), nullable=False)
@@ -146,6 +192,13 @@ class ThoughtOfTheDay(Base):
     
     creator = relationship("User")
 
+    __table_args__ = (
+        # One generated thought per day, however many workers refill the pool (see daily_wisdom.py)
+        Index("ux_thoughts_generated_date", "category", "target_date", unique=True,
+              postgresql_where=text("category = 'daily_wisdom'"),
+              sqlite_where=text("category = 'daily_wisdom'")),
+    )
+
 class Scripture(Base):
     __tablename__ = "scriptures"
     
@@ -155,13 +208,36 @@ class Scripture(Base):
     slug = Column(String, unique=True, nullable=False)  # URL-friendly identifier
     icon = Column(String, nullable=False)  # Icon name or class
     color = Column(String, nullable=False)  # Color class for UI
-    introduction = Column(Text, nullable=False)
-    key_teachings = Column(Text, nullable=False)  # JSON string of teachings array
-    famous_verses = Column(Text, nullable=False)  # JSON string of verses array
+    # Document body: only loaded by detail views (undefer_group("body")), never by listings
+    introduction = deferred(Column(Text, nullable=False), group="body")
+    key_teachings = deferred(Column(JSONDocument, nullable=False), group="body")  # Array of teachings
+    famous_verses = deferred(Column(JSONDocument, nullable=False), group="body")  # Array of verses
     is_active = Column(Boolean, default=True, nullable=False)
     order_index = Column(Integer, default=0, nullable=False)  # For ordering display
     created_by = Column(String, ForeignKey("users.id"), nullable=True)  # Admin who created it
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
     
-    creator = relationship("User")
\ No newline at end of file
+    creator = relationship("User")
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(String, primary_key=True, default=generate_uuid)
+    kind = Column(String, nullable=False)  # Registered handler name, e.g. "delete_emotion"
+    status = Column(String, default="queued", nullable=False)  # queued, running, succeeded, failed
+    params = Column(JSON, nullable=False)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    processed = Column(Integer, default=0, nullable=False)  # Progress: items done so far
+    total = Column(Integer, nullable=True)  # Progress: items expected, when known
+    created_by = Column(String, ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    worker_id = Column(String, nullable=True)  # Process running the job (host:pid:nonce)
+    heartbeat_at = Column(DateTime, nullable=True)  # Refreshed by that process while the job runs
+
+    __table_args__ = (
+        Index("ix_jobs_status_created", "status", "created_at"),
+    )
@@ -0,0 +1,140 @@
+"""
+Per-request SQL query budget and N+1 detector
+
+Enabled with QUERY_BUDGET_MODE:
+  off   - no tracking (default, production)
+  warn  - count statements, log duplicates and budget overruns
+  raise - like warn, but a request that exceeds its budget gets a 500
+          response so tests fail loudly
+"""
+import json
+import os
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+
+from sqlalchemy import event
+
+QUERY_BUDGET_MODE = os.getenv("QUERY_BUDGET_MODE", "off").lower()
+QUERY_BUDGET_DEFAULT = int(os.getenv("QUERY_BUDGET_DEFAULT", "0")) or None
+
+_statements: ContextVar[Optional[List[str]]] = ContextVar("saarthi_query_statements", default=None)
+
+_WHITESPACE = re.compile(r"\s+")
+_IN_LIST = re.compile(r"IN \((?:\?|%\(\w+\)s|:\w+)(?:, (?:\?|%\(\w+\)s|:\w+))*\)")
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+
+
+class QueryBudgetExceeded(Exception):
+    def __init__(self, route: str, budget: int, statements: List[str]):
+        self.route = route
+        self.budget = budget
+        self.statements = statements
+        super().__init__(f"{route} executed {len(statements)} queries (budget {budget})")
+
+
+def query_budget(max_queries: int):
+    """Declare the maximum number of SQL statements a route may execute"""
+    def decorator(endpoint):
+        endpoint.__query_budget__ = max_queries
+        return endpoint
+    return decorator
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize a statement so repeated executions with different values compare equal"""
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _IN_LIST.sub("IN (?)", shape)
+    return _LITERALS.sub("?", shape)
+
+
+def duplicate_shapes(statements: List[str], threshold: int = 2):
+    """Statement shapes executed at least `threshold` times, most frequent first"""
+    counts = Counter(statement_shape(statement) for statement in statements)
+    return [(shape, count) for shape, count in counts.most_common() if count >= threshold]
+
+
+@contextmanager
+def count_queries():
+    """Collect the statements executed inside the block (for tests and scripts)"""
+    statements: List[str] = []
+    token = _statements.set(statements)
+    try:
+        yield statements
+    finally:
+        _statements.reset(token)
+
+
+def instrument_engine(engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements = _statements.get()
+        if statements is not None:
+            statements.append(statement)
+
+
+def _report(route: str, statements: List[str], budget: Optional[int]):
+    duplicates = duplicate_shapes(statements)
+    if budget is not None and len(statements) > budget:
+        print(f"Query budget exceeded: {route} executed {len(statements)} queries (budget {budget})")
+    for shape, count in duplicates:
+        print(f"Possible N+1 in {route}: {count}x {shape[:200]}")
+
+
+class QueryBudgetMiddleware:
+    """Pure ASGI middleware enforcing declared query budgets per route"""
+
+    def __init__(self, app, mode: str = QUERY_BUDGET_MODE, default_budget: Optional[int] = QUERY_BUDGET_DEFAULT):
+        self.app = app
+        self.mode = mode
+        self.default_budget = default_budget
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.mode not in ("warn", "raise"):
+            await self.app(scope, receive, send)
+            return
+
+        statements: List[str] = []
+        token = _statements.set(statements)
+        violation: Optional[QueryBudgetExceeded] = None
+
+        async def send_wrapper(message):
+            nonlocal violation
+            if message["type"] == "http.response.start":
+                route = scope.get("route")
+                route_path = getattr(route, "path", scope.get("path", ""))
+                endpoint = getattr(route, "endpoint", None)
+                budget = getattr(endpoint, "__query_budget__", self.default_budget)
+                _report(route_path, statements, budget)
+                if budget is not None and len(statements) > budget and self.mode == "raise":
+                    violation = QueryBudgetExceeded(route_path, budget, list(statements))
+                    return
+                headers = list(message.get("headers", []))
+                headers.append((b"x-query-count", str(len(statements)).encode()))
+                message = {**message, "headers": headers}
+            elif violation is not None:
+                return
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _statements.reset(token)
+
+        if violation is not None:
+            await _send_violation(send, violation)
+
+
+async def _send_violation(send, violation: QueryBudgetExceeded):
+    body = json.dumps({
+        "detail": str(violation),
+        "duplicates": [{"statement": shape, "count": count} for shape, count in duplicate_shapes(violation.statements)],
+    }).encode()
+    await send({
+        "type": "http.response.start",
+        "status": 500,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,238 @@
+"""
+Token-bucket rate limiting and admission control for expensive routes
+
+Each admitted request must pass a per-user bucket, a global bucket and a
+bounded concurrency queue. Rejections are immediate 429s with Retry-After.
+Buckets live in process memory by default; set RATE_LIMIT_REDIS_URL (and
+install redis) to share them across workers. The concurrency queue is
+always per worker.
+"""
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
+
+from .metrics import REGISTRY, Counter, Gauge
+
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:
+    redis_asyncio = None
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL")
+
+admission_total = REGISTRY.register(Counter(
+    "saarthi_admission_total", "Admission decisions by limiter and outcome",
+    ("limiter", "outcome")))
+admission_queue_depth = REGISTRY.register(Gauge(
+    "saarthi_admission_queue_depth", "Requests waiting for a concurrency slot",
+    ("limiter",)))
+
+
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def take(self, cost: float = 1.0) -> Tuple[bool, float]:
+        """Try to take `cost` tokens; returns (allowed, seconds until allowed)"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return True, 0.0
+        return False, (cost - self.tokens) / self.rate
+
+
+class InMemoryBucketStore:
+    """Buckets keyed by name, with idle buckets evicted past `max_keys`"""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, rate: float, capacity: float, cost: float = 1.0) -> Tuple[bool, float]:
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(rate, capacity)
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            return bucket.take(cost)
+
+    async def refund(self, key: str, rate: float, capacity: float, cost: float = 1.0):
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.tokens = min(capacity, bucket.tokens + cost)
+
+
+_REDIS_TOKEN_BUCKET = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry = 0
+if tokens >= cost then
+  tokens = math.min(capacity, tokens - cost)
+  allowed = 1
+else
+  retry = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(retry)}
+"""
+
+
+class RedisBucketStore:
+    """Buckets shared across workers; falls back to local buckets if Redis is unreachable"""
+
+    def __init__(self, url: str, prefix: str = "saarthi:rl:"):
+        self.client = redis_asyncio.from_url(url)
+        self.prefix = prefix
+        self.script = self.client.register_script(_REDIS_TOKEN_BUCKET)
+        self.fallback = InMemoryBucketStore()
+
+    async def take(self, key: str, rate: float, capacity: float, cost: float = 1.0) -> Tuple[bool, float]:
+        try:
+            allowed, retry = await self.script(keys=[self.prefix + key], args=[rate, capacity, cost])
+            return bool(int(allowed)), float(retry)
+        except Exception as error:
+            print(f"Rate limit store error, using local buckets: {error}")
+            return await self.fallback.take(key, rate, capacity, cost)
+
+    async def refund(self, key: str, rate: float, capacity: float, cost: float = 1.0):
+        """Give back tokens taken for a request that was rejected later on (a negative take)"""
+        try:
+            await self.script(keys=[self.prefix + key], args=[rate, capacity, -cost])
+        except Exception as error:
+            print(f"Rate limit store error, refunding local bucket: {error}")
+            await self.fallback.refund(key, rate, capacity, cost)
+
+
+def create_bucket_store():
+    if RATE_LIMIT_REDIS_URL and redis_asyncio is not None:
+        return RedisBucketStore(RATE_LIMIT_REDIS_URL)
+    if RATE_LIMIT_REDIS_URL:
+        print("Warning: RATE_LIMIT_REDIS_URL set but redis is not installed; using in-memory rate limits")
+    return InMemoryBucketStore()
+
+
+def _too_many_requests(detail: str, retry_after: float) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail=detail,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+    )
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        name: str,
+        store,
+        user_rate: float,
+        user_burst: float,
+        global_rate: float,
+        global_burst: float,
+        max_concurrency: int,
+        max_queue: int,
+        max_wait: float,
+        enabled: bool = True,
+    ):
+        self.name = name
+        self.store = store
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.global_rate = global_rate
+        self.global_burst = global_burst
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.enabled = enabled
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._waiting = 0
+
+    def _reject(self, outcome: str, detail: str, retry_after: float) -> HTTPException:
+        admission_total.inc(limiter=self.name, outcome=outcome)
+        return _too_many_requests(detail, retry_after)
+
+    @asynccontextmanager
+    async def slot(self, user_id: Optional[str]):
+        """Admit one request or raise a 429; holds a concurrency slot while active"""
+        if not self.enabled:
+            yield
+            return
+
+        user_key = f"{self.name}:user:{user_id}"
+        allowed, retry_after = await self.store.take(user_key, self.user_rate, self.user_burst)
+        if not allowed:
+            raise self._reject("user_rate_limited", "You're sending messages too quickly. Please wait a moment.", retry_after)
+        try:
+            await self._acquire()
+        except HTTPException:
+            # Rejected for global load, not for this user's pace: don't charge their own bucket
+            await self.store.refund(user_key, self.user_rate, self.user_burst)
+            raise
+
+        admission_total.inc(limiter=self.name, outcome="admitted")
+        try:
+            yield
+        finally:
+            self._semaphore.release()
+
+    async def _acquire(self):
+        """Pass the global bucket and take a concurrency slot, waiting in the bounded queue if needed"""
+        allowed, retry_after = await self.store.take(f"{self.name}:global", self.global_rate, self.global_burst)
+        if not allowed:
+            raise self._reject("global_rate_limited", "Saarthi is very busy right now. Please try again shortly.", retry_after)
+
+        if self._semaphore.locked():
+            if self._waiting >= self.max_queue:
+                raise self._reject("queue_full", "Saarthi is very busy right now. Please try again shortly.", self.max_wait)
+            self._waiting += 1
+            admission_queue_depth.set(self._waiting, limiter=self.name)
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.max_wait)
+            except asyncio.TimeoutError:
+                raise self._reject("queue_timeout", "Saarthi is very busy right now. Please try again shortly.", self.max_wait)
+            finally:
+                self._waiting -= 1
+                admission_queue_depth.set(self._waiting, limiter=self.name)
+        else:
+            await self._semaphore.acquire()
+
+
+chat_admission_controller = AdmissionController(
+    name="chat",
+    store=create_bucket_store(),
+    user_rate=float(os.getenv("CHAT_USER_RATE_PER_MINUTE", "10")) / 60.0,
+    user_burst=float(os.getenv("CHAT_USER_BURST", "5")),
+    global_rate=float(os.getenv("CHAT_GLOBAL_RATE_PER_SECOND", "5")),
+    global_burst=float(os.getenv("CHAT_GLOBAL_BURST", "20")),
+    max_concurrency=int(os.getenv("CHAT_MAX_CONCURRENCY", "8")),
+    max_queue=int(os.getenv("CHAT_MAX_QUEUE", "32")),
+    max_wait=float(os.getenv("CHAT_MAX_QUEUE_WAIT_SECONDS", "5")),
+    enabled=RATE_LIMIT_ENABLED,
+)
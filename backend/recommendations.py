@@ -0,0 +1,267 @@
+"""
+Personalized verse recommendations from interaction history
+
+Item-item co-occurrence over the verses each signed-in user has been shown:
+counts[i, j] is how many users have seen both verse i and verse j (the
+diagonal holds how many have seen each), and cosine-normalizing it gives
+verse similarity. A user's score for a verse is its summed similarity to the
+verses they have already seen; for every active emotion the best unseen
+verses (topped up with that emotion's most-seen ones) are stored as a
+RECOMMENDATIONS_TOP_N row of verse indices, so serving a request is a
+dictionary lookup.
+
+A background thread rebuilds everything at startup and every
+RECOMMENDATIONS_REBUILD_SECONDS, and in between folds in new interactions
+every RECOMMENDATIONS_REFRESH_SECONDS: only the new (user, verse) pairs
+touch the counts, and only those users' lists are recomputed. Other users'
+lists drift slightly until the next rebuild. Any change to the active verses
+(added, removed or edited) triggers a rebuild. Refreshes build new arrays
+beside the live state and publish them with one reference swap, so requests
+never see half-applied counts.
+
+Every worker process keeps its own copy: a verses x verses float32 matrix,
+plus a set of seen verses and an emotions x top_n int32 array per user with
+history (roughly 100 bytes + 4 * emotions * top_n per user), so for very
+large user bases multiply that by the number of workers. Workers started with
+RECOMMENDATIONS_ENABLED=false skip all of this and answer every user with the
+emotion's most-viewed verses from a query (most_viewed_verses).
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import desc, distinct, func
+from sqlalchemy.orm import Session
+
+from .models import Interaction, Verse
+
+try:
+    import numpy as np
+except ImportError:
+    print("Warning: numpy not installed. Verse recommendations will be disabled.")
+    np = None
+
+RECOMMENDATIONS_ENABLED = os.getenv("RECOMMENDATIONS_ENABLED", "true").lower() == "true"
+RECOMMENDATIONS_TOP_N = int(os.getenv("RECOMMENDATIONS_TOP_N", "10"))
+RECOMMENDATIONS_REFRESH_SECONDS = float(os.getenv("RECOMMENDATIONS_REFRESH_SECONDS", "60"))
+RECOMMENDATIONS_REBUILD_SECONDS = float(os.getenv("RECOMMENDATIONS_REBUILD_SECONDS", "86400"))
+RECOMMENDATIONS_BATCH_SIZE = int(os.getenv("RECOMMENDATIONS_BATCH_SIZE", "5000"))
+# Interactions can commit a little after their created_at; re-reading this much is harmless
+REFRESH_OVERLAP = timedelta(minutes=5)
+
+
+def _summary(row) -> dict:
+    return {"id": row.id, "emotion_id": row.emotion_id, "chapter": row.chapter,
+            "verse_number": row.verse_number, "english": row.english, "is_active": True}
+
+
+def most_viewed_verses(db: Session, emotion_id: str, limit: int) -> List[dict]:
+    """An emotion's active verses by how many signed-in users have seen them (the non-personalized list)"""
+    views = func.count(distinct(Interaction.user_id))
+    rows = db.query(Verse.id, Verse.emotion_id, Verse.chapter, Verse.verse_number, Verse.english).outerjoin(
+        Interaction, Interaction.verse_id == Verse.id
+    ).filter(
+        Verse.emotion_id == emotion_id, Verse.is_active == True
+    ).group_by(Verse.id).order_by(desc(views), Verse.id).limit(limit).all()
+    return [_summary(row) for row in rows]
+
+
+@dataclass
+class RecommendationState:
+    catalog: List[tuple]              # (id, emotion_id, chapter, verse_number, english) of active verses
+    verse_ids: List[str]
+    verses: List[dict]                # row -> verse summary served by the endpoint
+    emotions: Dict[str, int]          # emotion_id -> row of the per-user top-N matrix
+    candidates: List["np.ndarray"]    # per emotion: its verse rows
+    counts: "np.ndarray"              # verses x verses co-occurrence, float32
+    seen: Dict[str, Set[int]]         # user_id -> verse rows shown
+    popular: "np.ndarray"             # emotions x top_n verse rows by views, -1 padded
+    top: Dict[str, "np.ndarray"] = field(default_factory=dict)  # user_id -> emotions x top_n, -1 padded
+    watermark: Optional[datetime] = None  # newest interaction created_at folded in
+
+
+class Recommender:
+    def __init__(self, top_n: int = RECOMMENDATIONS_TOP_N):
+        self.top_n = top_n
+        self.state: Optional[RecommendationState] = None
+        self.built_at: Optional[float] = None  # monotonic time of the last full rebuild
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def available(self) -> bool:
+        return np is not None and self.state is not None
+
+    # ------------------------------------------------------------------ serve
+
+    def recommend(self, user_id: str, emotion_id: str, limit: int) -> Optional[Tuple[List[dict], bool]]:
+        """(verses, personalized) from memory; None before the first build or for an unknown emotion"""
+        state = self.state
+        if state is None or emotion_id not in state.emotions:
+            return None
+        row = state.emotions[emotion_id]
+        user_top = state.top.get(user_id)
+        rows = (user_top if user_top is not None else state.popular)[row]
+        return [state.verses[index] for index in rows[:limit] if index >= 0], user_top is not None
+
+    # ------------------------------------------------------------------ build
+
+    @staticmethod
+    def _catalog(db: Session):
+        return db.query(Verse.id, Verse.emotion_id, Verse.chapter, Verse.verse_number, Verse.english).filter(
+            Verse.is_active == True
+        ).order_by(Verse.id).all()
+
+    def _interactions(self, db: Session, since=None):
+        query = db.query(Interaction.user_id, Interaction.verse_id, Interaction.created_at).filter(
+            Interaction.user_id != None
+        )
+        if since is not None:
+            query = query.filter(Interaction.created_at > since - REFRESH_OVERLAP)
+        return query.yield_per(RECOMMENDATIONS_BATCH_SIZE)
+
+    def rebuild(self, db: Session) -> RecommendationState:
+        started = time.monotonic()
+        catalog = self._catalog(db)
+        verse_ids = [row.id for row in catalog]
+        rows = {verse_id: index for index, verse_id in enumerate(verse_ids)}
+        emotion_rows: Dict[str, List[int]] = {}
+        for index, row in enumerate(catalog):
+            emotion_rows.setdefault(row.emotion_id, []).append(index)
+
+        seen: Dict[str, Set[int]] = {}
+        watermark = None
+        for user_id, verse_id, created_at in self._interactions(db):
+            index = rows.get(verse_id)
+            if index is not None:
+                seen.setdefault(user_id, set()).add(index)
+            if watermark is None or created_at > watermark:
+                watermark = created_at
+
+        counts = np.zeros((len(verse_ids), len(verse_ids)), dtype=np.float32)
+        for user_rows in seen.values():
+            indices = np.fromiter(user_rows, dtype=np.int64, count=len(user_rows))
+            counts[np.ix_(indices, indices)] += 1.0
+
+        template = RecommendationState(
+            catalog=[tuple(row) for row in catalog],
+            verse_ids=verse_ids,
+            verses=[_summary(row) for row in catalog],
+            emotions={emotion_id: position for position, emotion_id in enumerate(emotion_rows)},
+            candidates=[np.array(indices, dtype=np.int64) for indices in emotion_rows.values()],
+            counts=counts,
+            seen=seen,
+            popular=np.empty(0),
+            watermark=watermark,
+        )
+        popular, top = self._lists(template, counts, seen, seen.keys())
+        state = replace(template, popular=popular, top=top)
+        self.state = state
+        self.built_at = time.monotonic()
+        print(f"Recommendations: rebuilt for {len(seen)} users over {len(verse_ids)} verses "
+              f"in {time.monotonic() - started:.1f}s")
+        return state
+
+    def refresh(self, db: Session):
+        """Fold in interactions newer than the last build; rebuild if the active verses changed"""
+        state = self.state
+        if state is None or [tuple(row) for row in self._catalog(db)] != state.catalog:
+            self.rebuild(db)
+            return
+        rows = {verse_id: index for index, verse_id in enumerate(state.verse_ids)}
+        # Copy-on-write: the live state stays untouched until the final swap
+        counts = None
+        seen = dict(state.seen)
+        watermark = state.watermark
+        changed: Set[str] = set()
+        for user_id, verse_id, created_at in self._interactions(db, state.watermark):
+            if watermark is None or created_at > watermark:
+                watermark = created_at
+            index = rows.get(verse_id)
+            user_rows = seen.get(user_id, set())
+            if index is None or index in user_rows:
+                continue
+            if counts is None:
+                counts = state.counts.copy()
+            if user_rows:
+                others = np.fromiter(user_rows, dtype=np.int64, count=len(user_rows))
+                counts[index, others] += 1.0
+                counts[others, index] += 1.0
+            counts[index, index] += 1.0
+            seen[user_id] = user_rows | {index}
+            changed.add(user_id)
+        if not changed:
+            self.state = replace(state, watermark=watermark)
+            return
+        popular, updated = self._lists(state, counts, seen, changed)
+        self.state = replace(state, counts=counts, seen=seen, popular=popular,
+                             top={**state.top, **updated}, watermark=watermark)
+
+    def _lists(self, state: RecommendationState, counts, seen: Dict[str, Set[int]], user_ids):
+        """(popular, {user_id: top}) computed from `counts`, without touching `state`"""
+        views = np.diag(counts).copy()
+        norms = np.sqrt(np.outer(views, views))
+        similarity = np.divide(counts, norms, out=np.zeros_like(counts), where=norms > 0)
+        np.fill_diagonal(similarity, 0.0)
+
+        popular = np.full((len(state.candidates), self.top_n), -1, dtype=np.int32)
+        for position, candidates in enumerate(state.candidates):
+            ranked = candidates[np.argsort(-views[candidates], kind="stable")][:self.top_n]
+            popular[position, :len(ranked)] = ranked
+
+        tops = {}
+        for user_id in user_ids:
+            user_rows = seen.get(user_id)
+            if not user_rows:
+                continue
+            indices = np.fromiter(user_rows, dtype=np.int64, count=len(user_rows))
+            scores = similarity[indices].sum(axis=0)
+            scores[indices] = -np.inf
+            top = np.full((len(state.candidates), self.top_n), -1, dtype=np.int32)
+            for position, candidates in enumerate(state.candidates):
+                candidate_scores = scores[candidates]
+                ranked = candidates[np.argsort(-candidate_scores, kind="stable")]
+                ranked = ranked[scores[ranked] > 0][:self.top_n]
+                if len(ranked) < self.top_n:
+                    # Not enough signal yet: top up with the emotion's most-viewed unseen verses
+                    filler = [index for index in popular[position] if index >= 0
+                              and index not in user_rows and index not in ranked]
+                    ranked = np.concatenate([ranked, np.array(filler, dtype=np.int64)])[:self.top_n]
+                top[position, :len(ranked)] = ranked
+            tops[user_id] = top
+        return popular, tops
+
+    # ---------------------------------------------------------------- lifecycle
+
+    def _run(self, session_factory):
+        while True:
+            db = session_factory()
+            try:
+                if self.built_at is None or time.monotonic() - self.built_at >= RECOMMENDATIONS_REBUILD_SECONDS:
+                    self.rebuild(db)
+                else:
+                    self.refresh(db)  # rebuilds, and resets built_at, when the verse catalog changed
+            except Exception as error:
+                print(f"Recommendation refresh failed: {error}")
+            finally:
+                db.close()
+            if self._stop.wait(RECOMMENDATIONS_REFRESH_SECONDS):
+                return
+
+    def start(self, session_factory):
+        if np is None:
+            return
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, args=(session_factory,),
+                                            name="recommendations", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+recommender = Recommender()
@@ -0,0 +1,168 @@
+"""
+Failure handling for slow or flaky upstream dependencies
+
+- CircuitBreaker: opens after consecutive failures, fails fast while open,
+  then lets a limited number of half-open probes through to test recovery
+- retry_async: bounded retries with full-jitter exponential backoff
+- hedged: start a second identical call if the first is slower than the
+  recent latency percentile, and take whichever finishes first
+"""
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from .metrics import REGISTRY, Counter, Gauge
+
+T = TypeVar("T")
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+circuit_state = REGISTRY.register(Gauge(
+    "saarthi_circuit_state", "Circuit breaker state (0 closed, 1 half-open, 2 open)",
+    ("name",)))
+resilience_events_total = REGISTRY.register(Counter(
+    "saarthi_resilience_events_total", "Retries, hedged requests and breaker rejections",
+    ("name", "event")))
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open"""
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        circuit_state.set(0, name=name)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _set_state(self, state: str):
+        self._state = state
+        circuit_state.set(_STATE_VALUES[state], name=self.name)
+
+    def _maybe_half_open(self):
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._set_state(HALF_OPEN)
+            self._probes = 0
+
+    def allow(self) -> bool:
+        """Whether a call may go through now (reserves a probe slot when half-open)"""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._probes < self.half_open_max_calls:
+                self._probes += 1
+                return True
+        resilience_events_total.inc(name=self.name, event="rejected")
+        return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            if self._state != CLOSED:
+                self._set_state(CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    resilience_events_total.inc(name=self.name, event="opened")
+                self._set_state(OPEN)
+                self._opened_at = time.monotonic()
+
+
+class LatencyTracker:
+    """Recent successful call latencies, for picking a hedge delay"""
+
+    def __init__(self, size: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=size)
+
+    def observe(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff for retry number `attempt` (1-based)"""
+    return random.uniform(0, min(cap, base * (2 ** (attempt - 1))))
+
+
+async def retry_async(
+    call: Callable[[], Awaitable[T]],
+    name: str,
+    retries: int,
+    base_delay: float,
+    max_delay: float,
+    deadline: float,
+    retryable: Callable[[Exception], bool] = lambda error: True,
+    breaker: Optional[CircuitBreaker] = None,
+) -> T:
+    """Run `call`, retrying retryable failures until `deadline` (monotonic seconds)"""
+    attempt = 0
+    while True:
+        if breaker is not None and not breaker.allow():
+            raise CircuitOpenError(name)
+        try:
+            result = await call()
+        except Exception as error:
+            if breaker is not None:
+                breaker.record_failure()
+            attempt += 1
+            delay = backoff_delay(attempt, base_delay, max_delay)
+            if attempt > retries or not retryable(error) or time.monotonic() + delay >= deadline:
+                raise
+            resilience_events_total.inc(name=name, event="retry")
+            await asyncio.sleep(delay)
+            continue
+        if breaker is not None:
+            breaker.record_success()
+        return result
+
+
+async def hedged(call: Callable[[], T], hedge_after: Optional[float], name: str) -> T:
+    """Run blocking `call` in a thread; if it is slower than `hedge_after`, race a second copy"""
+    first = asyncio.ensure_future(asyncio.to_thread(call))
+    if hedge_after is None:
+        return await first
+    done, _ = await asyncio.wait({first}, timeout=hedge_after)
+    if done:
+        return first.result()
+
+    resilience_events_total.inc(name=name, event="hedge")
+    pending = {first, asyncio.ensure_future(asyncio.to_thread(call))}
+    error: Optional[BaseException] = None
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if task.exception() is None:
+                for other in pending:
+                    # The losing thread runs to completion; its result is discarded
+                    other.cancel()
+                return task.result()
+            error = task.exception()
+    raise error
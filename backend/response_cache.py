@@ -0,0 +1,117 @@
+"""
+Pre-serialized response cache for public read endpoints
+
+Emotions, scriptures and verse listings only change when an admin edits
+them, so their JSON is built once and kept as bytes, keyed by route and
+parameters. gzip/brotli variants are compressed at full strength on first
+request and kept alongside, so a hit is a dictionary lookup: no query, no ORM
+objects, no serialization and no per-request compression. Admin mutations
+call invalidate(); entries also expire after their TTL so other workers
+catch up.
+"""
+import gzip
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional, Tuple
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from .metrics import record_cache
+from .responses import COMPRESSION_MIN_BYTES, negotiate
+from .static_assets import brotli
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1000"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "300"))
+
+
+class CachedBody:
+    __slots__ = ("body", "expires_at", "_encoded")
+
+    def __init__(self, body: bytes, expires_at: float):
+        self.body = body
+        self.expires_at = expires_at
+        self._encoded = {}  # encoding -> compressed bytes, or None when compressing doesn't help
+
+    def encoded(self, encoding: str) -> Optional[bytes]:
+        if encoding not in self._encoded:
+            if encoding == "br":
+                compressed = brotli.compress(self.body, quality=11)
+            else:
+                compressed = gzip.compress(self.body, compresslevel=9, mtime=0)
+            self._encoded[encoding] = compressed if len(compressed) < len(self.body) else None
+        return self._encoded[encoding]
+
+
+class ResponseCache:
+    """LRU of serialized JSON responses with their compressed variants"""
+
+    def __init__(self, name: str, size: int = RESPONSE_CACHE_SIZE, ttl: float = RESPONSE_CACHE_TTL):
+        self.name = name
+        self.size = size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, CachedBody]" = OrderedDict()
+        self._generation = 0
+
+    def get(self, key: Hashable) -> Optional[CachedBody]:
+        with self._lock:
+            entry = self._entries.get(key)
+            hit = entry is not None and entry.expires_at > time.monotonic()
+            if hit:
+                self._entries.move_to_end(key)
+        record_cache(self.name, hit)
+        return entry if hit else None
+
+    def generation(self) -> int:
+        return self._generation
+
+    def set(self, key: Hashable, body: bytes, generation: int) -> CachedBody:
+        entry = CachedBody(body, time.monotonic() + self.ttl)
+        with self._lock:
+            if generation != self._generation:
+                return entry  # an admin edit happened while this body was being built
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def serve(self, request: Request, key: Hashable, build: Callable[[], Optional[bytes]]) -> Optional[Response]:
+        """Cached response for `key`, building the JSON body on a miss; None if `build` finds nothing"""
+        entry = self.get(key)
+        if entry is None:
+            generation = self.generation()
+            body = build()
+            if body is None:
+                return None
+            entry = self.set(key, body, generation)
+        return respond(request, entry)
+
+
+def respond(request: Request, entry: CachedBody) -> Response:
+    """The stored body, in the best encoding the client accepts"""
+    headers = {"Vary": "Accept-Encoding"}
+    body = entry.body
+    if len(body) >= COMPRESSION_MIN_BYTES:
+        encoding = negotiate(request.headers.get("accept-encoding", ""))
+        compressed = entry.encoded(encoding) if encoding else None
+        if compressed is not None:
+            body = compressed
+            headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def cache_key(request: Request, *parts: Hashable) -> Tuple[Hashable, ...]:
+    """Key for a route: its path, sorted query parameters and any extra parts"""
+    return (request.url.path, tuple(sorted(request.query_params.multi_items())), *parts)
+
+
+response_cache = ResponseCache("responses")
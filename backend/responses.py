@@ -0,0 +1,220 @@
+"""
+Response encoding for API payloads
+
+- FastJSONResponse: orjson-backed default response class (stdlib fallback)
+- CompressionMiddleware: negotiated brotli/gzip compression above a size
+  threshold, streaming-aware
+- trusted_response: serialize trusted ORM rows straight to JSON, skipping
+  response_model re-validation
+"""
+import json
+import os
+import types
+import typing
+import zlib
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel
+from starlette.responses import JSONResponse
+
+from .static_assets import brotli, choose_encoding
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4  # dynamic responses: favour speed over ratio
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+SKIP_TYPES = ("text/event-stream",)
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_json_default).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson when it is installed"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+# ---------------------------------------------------------------------------
+# Validation-free serialization of trusted ORM output
+# ---------------------------------------------------------------------------
+
+_plans: Dict[type, List[Tuple[str, Optional[type], bool]]] = {}
+
+
+def _nested_model(annotation) -> Tuple[Optional[type], bool]:
+    """(model class, is_list) for annotations like Model, Optional[Model], List[Model]"""
+    origin = typing.get_origin(annotation)
+    if origin is list:
+        model, _ = _nested_model(typing.get_args(annotation)[0])
+        return model, True
+    if origin is typing.Union or origin is types.UnionType:
+        for arg in typing.get_args(annotation):
+            if arg is not type(None):
+                return _nested_model(arg)
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, False
+    return None, False
+
+
+def _plan(schema: Type[BaseModel]):
+    plan = _plans.get(schema)
+    if plan is None:
+        plan = [(name, *_nested_model(field.annotation)) for name, field in schema.model_fields.items()]
+        _plans[schema] = plan
+    return plan
+
+
+def dump_orm(schema: Type[BaseModel], obj: Any) -> Optional[dict]:
+    """Pick the schema's fields off an ORM object (or dict) without validating them"""
+    if obj is None:
+        return None
+    getter = obj.get if isinstance(obj, dict) else lambda name, default=None: getattr(obj, name, default)
+    result = {}
+    for name, model, many in _plan(schema):
+        value = getter(name, None)
+        if model is not None and value is not None:
+            value = [dump_orm(model, item) for item in value] if many else dump_orm(model, value)
+        result[name] = value
+    return result
+
+
+def trusted_response(schema: Type[BaseModel], rows) -> FastJSONResponse:
+    """Serialize ORM rows for `schema` directly, bypassing response_model validation"""
+    if isinstance(rows, (list, tuple)):
+        return FastJSONResponse([dump_orm(schema, row) for row in rows])
+    return FastJSONResponse(dump_orm(schema, rows))
+
+
+# ---------------------------------------------------------------------------
+# Compression
+# ---------------------------------------------------------------------------
+
+class _Compressor:
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._zlib = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + (self._brotli.flush() if flush else b"")
+        return self._zlib.compress(data) + (self._zlib.flush(zlib.Z_SYNC_FLUSH) if flush else b"")
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_FINISH)
+
+
+def compress_bytes(body: bytes, encoding: str) -> bytes:
+    return _Compressor(encoding).finish(body)
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    available = ("br", "gzip") if brotli is not None else ("gzip",)
+    return choose_encoding(accept_encoding, available)
+
+
+class CompressionMiddleware:
+    """Pure ASGI brotli/gzip compression for responses above `minimum_size`"""
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = negotiate(accept)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                passthrough = not self._compressible(message)
+                if passthrough:
+                    await send(message)
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                compressor = _Compressor(encoding)
+                headers = [(name, value) for name, value in start_message.get("headers", [])
+                           if name not in (b"content-length", b"vary")]
+                headers.append((b"content-encoding", encoding.encode()))
+                headers.append((b"vary", _vary(start_message)))
+                if not more_body:
+                    compressed = compressor.finish(body)
+                    headers.append((b"content-length", str(len(compressed)).encode()))
+                    await send({**start_message, "headers": headers})
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+                await send({**start_message, "headers": headers})
+            chunk = compressor.compress(body, flush=True) if more_body else compressor.finish(body)
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def _compressible(message) -> bool:
+        if message["status"] < 200 or message["status"] in (204, 206, 304):
+            return False
+        content_type = ""
+        for name, value in message.get("headers", []):
+            if name in (b"content-encoding", b"content-range"):
+                return False
+            if name == b"content-type":
+                content_type = value.decode("latin-1")
+        return content_type.startswith(COMPRESSIBLE_TYPES) and not content_type.startswith(SKIP_TYPES)
+
+
+def _vary(start_message) -> bytes:
+    for name, value in start_message.get("headers", []):
+        if name == b"vary" and b"accept-encoding" not in value.lower():
+            return value + b", Accept-Encoding"
+        if name == b"vary":
+            return value
+    return b"Accept-Encoding"
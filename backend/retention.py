@@ -0,0 +1,269 @@
+"""
+Time partitioning and retention for interactions and chat messages
+
+Both tables are append-only and mostly read near the recent end.
+
+Postgres: `python -m backend.retention partition` converts each table into a
+table range-partitioned by month on created_at (<table>_pYYYYMM, plus a
+default partition). The background job creates partitions a few months
+ahead and detaches partitions older than the retention window, keeping them
+as standalone <table>_archive_YYYYMM tables (or dropping them with
+RETENTION_MODE=delete). Detaching a month is a catalog change, not a
+row-by-row delete, so the hot table never needs a large vacuum.
+
+Other databases (SQLite): rows older than the retention window are moved in
+batches to <table>_archive (or deleted).
+
+A retention of 0 days keeps rows in the hot table forever. Both the job and
+the retention windows are opt-in: set RETENTION_ENABLED=true for the server to
+maintain partitions, and e.g. INTERACTIONS_RETENTION_DAYS=365 to retire old
+interactions (which also drops them from dashboard stats and recommendations).
+"""
+import os
+import sys
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import bindparam, desc, text
+from sqlalchemy.schema import AddConstraint, CreateIndex, ForeignKeyConstraint
+
+from .models import ChatMessage, Interaction
+
+RETENTION_ENABLED = os.getenv("RETENTION_ENABLED", "false").lower() == "true"
+RETENTION_MODE = os.getenv("RETENTION_MODE", "archive").lower()  # archive | delete
+RETENTION_CHECK_SECONDS = float(os.getenv("RETENTION_CHECK_SECONDS", "21600"))
+RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", "1000"))
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+# Lists of "latest N" rows only scan this many days (recent partitions) unless that returns too few
+RECENT_WINDOW_DAYS = int(os.getenv("RECENT_WINDOW_DAYS", "30"))
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    model: type
+    days: int
+
+    @property
+    def table(self) -> str:
+        return self.model.__tablename__
+
+
+POLICIES = (
+    RetentionPolicy(Interaction, int(os.getenv("INTERACTIONS_RETENTION_DAYS", "0"))),
+    RetentionPolicy(ChatMessage, int(os.getenv("CHAT_MESSAGES_RETENTION_DAYS", "0"))),
+)
+
+
+def newest(query, column, limit: int, days: int = RECENT_WINDOW_DAYS):
+    """Latest `limit` rows by `column`, reading only the last `days` first so partitioned tables prune"""
+    ordered = query.order_by(desc(column))
+    if days > 0:
+        rows = ordered.filter(column >= datetime.utcnow() - timedelta(days=days)).limit(limit).all()
+        if len(rows) >= limit:
+            return rows
+    return ordered.limit(limit).all()
+
+
+# ---------------------------------------------------------------- partitions
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(day: date, months: int) -> date:
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+def is_partitioned(connection, table: str) -> bool:
+    return connection.execute(text(
+        "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = :table"
+    ), {"table": table}).first() is not None
+
+
+def list_partitions(connection, table: str) -> List[str]:
+    return [name for (name,) in connection.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = :table"
+    ), {"table": table})]
+
+
+def ensure_partitions(connection, table: str, first: date, last: date) -> int:
+    """Create monthly partitions covering [first, last] that do not exist yet; returns how many were created"""
+    existing = set(list_partitions(connection, table))
+    created = 0
+    month = month_start(first)
+    while month <= last:
+        name = partition_name(table, month)
+        if name not in existing:
+            connection.execute(text(
+                f"CREATE TABLE {name} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+            ))
+            created += 1
+        month = add_months(month, 1)
+    return created
+
+
+def partition_table(engine, policy: RetentionPolicy):
+    """One-off: rebuild a plain Postgres table as a monthly range-partitioned table (run with the app stopped)"""
+    table = policy.table
+    with engine.begin() as connection:
+        if is_partitioned(connection, table):
+            print(f"{table}: already partitioned")
+            return
+        legacy = f"{table}_unpartitioned"
+        connection.execute(text(f"ALTER TABLE {table} RENAME TO {legacy}"))
+        connection.execute(text(
+            f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)"
+        ))
+        oldest, newest_row = connection.execute(text(f"SELECT min(created_at), max(created_at) FROM {legacy}")).one()
+        today = date.today()
+        ensure_partitions(connection, table, (oldest or datetime.utcnow()).date(),
+                          add_months(max(today, (newest_row or datetime.utcnow()).date()), PARTITION_MONTHS_AHEAD))
+        connection.execute(text(f"CREATE TABLE {table}_pdefault PARTITION OF {table} DEFAULT"))
+        connection.execute(text(f"INSERT INTO {table} SELECT * FROM {legacy}"))
+        connection.execute(text(f"DROP TABLE {legacy}"))
+        # The partition key has to be part of the primary key
+        connection.execute(text(f"ALTER TABLE {table} ADD PRIMARY KEY (id, created_at)"))
+        for constraint in policy.model.__table__.constraints:
+            if isinstance(constraint, ForeignKeyConstraint):
+                connection.execute(AddConstraint(constraint))
+        for index in policy.model.__table__.indexes:
+            connection.execute(CreateIndex(index))
+    print(f"{table}: partitioned by month on created_at")
+
+
+# ----------------------------------------------------------------- retention
+
+def _cutoff(policy: RetentionPolicy) -> Optional[datetime]:
+    return datetime.utcnow() - timedelta(days=policy.days) if policy.days > 0 else None
+
+
+def retire_partitions(connection, policy: RetentionPolicy) -> int:
+    """Detach (and archive or drop) monthly partitions entirely older than the retention window"""
+    cutoff = _cutoff(policy)
+    if cutoff is None:
+        return 0
+    retired = 0
+    prefix = f"{policy.table}_p"
+    for name in sorted(list_partitions(connection, policy.table)):
+        suffix = name[len(prefix):]
+        if not (name.startswith(prefix) and suffix.isdigit()):
+            continue  # the default partition
+        month = date(int(suffix[:4]), int(suffix[4:]), 1)
+        if datetime.combine(add_months(month, 1), datetime.min.time()) > cutoff:
+            continue
+        connection.execute(text(f"ALTER TABLE {policy.table} DETACH PARTITION {name}"))
+        if RETENTION_MODE == "delete":
+            connection.execute(text(f"DROP TABLE {name}"))
+        else:
+            connection.execute(text(f"ALTER TABLE {name} RENAME TO {policy.table}_archive_{suffix}"))
+        retired += 1
+    return retired
+
+
+def archive_rows(session_factory, policy: RetentionPolicy, batch_size: int = RETENTION_BATCH_SIZE) -> int:
+    """Move (or delete) rows older than the retention window in batches; returns rows retired"""
+    cutoff = _cutoff(policy)
+    if cutoff is None:
+        return 0
+    table, archive = policy.table, f"{policy.table}_archive"
+    model = policy.model
+    moved = 0
+    db = session_factory()
+    try:
+        if RETENTION_MODE != "delete":
+            # Same columns, no constraints: the archive is write-once, read by exports and ad-hoc queries only
+            db.execute(text(f"CREATE TABLE IF NOT EXISTS {archive} AS SELECT * FROM {table} WHERE 1 = 0"))
+            db.commit()
+        copy = text(f"INSERT INTO {archive} SELECT * FROM {table} WHERE id IN :ids").bindparams(
+            bindparam("ids", expanding=True))
+        while True:
+            ids = [row_id for (row_id,) in db.query(model.id).filter(
+                model.created_at < cutoff
+            ).limit(batch_size).all()]
+            if not ids:
+                return moved
+            if RETENTION_MODE != "delete":
+                db.execute(copy, {"ids": ids})
+            db.query(model).filter(model.id.in_(ids)).delete(synchronize_session=False)
+            db.commit()
+            moved += len(ids)
+    finally:
+        db.close()
+
+
+def run_retention(engine, session_factory) -> Dict[str, int]:
+    """Create upcoming partitions and retire old data for every policy; returns rows/partitions retired per table"""
+    retired = {}
+    for policy in POLICIES:
+        if engine.dialect.name == "postgresql":
+            with engine.begin() as connection:
+                if is_partitioned(connection, policy.table):
+                    today = date.today()
+                    ensure_partitions(connection, policy.table, today, add_months(today, PARTITION_MONTHS_AHEAD))
+                    retired[policy.table] = retire_partitions(connection, policy)
+                    continue
+        retired[policy.table] = archive_rows(session_factory, policy)
+    return retired
+
+
+class RetentionJob:
+    """Background thread that maintains partitions and applies retention"""
+
+    def __init__(self, engine, session_factory, interval: float = RETENTION_CHECK_SECONDS):
+        self.engine = engine
+        self.session_factory = session_factory
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> Dict[str, int]:
+        retired = run_retention(self.engine, self.session_factory)
+        if any(retired.values()):
+            print(f"Retention: {', '.join(f'{table} {count}' for table, count in retired.items() if count)} retired")
+        return retired
+
+    def _run(self):
+        while True:
+            try:
+                self.run_once()
+            except Exception as error:
+                print(f"Retention job failed: {error}")
+            if self._stop.wait(self.interval):
+                return
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="retention", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ("partition", "run"):
+        print("Usage: python -m backend.retention partition | run")
+        sys.exit(1)
+    from .database import SessionLocal, engine
+    if sys.argv[1] == "partition":
+        if engine.dialect.name != "postgresql":
+            print("Native partitioning needs Postgres; other databases use <table>_archive tables instead")
+            sys.exit(1)
+        for policy in POLICIES:
+            partition_table(engine, policy)
+        return
+    print(RetentionJob(engine, SessionLocal).run_once())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
-from pydantic import BaseModel
+import json
+from pydantic import BaseModel, field_validator
 from datetime import datetime, date
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 
 # User schemas
 class UserBase(BaseModel):
@@ -24,6 +25,15 @@ class UserResponse(UserBase):
     class Config:
         from_attributes = True
 
+class AuthorSummary(BaseModel):
+    """The author fields listings display"""
+    id: str
+    username: str
+    name: str
+
+    class Config:
+        from_attributes = True
+
 # Post schemas
 class PostBase(BaseModel):
     title: str
@@ -44,7 +54,7 @@ class PostResponse(PostBase):
         from_attributes = True
 
 class PostWithAuthor(PostResponse):
-    author: UserResponse
+    author: AuthorSummary
     comments: int
 
 # Comment schemas
@@ -64,14 +74,14 @@ class CommentResponse(CommentBase):
         from_attributes = True
 
 class CommentWithAuthor(CommentResponse):
-    author: UserResponse
+    author: AuthorSummary
 
 # Chat message schemas
 class ChatMessageBase(BaseModel):
     content: str
 
 class ChatMessageCreate(ChatMessageBase):
-    pass
+    conversational: bool = True  # Include recent turns as context for the AI reply
 
 class ChatMessageResponse(ChatMessageBase):
     id: str
@@ -195,6 +205,42 @@ class VerseResponse(VerseBase):
 class VerseWithEmotion(VerseResponse):
     emotion: EmotionResponse
 
+class VerseSummary(BaseModel):
+    """List view of a verse: English text by default, or the texts picked with lang/fields"""
+    id: str
+    emotion_id: str
+    chapter: Optional[str] = None
+    verse_number: Optional[str] = None
+    is_active: bool
+    sanskrit: Optional[str] = None
+    hindi: Optional[str] = None
+    english: Optional[str] = None
+    explanation: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class VerseRecommendations(BaseModel):
+    emotion_id: str
+    personalized: bool  # False: most-viewed verses, until the user has some history
+    verses: List[VerseSummary]
+
+class VerseImportItem(VerseBase):
+    emotion_id: Optional[str] = None
+    emotion_name: Optional[str] = None  # Alternative to emotion_id
+
+class VerseImport(BaseModel):
+    verses: List[VerseImportItem]
+
+class VerseCitation(BaseModel):
+    id: str
+    chapter: Optional[str] = None
+    verse_number: Optional[str] = None
+    english: str
+
+    class Config:
+        from_attributes = True
+
 class AdminBase(BaseModel):
     username: str
 
@@ -287,6 +333,12 @@ class ThoughtOfTheDayWithCreator(ThoughtOfTheDayResponse):
     creator: Optional[UserResponse] = None
 
 # Scripture schemas
+def parse_json_list(value):
+    """Accept arrays, or arrays encoded as a JSON string (the format older clients send)"""
+    if isinstance(value, str):
+        value = json.loads(value)
+    return value
+
 class ScriptureBase(BaseModel):
     title: str
     description: str
@@ -294,11 +346,16 @@ class ScriptureBase(BaseModel):
     icon: str
     color: str
     introduction: str
-    key_teachings: str  # JSON string
-    famous_verses: str  # JSON string
+    key_teachings: List[Any]
+    famous_verses: List[Any]
     is_active: bool = True
     order_index: int = 0
 
+    @field_validator("key_teachings", "famous_verses", mode="before")
+    @classmethod
+    def parse_documents(cls, value):
+        return parse_json_list(value)
+
 class ScriptureCreate(ScriptureBase):
     pass
 
@@ -309,11 +366,32 @@ class ScriptureUpdate(BaseModel):
     icon: Optional[str] = None
     color: Optional[str] = None
     introduction: Optional[str] = None
-    key_teachings: Optional[str] = None
-    famous_verses: Optional[str] = None
+    key_teachings: Optional[List[Any]] = None
+    famous_verses: Optional[List[Any]] = None
     is_active: Optional[bool] = None
     order_index: Optional[int] = None
 
+    @field_validator("key_teachings", "famous_verses", mode="before")
+    @classmethod
+    def parse_documents(cls, value):
+        return parse_json_list(value)
+
+class ScriptureSummary(BaseModel):
+    """List view of a scripture, without the document body"""
+    id: str
+    title: str
+    description: str
+    slug: str
+    icon: str
+    color: str
+    is_active: bool
+    order_index: int
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
 class ScriptureResponse(ScriptureBase):
     id: str
     created_by: Optional[str] = None
@@ -324,4 +402,22 @@ class ScriptureResponse(ScriptureBase):
         from_attributes = True
 
 class ScriptureWithCreator(ScriptureResponse):
-    creator: Optional[UserResponse] = None
\ No newline at end of file
+    creator: Optional[UserResponse] = None
+
+# Job schemas
+class JobResponse(BaseModel):
+    id: str
+    kind: str
+    status: str
+    params: Dict[str, Any]
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    processed: int
+    total: Optional[int] = None
+    created_by: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
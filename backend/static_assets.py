@@ -0,0 +1,287 @@
+"""
+In-memory static asset serving for the built frontend
+
+Files under dist/public are read once at startup, gzip/brotli variants are
+precomputed, and requests are answered from memory with ETag/Last-Modified
+validation, single byte-range support and long-lived caching for
+content-hashed Vite assets.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from starlette.responses import FileResponse, Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STATIC_MAX_MEMORY_BYTES = int(os.getenv("STATIC_MAX_MEMORY_BYTES", str(10 * 1024 * 1024)))
+COMPRESS_MIN_BYTES = 1024
+COMPRESSIBLE_TYPES = (
+    "text/", "application/javascript", "application/json", "application/xml",
+    "image/svg+xml", "application/manifest+json", "application/wasm",
+)
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+DEFAULT_CACHE = "public, max-age=3600"
+INDEX_CACHE = "no-cache"
+
+# Vite emits names like index-4f3a9c1b.js / logo-Bx3_k9Qa.svg under assets/
+_HASHED_NAME = re.compile(r"[-.][A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$")
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class StaticAsset:
+    __slots__ = ("path", "body", "gzip", "br", "etag", "last_modified", "mtime",
+                 "media_type", "cache_control", "size", "in_memory")
+
+    def __init__(self, path: Path, rel_path: str, in_memory: bool):
+        stat = path.stat()
+        self.path = path
+        self.size = stat.st_size
+        self.mtime = int(stat.st_mtime)
+        self.last_modified = formatdate(self.mtime, usegmt=True)
+        self.media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        if self.media_type.startswith("text/") or self.media_type == "application/javascript":
+            self.media_type += "; charset=utf-8"
+        self.cache_control = _cache_control(rel_path)
+        self.in_memory = in_memory
+        self.body = path.read_bytes() if in_memory else b""
+        self.gzip: Optional[bytes] = None
+        self.br: Optional[bytes] = None
+        if in_memory:
+            self.etag = '"' + hashlib.sha1(self.body).hexdigest()[:20] + '"'
+            if _compressible(self.media_type) and self.size >= COMPRESS_MIN_BYTES:
+                self._precompress()
+        else:
+            self.etag = f'"{self.mtime:x}-{self.size:x}"'
+
+    def _precompress(self):
+        compressed = gzip.compress(self.body, compresslevel=9, mtime=0)
+        if len(compressed) < self.size:
+            self.gzip = compressed
+        if brotli is not None:
+            compressed = brotli.compress(self.body, quality=11)
+            if len(compressed) < self.size:
+                self.br = compressed
+
+
+def _cache_control(rel_path: str) -> str:
+    if rel_path == "index.html":
+        return INDEX_CACHE
+    if rel_path.startswith("assets/") and _HASHED_NAME.search(rel_path):
+        return IMMUTABLE_CACHE
+    return DEFAULT_CACHE
+
+
+def _compressible(media_type: str) -> bool:
+    return media_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def accepted_encodings(header: str) -> Dict[str, float]:
+    """Parse Accept-Encoding into {coding: q}"""
+    encodings: Dict[str, float] = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        encodings[coding.strip().lower()] = quality
+    return encodings
+
+
+def choose_encoding(header: str, available: Tuple[str, ...] = ("br", "gzip")) -> Optional[str]:
+    encodings = accepted_encodings(header)
+    wildcard = encodings.get("*", 0.0)
+    for coding in available:
+        if encodings.get(coding, wildcard) > 0:
+            return coding
+    return None
+
+
+def _strip_weak(etag: str) -> str:
+    etag = etag.strip()
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    return any(_strip_weak(candidate) == _strip_weak(etag) for candidate in header.split(","))
+
+
+def _not_modified(headers: Dict[str, str], asset: StaticAsset) -> bool:
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, asset.etag)
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return asset.mtime <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Single byte range -> (start, end inclusive); raises ValueError if unsatisfiable"""
+    match = _RANGE.match(header.strip())
+    if not match:
+        return None  # multi-range or malformed: serve the full body
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        length = int(last)
+        if length == 0:
+            raise ValueError("unsatisfiable range")
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("unsatisfiable range")
+    return start, end
+
+
+class StaticAssets:
+    """Registry of built frontend files, loaded into memory at startup"""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.assets: Dict[str, StaticAsset] = {}
+
+    def load(self):
+        self.assets = {}
+        if not self.directory.is_dir():
+            print(f"Frontend build not found at {self.directory}; static assets disabled")
+            return
+        total = 0
+        for path in sorted(self.directory.rglob("*")):
+            if not path.is_file():
+                continue
+            rel_path = path.relative_to(self.directory).as_posix()
+            in_memory = path.stat().st_size <= STATIC_MAX_MEMORY_BYTES
+            asset = StaticAsset(path, rel_path, in_memory)
+            self.assets[rel_path] = asset
+            total += asset.size if in_memory else 0
+        print(f"Loaded {len(self.assets)} static assets ({total // 1024} KiB in memory)")
+
+    def get(self, rel_path: str) -> Optional[StaticAsset]:
+        return self.assets.get(rel_path.lstrip("/"))
+
+    @property
+    def index(self) -> Optional[StaticAsset]:
+        return self.assets.get("index.html")
+
+    def app(self, subdirectory: str = ""):
+        """ASGI app serving files under `subdirectory`, for use with app.mount"""
+        return StaticAssetsApp(self, subdirectory)
+
+    async def serve(self, scope, receive, send, asset: Optional[StaticAsset]):
+        if asset is None:
+            await _send_plain(send, 404, b"Not Found")
+            return
+        method = scope.get("method", "GET")
+        if method not in ("GET", "HEAD"):
+            await _send_plain(send, 405, b"Method Not Allowed", [(b"allow", b"GET, HEAD")])
+            return
+        headers = {name.decode("latin-1").lower(): value.decode("latin-1") for name, value in scope["headers"]}
+
+        if not asset.in_memory:
+            response = FileResponse(asset.path, media_type=asset.media_type,
+                                    headers={"cache-control": asset.cache_control})
+            await response(scope, receive, send)
+            return
+
+        base_headers = [
+            (b"content-type", asset.media_type.encode()),
+            (b"etag", asset.etag.encode()),
+            (b"last-modified", asset.last_modified.encode()),
+            (b"cache-control", asset.cache_control.encode()),
+            (b"accept-ranges", b"bytes"),
+        ]
+        if asset.gzip is not None or asset.br is not None:
+            base_headers.append((b"vary", b"Accept-Encoding"))
+
+        if _not_modified(headers, asset):
+            await send({"type": "http.response.start", "status": 304, "headers": base_headers[1:]})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        range_header = headers.get("range")
+        if range_header and (not headers.get("if-range") or _etag_matches(headers["if-range"], asset.etag)):
+            try:
+                byte_range = _parse_range(range_header, asset.size)
+            except ValueError:
+                await _send_plain(send, 416, b"", [(b"content-range", f"bytes */{asset.size}".encode())])
+                return
+            if byte_range is not None:
+                start, end = byte_range
+                body = asset.body[start:end + 1]
+                response_headers = base_headers + [
+                    (b"content-range", f"bytes {start}-{end}/{asset.size}".encode()),
+                    (b"content-length", str(len(body)).encode()),
+                ]
+                await _send_body(send, 206, response_headers, body, method)
+                return
+
+        body = asset.body
+        encoding = choose_encoding(headers.get("accept-encoding", ""),
+                                   tuple(name for name in ("br", "gzip") if getattr(asset, name) is not None))
+        response_headers = list(base_headers)
+        if encoding is not None:
+            body = getattr(asset, encoding)
+            response_headers.append((b"content-encoding", encoding.encode()))
+        response_headers.append((b"content-length", str(len(body)).encode()))
+        await _send_body(send, 200, response_headers, body, method)
+
+
+class AssetResponse(Response):
+    """Response that hands a preloaded asset to StaticAssets.serve (for use from routes)"""
+
+    def __init__(self, assets: StaticAssets, asset: Optional[StaticAsset]):
+        super().__init__()
+        self.assets = assets
+        self.asset = asset
+
+    async def __call__(self, scope, receive, send):
+        await self.assets.serve(scope, receive, send, self.asset)
+
+
+class StaticAssetsApp:
+    def __init__(self, assets: StaticAssets, subdirectory: str):
+        self.assets = assets
+        self.prefix = subdirectory.strip("/") + "/" if subdirectory.strip("/") else ""
+
+    async def __call__(self, scope, receive, send):
+        path = scope["path"]
+        root_path = scope.get("root_path", "")
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path):]
+        rel_path = self.prefix + path.lstrip("/")
+        if rel_path.endswith("/") or not path.strip("/"):
+            rel_path += "index.html"
+        await self.assets.serve(scope, receive, send, self.assets.get(rel_path))
+
+
+async def _send_body(send, status: int, headers: List[Tuple[bytes, bytes]], body: bytes, method: str):
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": b"" if method == "HEAD" else body})
+
+
+async def _send_plain(send, status: int, body: bytes, extra_headers: Optional[List[Tuple[bytes, bytes]]] = None):
+    headers = [(b"content-type", b"text/plain; charset=utf-8"), (b"content-length", str(len(body)).encode())]
+    await send({"type": "http.response.start", "status": status, "headers": headers + (extra_headers or [])})
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Local TF-IDF retrieval index over verse translations and explanations
+
+The index is built offline (or in a background thread) and stored as a
+term-major sparse matrix in memory-mapped NumPy arrays:
+
+    indptr.npy   int64[V + 1]  postings range per term
+    docs.npy     int32[P]      document row of each posting
+    weights.npy  float32[P]    L2-normalised tf-idf weight of each posting
+    idf.npy      float32[V]
+    meta.json    vocabulary and verse ids
+
+A query touches only the postings of its own terms and scores them with one
+np.bincount, so lookups stay sub-millisecond at tens of thousands of verses.
+Admin edits go to a small in-memory delta segment (plus tombstones for the
+base rows) until enough accumulate to trigger a full rebuild.
+
+Build offline with:  python -m backend.verse_index build
+"""
+import json
+import math
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    print("Warning: numpy not installed. Verse retrieval will be disabled.")
+    np = None
+
+VERSE_INDEX_DIR = Path(os.getenv("VERSE_INDEX_DIR", str(Path(__file__).parent.parent / "data" / "verse_index")))
+VERSE_INDEX_DELTA_LIMIT = int(os.getenv("VERSE_INDEX_DELTA_LIMIT", "200"))
+VERSE_INDEX_RELOAD_SECONDS = 30
+
+_TOKEN = re.compile(r"[a-z]+")
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have
+having he her here hers herself him himself his how i if in into is it its itself just me more most
+my myself no nor not now of off on once only or other our ours ourselves out over own same she
+should so some such than that the their theirs them themselves then there these they this those
+through to too under until up very was we were what when where which while who whom why will with
+would you your yours yourself yourselves o thou thee thy one also us
+""".split())
+
+
+def fold(token: str) -> str:
+    """Light suffix folding so fears/fearing meet fear"""
+    for suffix in ("ing", "ness", "ed", "es", "s"):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[:-len(suffix)]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    return [fold(token) for token in _TOKEN.findall((text or "").lower())
+            if len(token) >= 3 and token not in STOPWORDS]
+
+
+def verse_text(english: str, explanation: str) -> str:
+    return f"{english or ''} {english or ''} {explanation or ''}"  # translation weighted twice
+
+
+def _tf_weights(tokens: List[str]) -> Dict[str, float]:
+    return {term: 1.0 + math.log(count) for term, count in Counter(tokens).items()}
+
+
+class VerseIndex:
+    def __init__(self, directory: Path = VERSE_INDEX_DIR):
+        self.directory = Path(directory)
+        self._lock = threading.RLock()
+        self._version: Optional[str] = None
+        self._checked_at = 0.0
+        self._rebuilding = False
+        self.terms: Dict[str, int] = {}
+        self.verse_ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.indptr = self.docs = self.weights = self.idf = None
+        self.alive = None
+        self.delta: Dict[str, Dict[int, float]] = {}
+        self.default_idf = 1.0
+        # Admin edits, replayed onto a freshly loaded index built from an older snapshot
+        self._edits: List[Tuple[float, str, Optional[Tuple[str, str]]]] = []
+
+    @property
+    def available(self) -> bool:
+        return np is not None and self.indptr is not None
+
+    # ------------------------------------------------------------------ build
+
+    def build(self, rows: List[Tuple[str, str, str]]) -> str:
+        """Write a new index version from (verse_id, english, explanation) rows"""
+        if np is None:
+            raise RuntimeError("numpy is required to build the verse index")
+        documents = [_tf_weights(tokenize(verse_text(english, explanation))) for _, english, explanation in rows]
+        document_frequency = Counter(term for document in documents for term in document)
+        vocabulary = sorted(document_frequency)
+        term_ids = {term: index for index, term in enumerate(vocabulary)}
+        count = len(rows)
+        idf = np.array([math.log((1 + count) / (1 + document_frequency[term])) + 1.0 for term in vocabulary],
+                       dtype=np.float32)
+
+        postings: List[List[Tuple[int, float]]] = [[] for _ in vocabulary]
+        for row, document in enumerate(documents):
+            weighted = {term_ids[term]: tf * idf[term_ids[term]] for term, tf in document.items()}
+            norm = math.sqrt(sum(weight * weight for weight in weighted.values())) or 1.0
+            for term_id, weight in weighted.items():
+                postings[term_id].append((row, weight / norm))
+
+        indptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(items) for items in postings])
+        docs = np.fromiter((row for items in postings for row, _ in items), dtype=np.int32, count=int(indptr[-1]))
+        weights = np.fromiter((weight for items in postings for _, weight in items), dtype=np.float32,
+                              count=int(indptr[-1]))
+
+        version = f"v{int(time.time() * 1000)}"
+        target = self.directory / version
+        target.mkdir(parents=True, exist_ok=True)
+        np.save(target / "indptr.npy", indptr)
+        np.save(target / "docs.npy", docs)
+        np.save(target / "weights.npy", weights)
+        np.save(target / "idf.npy", idf)
+        with open(target / "meta.json", "w") as handle:
+            json.dump({"terms": vocabulary, "verse_ids": [row[0] for row in rows]}, handle)
+
+        pointer = self.directory / "CURRENT.tmp"
+        pointer.write_text(version)
+        os.replace(pointer, self.directory / "CURRENT")
+        self._prune_versions(keep=version)
+        return version
+
+    def _prune_versions(self, keep: str):
+        for path in self.directory.glob("v*"):
+            if path.is_dir() and path.name != keep:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def build_from_db(self, session_factory) -> str:
+        from .models import Verse
+        snapshot_at = time.monotonic()
+        db = session_factory()
+        try:
+            rows = db.query(Verse.id, Verse.english, Verse.explanation).filter(Verse.is_active == True).all()
+        finally:
+            db.close()
+        version = self.build([tuple(row) for row in rows])
+        self.load(replay_after=snapshot_at)
+        print(f"Verse index {version} built with {len(rows)} verses")
+        return version
+
+    def rebuild_in_background(self, session_factory):
+        with self._lock:
+            if self._rebuilding or np is None:
+                return
+            self._rebuilding = True
+
+        def run():
+            try:
+                self.build_from_db(session_factory)
+            except Exception as error:
+                print(f"Verse index rebuild failed: {error}")
+            finally:
+                self._rebuilding = False
+
+        threading.Thread(target=run, name="verse-index-rebuild", daemon=True).start()
+
+    # ------------------------------------------------------------------- load
+
+    def load(self, replay_after: Optional[float] = None) -> bool:
+        if np is None:
+            return False
+        pointer = self.directory / "CURRENT"
+        if not pointer.exists():
+            return False
+        version = pointer.read_text().strip()
+        source = self.directory / version
+        with open(source / "meta.json") as handle:
+            meta = json.load(handle)
+        indptr = np.load(source / "indptr.npy", mmap_mode="r")
+        docs = np.load(source / "docs.npy", mmap_mode="r")
+        weights = np.load(source / "weights.npy", mmap_mode="r")
+        idf = np.load(source / "idf.npy", mmap_mode="r")
+        with self._lock:
+            self.terms = {term: index for index, term in enumerate(meta["terms"])}
+            self.verse_ids = meta["verse_ids"]
+            self.rows = {verse_id: row for row, verse_id in enumerate(self.verse_ids)}
+            self.indptr, self.docs, self.weights, self.idf = indptr, docs, weights, idf
+            self.alive = np.ones(len(self.verse_ids), dtype=bool)
+            self.delta = {}
+            self.default_idf = math.log(1 + len(self.verse_ids)) + 1.0
+            self._version = version
+            self._checked_at = time.monotonic()
+            if replay_after is not None:
+                self._edits = [edit for edit in self._edits if edit[0] >= replay_after]
+                for _, verse_id, text in self._edits:
+                    self._apply(verse_id, text)
+            else:
+                self._edits = []
+        return True
+
+    def _reload_if_stale(self):
+        """Pick up rebuilds made by other workers"""
+        now = time.monotonic()
+        if now - self._checked_at < VERSE_INDEX_RELOAD_SECONDS:
+            return
+        self._checked_at = now
+        pointer = self.directory / "CURRENT"
+        if pointer.exists() and pointer.read_text().strip() != self._version:
+            self.load()
+
+    # ---------------------------------------------------------- incremental
+
+    def _vectorize(self, text: str, extend_vocabulary: bool = False) -> Dict[int, float]:
+        weighted: Dict[int, float] = {}
+        for term, tf in _tf_weights(tokenize(text)).items():
+            term_id = self.terms.get(term)
+            if term_id is None:
+                if not extend_vocabulary:
+                    continue
+                term_id = self.terms[term] = len(self.terms)
+            idf = float(self.idf[term_id]) if term_id < len(self.idf) else self.default_idf
+            weighted[term_id] = tf * idf
+        norm = math.sqrt(sum(weight * weight for weight in weighted.values())) or 1.0
+        return {term_id: weight / norm for term_id, weight in weighted.items()}
+
+    def upsert(self, verse_id: str, english: str, explanation: str, is_active: bool = True, session_factory=None):
+        """Apply an admin create/update without rebuilding the base index"""
+        self._record(verse_id, (english, explanation) if is_active else None)
+        if len(self.delta) > VERSE_INDEX_DELTA_LIMIT and session_factory is not None:
+            self.rebuild_in_background(session_factory)
+
+    def remove(self, verse_id: str):
+        self._record(verse_id, None)
+
+    def _record(self, verse_id: str, text: Optional[Tuple[str, str]]):
+        if not self.available:
+            return
+        with self._lock:
+            self._edits.append((time.monotonic(), verse_id, text))
+            self._apply(verse_id, text)
+
+    def _apply(self, verse_id: str, text: Optional[Tuple[str, str]]):
+        row = self.rows.get(verse_id)
+        if row is not None:
+            self.alive[row] = False
+        self.delta.pop(verse_id, None)
+        if text is not None:
+            self.delta[verse_id] = self._vectorize(verse_text(*text), extend_vocabulary=True)
+
+    # ----------------------------------------------------------------- query
+
+    def search(self, text: str, k: int = 3, min_score: float = 0.1) -> List[Tuple[str, float]]:
+        """Top-k (verse_id, cosine similarity) for free text"""
+        if not self.available:
+            return []
+        self._reload_if_stale()
+        with self._lock:
+            query = self._vectorize(text)
+            if not query:
+                return []
+            base_terms = [(term_id, weight) for term_id, weight in query.items() if term_id < len(self.idf)]
+            results: List[Tuple[str, float]] = []
+            if base_terms:
+                slices_docs = []
+                slices_weights = []
+                for term_id, weight in base_terms:
+                    start, end = int(self.indptr[term_id]), int(self.indptr[term_id + 1])
+                    slices_docs.append(self.docs[start:end])
+                    slices_weights.append(self.weights[start:end] * weight)
+                scores = np.bincount(np.concatenate(slices_docs), weights=np.concatenate(slices_weights),
+                                     minlength=len(self.verse_ids))
+                scores[~self.alive] = 0.0
+                top = min(k, len(scores))
+                candidates = np.argpartition(-scores, top - 1)[:top] if top else []
+                results = [(self.verse_ids[row], float(scores[row])) for row in candidates]
+            for verse_id, vector in self.delta.items():
+                score = sum(weight * vector.get(term_id, 0.0) for term_id, weight in query.items())
+                results.append((verse_id, score))
+        results = [item for item in results if item[1] >= min_score]
+        results.sort(key=lambda item: item[1], reverse=True)
+        return results[:k]
+
+
+verse_index = VerseIndex()
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ("build", "query"):
+        print("Usage: python -m backend.verse_index build | query <text>")
+        sys.exit(1)
+    from .database import SessionLocal
+    if sys.argv[1] == "build":
+        verse_index.build_from_db(SessionLocal)
+        return
+    if not verse_index.load():
+        print("No verse index found; run the build command first")
+        sys.exit(1)
+    start = time.perf_counter()
+    results = verse_index.search(" ".join(sys.argv[2:]), k=5)
+    elapsed = (time.perf_counter() - start) * 1000
+    for verse_id, score in results:
+        print(f"{score:.3f}  {verse_id}")
+    print(f"{elapsed:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
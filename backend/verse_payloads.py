@@ -0,0 +1,48 @@
+"""
+Per-language verse payloads
+
+Verse endpoints accept `lang` (sanskrit, hindi or english) and/or `fields`
+(a comma-separated subset of sanskrit, hindi, english, explanation) so a
+client showing one language downloads only that text. Serialized payloads are
+cached per (verse or list, field selection) in a ResponseCache, so repeat
+requests skip the query, the ORM, serialization and compression. Admin edits
+invalidate the cache; entries also expire after VERSE_PAYLOAD_CACHE_TTL
+seconds so other workers catch up.
+"""
+import os
+from typing import Optional, Tuple
+
+from .response_cache import ResponseCache
+
+VERSE_PAYLOAD_CACHE_SIZE = int(os.getenv("VERSE_PAYLOAD_CACHE_SIZE", "5000"))
+VERSE_PAYLOAD_CACHE_TTL = float(os.getenv("VERSE_PAYLOAD_CACHE_TTL", "300"))
+
+TEXT_FIELDS = ("sanskrit", "hindi", "english", "explanation")
+LANGUAGES = ("sanskrit", "hindi", "english")
+VERSE_FIELDS = ("id", "emotion_id", "chapter", "verse_number", "is_active", "created_at")
+SUMMARY_FIELDS = ("id", "emotion_id", "chapter", "verse_number", "is_active")
+
+
+def select_fields(lang: Optional[str], fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Requested text fields in canonical order, or None for the endpoint's default; ValueError if unknown"""
+    if not lang and not fields:
+        return None
+    wanted = {name.strip().lower() for name in (fields or "").split(",") if name.strip()}
+    if lang:
+        if lang.lower() not in LANGUAGES:
+            raise ValueError(f"Unknown language '{lang}'. Available: {', '.join(LANGUAGES)}")
+        wanted.add(lang.lower())
+    unknown = wanted - set(TEXT_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}. Available: {', '.join(TEXT_FIELDS)}")
+    return tuple(name for name in TEXT_FIELDS if name in wanted)
+
+
+def verse_payload(verse, text_fields: Tuple[str, ...], base_fields: Tuple[str, ...] = VERSE_FIELDS) -> dict:
+    payload = {name: getattr(verse, name) for name in base_fields}
+    for name in text_fields:
+        payload[name] = getattr(verse, name)
+    return payload
+
+
+verse_payloads = ResponseCache("verse_payloads", VERSE_PAYLOAD_CACHE_SIZE, VERSE_PAYLOAD_CACHE_TTL)
@@ -0,0 +1,49 @@
+"""
+Non-repeating verse order for Krishna Path sessions
+
+Drawing a random verse is memoryless, so a user returning to an emotion often
+gets one they have just seen. Instead, each (session_id, emotion) pair walks
+its own shuffled order of the emotion's verses: the client keeps a cursor
+and sends it back, and the server maps the cursor to a verse with a keyed
+pseudo-random permutation. Nothing is stored server-side and each draw is
+O(1). After every verse has been shown once the next pass uses a fresh order.
+
+The permutation is a small Feistel network over the next even power of two,
+cycle-walked back into range(size), so it is a true bijection for any size.
+Adding or removing verses changes the order for later draws.
+"""
+import hashlib
+from typing import Sequence
+
+ROUNDS = 4
+
+
+def sequence_key(session_id: str, emotion_id: str, lap: int) -> bytes:
+    return hashlib.blake2b(f"{session_id}\0{emotion_id}\0{lap}".encode("utf-8"), digest_size=16).digest()
+
+
+def _round(key: bytes, round_index: int, value: int) -> int:
+    digest = hashlib.blake2b(value.to_bytes(8, "big"), digest_size=8, key=key, salt=round_index.to_bytes(16, "big"))
+    return int.from_bytes(digest.digest(), "big")
+
+
+def permute(index: int, size: int, key: bytes) -> int:
+    """Position `index` (0 <= index < size) of the permutation of range(size) selected by `key`"""
+    if size <= 1:
+        return 0
+    half_bits = max(1, ((size - 1).bit_length() + 1) // 2)
+    mask = (1 << half_bits) - 1
+    value = index
+    while True:
+        left, right = value >> half_bits, value & mask
+        for round_index in range(ROUNDS):
+            left, right = right, left ^ (_round(key, round_index, right) & mask)
+        value = (left << half_bits) | right
+        if value < size:  # the domain is under 4 * size, so this takes few walks
+            return value
+
+
+def verse_at(verse_ids: Sequence[str], session_id: str, emotion_id: str, cursor: int) -> str:
+    """The verse a session sees at `cursor` in its order for an emotion (verse_ids must be non-empty and stably ordered)"""
+    lap, index = divmod(cursor, len(verse_ids))
+    return verse_ids[permute(index, len(verse_ids), sequence_key(session_id, emotion_id, lap))]
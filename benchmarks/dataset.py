@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Synthetic dataset generator for benchmarks
+
+Seeds users, posts, comments, chat messages, interactions and verses with a
+fixed random seed so that runs are comparable between releases.
+"""
+import argparse
+import os
+import random
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+BENCH_PASSWORD = "benchpass"
+BENCH_ADMIN = "bench_admin"
+
+EMOTIONS = [
+    ("happy", "Happy", "#FFD700"),
+    ("peace", "Peace", "#87CEEB"),
+    ("anxious", "Anxious", "#FFA500"),
+    ("angry", "Angry", "#FF4444"),
+    ("sad", "Sad", "#6495ED"),
+    ("protection", "Protection", "#32CD32"),
+    ("lazy", "Lazy", "#A9A9A9"),
+    ("lonely", "Lonely", "#9370DB"),
+]
+
+WORDS = (
+    "dharma karma yoga peace mind duty action surrender devotion wisdom self soul "
+    "detachment faith courage fear anger desire knowledge truth light path heart"
+).split()
+
+
+@dataclass
+class DatasetSize:
+    users: int = 200
+    posts: int = 1000
+    comments: int = 5000
+    chat_messages: int = 5000
+    interactions: int = 20000
+    verses_per_emotion: int = 50
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def seed_dataset(session_factory, size: DatasetSize, seed: int = 42, password_hash: str = None):
+    """Wipe the benchmark tables and insert a synthetic dataset of the given size"""
+    from backend.models import User, Post, Comment, ChatMessage, Emotion, Verse, Interaction
+
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    if password_hash is None:
+        from backend.main import get_password_hash
+        password_hash = get_password_hash(BENCH_PASSWORD)
+
+    db = session_factory()
+    try:
+        for model in (Interaction, ChatMessage, Comment, Post, Verse, Emotion, User):
+            db.query(model).delete()
+        db.commit()
+
+        def created(days: int = 90) -> datetime:
+            return now - timedelta(seconds=rng.randint(0, days * 86400))
+
+        users = [{
+            "id": _uuid(rng),
+            "username": f"bench_user_{index}",
+            "name": f"Bench User {index}",
+            "password": password_hash,
+            "is_admin": False,
+            "is_active": True,
+            "created_at": created(),
+        } for index in range(size.users)]
+        users.append({
+            "id": _uuid(rng),
+            "username": BENCH_ADMIN,
+            "name": "Bench Admin",
+            "password": password_hash,
+            "is_admin": True,
+            "is_active": True,
+            "created_at": created(),
+        })
+        db.bulk_insert_mappings(User, users)
+        user_ids = [user["id"] for user in users]
+
+        emotions = [{
+            "id": _uuid(rng),
+            "name": name,
+            "display_name": display_name,
+            "color": color,
+            "is_active": True,
+            "created_at": created(),
+        } for name, display_name, color in EMOTIONS]
+        db.bulk_insert_mappings(Emotion, emotions)
+
+        verses = []
+        for emotion in emotions:
+            for index in range(size.verses_per_emotion):
+                verses.append({
+                    "id": _uuid(rng),
+                    "emotion_id": emotion["id"],
+                    "sanskrit": "कर्मण्येवाधिकारस्ते मा फलेषु कदाचन",
+                    "hindi": "तुम्हारा अधिकार केवल कर्म पर है, फल पर नहीं",
+                    "english": _sentence(rng, 20),
+                    "explanation": _sentence(rng, 60),
+                    "chapter": str(rng.randint(1, 18)),
+                    "verse_number": str(index + 1),
+                    "is_active": True,
+                    "created_at": created(),
+                })
+        db.bulk_insert_mappings(Verse, verses)
+
+        posts = [{
+            "id": _uuid(rng),
+            "title": _sentence(rng, 6),
+            "content": _sentence(rng, 80),
+            "author_id": rng.choice(user_ids),
+            "likes": rng.randint(0, 200),
+            "created_at": created(),
+        } for _ in range(size.posts)]
+        db.bulk_insert_mappings(Post, posts)
+        post_ids = [post["id"] for post in posts] or [None]
+
+        if posts:
+            db.bulk_insert_mappings(Comment, [{
+                "id": _uuid(rng),
+                "content": _sentence(rng, 15),
+                "post_id": rng.choice(post_ids),
+                "author_id": rng.choice(user_ids),
+                "created_at": created(),
+            } for _ in range(size.comments)])
+
+        db.bulk_insert_mappings(ChatMessage, [{
+            "id": _uuid(rng),
+            "content": _sentence(rng, 25),
+            "user_id": rng.choice(user_ids),
+            "is_ai_response": bool(index % 2),
+            "created_at": created(),
+        } for index in range(size.chat_messages)])
+
+        db.bulk_insert_mappings(Interaction, [{
+            "id": _uuid(rng),
+            "user_id": rng.choice(user_ids),
+            "emotion_id": verse["emotion_id"],
+            "verse_id": verse["id"],
+            "session_id": str(rng.randint(1, size.users * 5)),
+            "created_at": created(),
+        } for verse in (rng.choice(verses) for _ in range(size.interactions))])
+
+        db.commit()
+        return {
+            "emotion_ids": [emotion["id"] for emotion in emotions],
+            "post_ids": [post["id"] for post in posts],
+            "usernames": [user["username"] for user in users if not user["is_admin"]],
+        }
+    finally:
+        db.close()
+
+
+def add_size_arguments(parser: argparse.ArgumentParser):
+    defaults = DatasetSize()
+    parser.add_argument("--users", type=int, default=defaults.users)
+    parser.add_argument("--posts", type=int, default=defaults.posts)
+    parser.add_argument("--comments", type=int, default=defaults.comments)
+    parser.add_argument("--chat-messages", type=int, default=defaults.chat_messages)
+    parser.add_argument("--interactions", type=int, default=defaults.interactions)
+    parser.add_argument("--verses-per-emotion", type=int, default=defaults.verses_per_emotion)
+    parser.add_argument("--seed", type=int, default=42)
+
+
+def size_from_args(args) -> DatasetSize:
+    return DatasetSize(
+        users=args.users,
+        posts=args.posts,
+        comments=args.comments,
+        chat_messages=args.chat_messages,
+        interactions=args.interactions,
+        verses_per_emotion=args.verses_per_emotion,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed a synthetic Saarthi dataset")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///./bench.db"))
+    add_size_arguments(parser)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url
+    from backend.database import SessionLocal, engine
+    from backend.models import Base
+    Base.metadata.create_all(bind=engine)
+
+    result = seed_dataset(SessionLocal, size_from_args(args), seed=args.seed)
+    print(f"Seeded {len(result['usernames'])} users, {len(result['post_ids'])} posts into {args.database_url}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Load driver for the Saarthi API
+
+Scenarios are shared by the in-process runner (benchmarks/run.py) and the
+standalone HTTP driver in this module, which uses keep-alive connections from
+a thread pool and needs nothing beyond the standard library.
+"""
+import argparse
+import http.client
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from .dataset import BENCH_ADMIN, BENCH_PASSWORD
+
+CHAT_PROMPTS = [
+    "I feel anxious about my exams, what does the Gita say?",
+    "How do I stay calm when someone insults me?",
+    "What is my duty when I feel lost?",
+    "How can I let go of attachment to results?",
+]
+
+
+@dataclass
+class RequestSpec:
+    method: str
+    path: str
+    body: Optional[dict] = None
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class BenchContext:
+    emotion_ids: List[str]
+    user_tokens: List[str]
+    admin_token: str
+    usernames: List[str]
+
+
+def _auth(token: str) -> Dict[str, str]:
+    return {"Authorization": f"Bearer {token}"}
+
+
+SCENARIOS: Dict[str, Callable[[BenchContext, random.Random], RequestSpec]] = {
+    "feed": lambda ctx, rng: RequestSpec("GET", "/api/posts"),
+    "random_verse": lambda ctx, rng: RequestSpec(
+        "GET", f"/api/krishna-path/verses/{rng.choice(ctx.emotion_ids)}/random"),
+    "chat": lambda ctx, rng: RequestSpec(
+        "POST", "/api/chat/messages", {"content": rng.choice(CHAT_PROMPTS)}, _auth(rng.choice(ctx.user_tokens))),
+    "login": lambda ctx, rng: RequestSpec(
+        "POST", "/api/auth/login", {"username": rng.choice(ctx.usernames), "password": BENCH_PASSWORD}),
+    "admin_dashboard": lambda ctx, rng: RequestSpec(
+        "GET", "/api/admin/dashboard", headers=_auth(ctx.admin_token)),
+}
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    latencies: List[float]
+    errors: int
+    elapsed: float
+
+    @property
+    def requests(self) -> int:
+        return len(self.latencies) + self.errors
+
+    def percentile(self, pct: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+        return ordered[rank]
+
+    def summary(self) -> dict:
+        return {
+            "scenario": self.name,
+            "requests": self.requests,
+            "errors": self.errors,
+            "throughput_rps": round(self.requests / self.elapsed, 2) if self.elapsed else 0.0,
+            "p50_ms": round(self.percentile(50) * 1000, 2),
+            "p95_ms": round(self.percentile(95) * 1000, 2),
+            "p99_ms": round(self.percentile(99) * 1000, 2),
+        }
+
+
+def format_report(results: List[ScenarioResult], baseline: Optional[dict] = None) -> str:
+    lines = [f"{'scenario':<18}{'reqs':>7}{'err':>6}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"]
+    for result in results:
+        row = result.summary()
+        line = (f"{row['scenario']:<18}{row['requests']:>7}{row['errors']:>6}{row['throughput_rps']:>10}"
+                f"{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}")
+        previous = (baseline or {}).get(row["scenario"])
+        if previous and previous.get("p95_ms"):
+            change = (row["p95_ms"] - previous["p95_ms"]) / previous["p95_ms"] * 100
+            line += f"   p95 {change:+.1f}% vs baseline"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def write_json(results: List[ScenarioResult], path: str, metadata: dict):
+    payload = {"metadata": metadata, "results": {r.name: r.summary() for r in results}}
+    with open(path, "w") as handle:
+        json.dump(payload, handle, indent=2)
+
+
+def load_baseline(path: Optional[str]) -> Optional[dict]:
+    if not path:
+        return None
+    with open(path) as handle:
+        return json.load(handle)["results"]
+
+
+class HTTPDriver:
+    """Thread-pool load driver against a running server"""
+
+    def __init__(self, base_url: str, concurrency: int = 10, timeout: float = 60.0):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.https = parts.scheme == "https"
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            factory = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            connection = factory(self.host, self.port, timeout=self.timeout)
+            self._local.connection = connection
+        return connection
+
+    def send(self, spec: RequestSpec):
+        body = json.dumps(spec.body).encode() if spec.body is not None else None
+        headers = dict(spec.headers)
+        if body is not None:
+            headers["Content-Type"] = "application/json"
+        connection = self._connection()
+        try:
+            connection.request(spec.method, spec.path, body=body, headers=headers)
+            response = connection.getresponse()
+            data = response.read()
+        except (http.client.HTTPException, OSError):
+            connection.close()
+            self._local.connection = None
+            raise
+        return response.status, data
+
+    def prepare_context(self, users: int = 20) -> BenchContext:
+        return prepare_context(lambda spec: self.send(spec), users)
+
+    def run(self, name: str, ctx: BenchContext, requests: int, seed: int = 42) -> ScenarioResult:
+        build = SCENARIOS[name]
+        latencies: List[float] = []
+        errors = 0
+        lock = threading.Lock()
+        rngs = [random.Random(seed + index) for index in range(self.concurrency)]
+
+        def worker(index: int, count: int):
+            nonlocal errors
+            rng = rngs[index]
+            for _ in range(count):
+                spec = build(ctx, rng)
+                start = time.perf_counter()
+                try:
+                    status, _ = self.send(spec)
+                    ok = status < 400
+                except (http.client.HTTPException, OSError):
+                    ok = False
+                elapsed = time.perf_counter() - start
+                with lock:
+                    if ok:
+                        latencies.append(elapsed)
+                    else:
+                        errors += 1
+
+        shares = [requests // self.concurrency + (1 if i < requests % self.concurrency else 0)
+                  for i in range(self.concurrency)]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            list(pool.map(worker, range(self.concurrency), shares))
+        return ScenarioResult(name, latencies, errors, time.perf_counter() - start)
+
+
+def prepare_context(send, users: int = 20) -> BenchContext:
+    """Log in benchmark users and look up ids; `send` returns (status, body bytes)"""
+    status, body = send(RequestSpec("GET", "/api/krishna-path/emotions"))
+    if status != 200:
+        raise RuntimeError(f"Could not load emotions ({status}); is the dataset seeded?")
+    emotion_ids = [emotion["id"] for emotion in json.loads(body)]
+
+    def login(username: str) -> str:
+        status, body = send(RequestSpec("POST", "/api/auth/login",
+                                        {"username": username, "password": BENCH_PASSWORD}))
+        if status != 200:
+            raise RuntimeError(f"Login failed for {username} ({status})")
+        return json.loads(body)["access_token"]
+
+    usernames = [f"bench_user_{index}" for index in range(users)]
+    return BenchContext(
+        emotion_ids=emotion_ids,
+        user_tokens=[login(username) for username in usernames],
+        admin_token=login(BENCH_ADMIN),
+        usernames=usernames,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Standalone HTTP load driver for a running Saarthi server")
+    parser.add_argument("--url", default="http://localhost:5000")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=500, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--login-users", type=int, default=20)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="baseline results file to compare against")
+    args = parser.parse_args()
+
+    driver = HTTPDriver(args.url, concurrency=args.concurrency)
+    ctx = driver.prepare_context(args.login_users)
+    results = [driver.run(name, ctx, args.requests) for name in args.scenarios.split(",")]
+    print(format_report(results, load_baseline(args.compare)))
+    if args.json:
+        write_json(results, args.json, {"mode": "http", "url": args.url, "concurrency": args.concurrency})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+In-process benchmark runner
+
+Seeds a synthetic dataset into a scratch SQLite database (or DATABASE_URL),
+switches the app to the deterministic local LLM provider and drives the
+FastAPI app through an in-process ASGI client. Usage:
+
+    python -m benchmarks.run --requests 300 --concurrency 10 --json bench.json
+    python -m benchmarks.run --compare bench.json
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+from .dataset import add_size_arguments, size_from_args
+from .load import (SCENARIOS, ScenarioResult, format_report, load_baseline,
+                   prepare_context, write_json)
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+async def run_scenario(client, name: str, ctx, requests: int, concurrency: int, seed: int) -> ScenarioResult:
+    build = SCENARIOS[name]
+    latencies: List[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker(rng: random.Random):
+        nonlocal errors, remaining
+        while remaining > 0:
+            remaining -= 1
+            spec = build(ctx, rng)
+            start = time.perf_counter()
+            response = await client.request(spec.method, spec.path, spec.body, spec.headers)
+            elapsed = time.perf_counter() - start
+            if response.status < 400:
+                latencies.append(elapsed)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(random.Random(seed + index)) for index in range(concurrency)))
+    return ScenarioResult(name, latencies, errors, time.perf_counter() - start)
+
+
+async def run(args) -> List[ScenarioResult]:
+    # The backend reads its configuration at import time
+    os.environ["DATABASE_URL"] = args.database_url
+    if not args.with_rate_limits:
+        os.environ["RATE_LIMIT_ENABLED"] = "false"
+    # Full chat pipeline (prompting, retries, breaker, fallback) against the offline provider
+    os.environ["LLM_PROVIDER"] = "local"
+    os.environ["LOCAL_LLM_LATENCY"] = str(args.llm_latency)
+    os.environ["LOCAL_LLM_JITTER"] = str(args.llm_jitter)
+    os.environ["LOCAL_LLM_ERROR_RATE"] = str(args.llm_error_rate)
+    os.environ["LOCAL_LLM_SEED"] = str(args.seed)
+    os.environ["DAILY_WISDOM_ENABLED"] = "false"
+    os.environ["RETENTION_ENABLED"] = "false"
+    os.environ.setdefault("VERSE_INDEX_DIR", str(ROOT / "data" / "bench_verse_index"))
+    sys.path.insert(0, str(ROOT / "backend"))
+
+    from backend.main import app
+    from backend.database import SessionLocal
+    from .asgi_client import ASGIClient
+    from backend.verse_index import verse_index
+    from .dataset import seed_dataset
+
+    started = time.perf_counter()
+    seed_dataset(SessionLocal, size_from_args(args), seed=args.seed)
+    print(f"Seeded dataset in {time.perf_counter() - started:.1f}s")
+    verse_index.build_from_db(SessionLocal)
+
+    async with ASGIClient(app) as client:
+        async def send(spec):
+            response = await client.request(spec.method, spec.path, spec.body, spec.headers)
+            return response.status, response.body
+
+        # prepare_context is synchronous; run it in a worker thread that bridges back onto this loop
+        ctx = await _prepare(send, args.login_users)
+        results = []
+        for name in args.scenarios.split(","):
+            for _ in range(args.warmup):
+                spec = SCENARIOS[name](ctx, random.Random(args.seed))
+                await send(spec)
+            results.append(await run_scenario(client, name, ctx, args.requests, args.concurrency, args.seed))
+        return results
+
+
+async def _prepare(send, users: int):
+    loop = asyncio.get_running_loop()
+
+    def blocking_send(spec):
+        return asyncio.run_coroutine_threadsafe(send(spec), loop).result()
+
+    return await loop.run_in_executor(None, prepare_context, blocking_send, users)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark core Saarthi API flows in-process")
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL", "sqlite:///./bench.db"))
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=300, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--login-users", type=int, default=20)
+    parser.add_argument("--llm-latency", type=float, default=0.8, help="local LLM provider latency in seconds")
+    parser.add_argument("--llm-jitter", type=float, default=0.2)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--with-rate-limits", action="store_true",
+                        help="keep chat admission control enabled (off by default to measure raw throughput)")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="baseline results file to compare against")
+    add_size_arguments(parser)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print(format_report(results, load_baseline(args.compare)))
+    if args.json:
+        write_json(results, args.json, {
+            "mode": "in-process",
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "dataset": vars(size_from_args(args)),
+            "llm_latency": args.llm_latency,
+        })
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useRef } from "react";
+import React, { useState, useEffect, useMemo, useRef } from "react";
 import { useQuery, useMutation } from "@tanstack/react-query";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
@@ -21,18 +21,67 @@ const safeFormatDate = (dateString: string, formatStr: string) => {
   }
 };
 
+interface ChatPage {
+  messages: ChatMessageWithUser[];
+  nextBefore: string | null;
+}
+
+// The API returns the newest page (oldest first) and an X-Next-Before cursor when older messages exist
+const fetchChatPage = async (before?: string): Promise<ChatPage> => {
+  const url = before ? `/api/chat/messages?before=${encodeURIComponent(before)}` : "/api/chat/messages";
+  const res = await apiRequest("GET", url);
+  return { messages: await res.json(), nextBefore: res.headers.get("X-Next-Before") };
+};
+
+const mergeMessages = (...lists: ChatMessageWithUser[][]) => {
+  const byId = new Map<string, ChatMessageWithUser>();
+  for (const list of lists) {
+    for (const msg of list) byId.set(msg.id, msg);
+  }
+  return Array.from(byId.values()).sort((a, b) =>
+    new Date(a.created_at).getTime() - new Date(b.created_at).getTime() || a.id.localeCompare(b.id)
+  );
+};
+
 export function ChatInterface() {
   const { user } = useAuth();
   const [message, setMessage] = useState("");
   const messagesEndRef = useRef<HTMLDivElement>(null);
+  // Every message seen so far, so earlier pages stay contiguous as the polled newest page moves on
+  const [history, setHistory] = useState<ChatMessageWithUser[]>([]);
+  const [nextBefore, setNextBefore] = useState<string | null | undefined>(undefined);
+  const [loadingEarlier, setLoadingEarlier] = useState(false);
 
-  const { data: messages = [], isLoading } = useQuery<ChatMessageWithUser[]>({
+  const { data: latest, isLoading } = useQuery<ChatPage>({
     queryKey: ["/api/chat/messages"],
+    queryFn: () => fetchChatPage(),
     enabled: !!user,
     refetchInterval: 2000, // Poll every 2 seconds for real-time updates
     refetchIntervalInBackground: true, // Continue polling even when window is not focused
   });
 
+  useEffect(() => {
+    if (!latest) return;
+    setHistory((previous) => mergeMessages(previous, latest.messages));
+    setNextBefore((previous) => (previous === undefined ? latest.nextBefore : previous));
+  }, [latest]);
+
+  const messages = useMemo(() => mergeMessages(history, latest?.messages ?? []), [history, latest]);
+
+  const loadEarlier = async () => {
+    if (!nextBefore) return;
+    setLoadingEarlier(true);
+    try {
+      const page = await fetchChatPage(nextBefore);
+      setHistory((previous) => mergeMessages(page.messages, previous));
+      setNextBefore(page.nextBefore);
+    } catch (error) {
+      console.error("Error loading earlier messages:", error);
+    } finally {
+      setLoadingEarlier(false);
+    }
+  };
+
   const sendMessageMutation = useMutation({
     mutationFn: async (content: string) => {
       const res = await apiRequest("POST", "/api/chat/messages", { content });
@@ -58,9 +107,11 @@ export function ChatInterface() {
     }
   };
 
+  // Follow new messages, but stay put when earlier ones are prepended
+  const newestId = messages[messages.length - 1]?.id;
   useEffect(() => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
-  }, [messages]);
+  }, [newestId]);
 
   const getInitials = (name: string) => {
     return name
@@ -114,7 +165,22 @@ export function ChatInterface() {
             </div>
           </div>
         ) : (
-          messages.map((msg: ChatMessageWithUser, index) => (
+          <>
+          {nextBefore && (
+            <div className="flex justify-center">
+              <Button
+                variant="ghost"
+                size="sm"
+                onClick={loadEarlier}
+                disabled={loadingEarlier}
+                className="text-xs sm:text-sm text-gray-500"
+                data-testid="button-load-earlier"
+              >
+                {loadingEarlier ? <Loader2 className="h-4 w-4 animate-spin" /> : "Load earlier messages"}
+              </Button>
+            </div>
+          )}
+          {messages.map((msg: ChatMessageWithUser, index) => (
             <div
               key={msg.id}
               className={`flex flex-col space-y-1 sm:space-y-2 mb-4 sm:mb-6 ${
@@ -136,7 +202,8 @@ export function ChatInterface() {
                 </p>
               </div>
             </div>
-          ))
+          ))}
+          </>
         )}
         {sendMessageMutation.isPending && (
           <div className="flex flex-col space-y-1 sm:space-y-2 mb-4 sm:mb-6 items-start">
@@ -9,6 +9,7 @@ import { Textarea } from "@/components/ui/textarea";
 import { Label } from "@/components/ui/label";
 import { Heart, MessageCircle, Share, Plus, Loader2, Upload, Image, Video, X } from "lucide-react";
 import { useAuth } from "@/hooks/use-auth";
+import { useFeed } from "@/hooks/use-feed";
 import { apiRequest, queryClient } from "@/lib/queryClient";
 import { type PostWithAuthor, insertPostSchema, InsertPost } from "@/types/api";
 import { formatDistanceToNow, isValid } from "date-fns";
@@ -39,9 +40,11 @@ export function CommunitySection() {
   const [imagePreview, setImagePreview] = useState<string>("");
   const [videoPreview, setVideoPreview] = useState<string>("");
 
+  const feedConnected = useFeed();
+
   const { data: posts = [], isLoading } = useQuery<PostWithAuthor[]>({
     queryKey: ["/api/posts"],
-    refetchInterval: 5000, // Poll every 5 seconds for real-time updates
+    refetchInterval: feedConnected ? false : 30000, // Live updates arrive over the feed socket; poll only while it is down
     refetchIntervalInBackground: true, // Continue polling even when window is not focused
     staleTime: 2000, // Consider data stale after 2 seconds
   });
@@ -80,7 +83,10 @@ export function CommunitySection() {
       await apiRequest("POST", `/api/posts/${postId}/like`);
     },
     onSuccess: () => {
-      queryClient.invalidateQueries({ queryKey: ["/api/posts"] });
+      // The feed socket delivers the like delta; refetching as well would count it twice
+      if (!feedConnected) {
+        queryClient.invalidateQueries({ queryKey: ["/api/posts"] });
+      }
     },
   });
 
@@ -72,6 +72,16 @@ const getEmotionCardStyle = (emotionColor: string) => {
   };
 };
 
+// Each browser session walks its own non-repeating order of verses per emotion
+const getSessionId = () => {
+  let sessionId = sessionStorage.getItem("krishna-path-session");
+  if (!sessionId) {
+    sessionId = `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+    sessionStorage.setItem("krishna-path-session", sessionId);
+  }
+  return sessionId;
+};
+
 export function KrishnaPathJourney() {
   const [currentStep, setCurrentStep] = useState<JourneyStep>("welcome");
   const [selectedEmotion, setSelectedEmotion] = useState<Emotion | null>(null);
@@ -104,9 +114,16 @@ export function KrishnaPathJourney() {
     }
   });
 
-  // Fetch random verse for selected emotion
+  // Fetch the session's next verse for selected emotion
   const getRandomVerse = async (emotionId: string): Promise<Verse> => {
-    const response = await apiRequest('GET', `/api/krishna-path/verses/${emotionId}/random`);
+    const cursorKey = `krishna-path-cursor:${emotionId}`;
+    const cursor = sessionStorage.getItem(cursorKey) || "0";
+    const response = await apiRequest(
+      'GET',
+      `/api/krishna-path/verses/${emotionId}/random?session_id=${encodeURIComponent(getSessionId())}&cursor=${cursor}`
+    );
+    const nextCursor = response.headers.get("X-Verse-Cursor");
+    if (nextCursor) sessionStorage.setItem(cursorKey, nextCursor);
     return response.json();
   };
 
@@ -126,7 +143,7 @@ export function KrishnaPathJourney() {
       await trackInteraction.mutateAsync({
         emotion_id: selectedEmotion.id,
         verse_id: verse.id,
-        session_id: Date.now().toString()
+        session_id: getSessionId()
       });
       
       setCurrentStep("verse-display");
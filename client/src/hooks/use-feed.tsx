@@ -0,0 +1,101 @@
+import { useEffect, useState } from "react";
+import { queryClient } from "@/lib/queryClient";
+import type { CommentWithAuthor, PostWithAuthor } from "@/types/api";
+
+interface FeedBatch {
+  type: "batch";
+  posts: PostWithAuthor[];
+  comments: CommentWithAuthor[];
+  likes: Record<string, number>;
+  deleted_posts: string[];
+}
+
+type FeedMessage = FeedBatch | { type: "resync" } | { type: "ping" };
+
+const MAX_RECONNECT_DELAY = 30000;
+
+function applyBatch(batch: FeedBatch) {
+  const deleted = new Set(batch.deleted_posts);
+  const newComments: Record<string, number> = {};
+  for (const comment of batch.comments) {
+    newComments[comment.post_id] = (newComments[comment.post_id] || 0) + 1;
+  }
+
+  queryClient.setQueryData<PostWithAuthor[]>(["/api/posts"], (posts) => {
+    if (!posts) return posts;
+    const known = new Set(posts.map((post) => post.id));
+    // Batches list posts oldest first; the feed is newest first
+    const added = batch.posts.filter((post) => !known.has(post.id)).reverse();
+    return [...added, ...posts]
+      .filter((post) => !deleted.has(post.id))
+      .map((post) =>
+        batch.likes[post.id] || newComments[post.id]
+          ? {
+              ...post,
+              likes: post.likes + (batch.likes[post.id] || 0),
+              comments: post.comments + (newComments[post.id] || 0),
+            }
+          : post,
+      );
+  });
+
+  for (const comment of batch.comments) {
+    queryClient.setQueryData<CommentWithAuthor[]>(["/api/posts", comment.post_id, "comments"], (comments) =>
+      comments && !comments.some((item) => item.id === comment.id) ? [...comments, comment] : comments,
+    );
+  }
+}
+
+/**
+ * Live community feed over WebSocket. Applies new posts, comments and like
+ * deltas to the react-query cache, and refetches after reconnecting so nothing
+ * missed while offline is lost. Returns whether the socket is connected, so
+ * callers can fall back to polling.
+ */
+export function useFeed() {
+  const [connected, setConnected] = useState(false);
+
+  useEffect(() => {
+    let socket: WebSocket | null = null;
+    let reconnectTimer: ReturnType<typeof setTimeout> | undefined;
+    let delay = 1000;
+    let stopped = false;
+
+    const connect = () => {
+      const protocol = window.location.protocol === "https:" ? "wss" : "ws";
+      socket = new WebSocket(`${protocol}://${window.location.host}/api/feed/ws`);
+
+      socket.onopen = () => {
+        delay = 1000;
+        setConnected(true);
+        queryClient.invalidateQueries({ queryKey: ["/api/posts"] });
+      };
+
+      socket.onmessage = (event) => {
+        const message: FeedMessage = JSON.parse(event.data);
+        if (message.type === "batch") {
+          applyBatch(message);
+        } else if (message.type === "resync") {
+          queryClient.invalidateQueries({ queryKey: ["/api/posts"] });
+        }
+      };
+
+      socket.onclose = () => {
+        setConnected(false);
+        if (!stopped) {
+          reconnectTimer = setTimeout(connect, delay);
+          delay = Math.min(delay * 2, MAX_RECONNECT_DELAY);
+        }
+      };
+    };
+
+    connect();
+    return () => {
+      stopped = true;
+      clearTimeout(reconnectTimer);
+      socket?.close();
+    };
+  }, []);
+
+  return connected;
+}
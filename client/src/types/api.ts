@@ -11,6 +11,12 @@ export interface User {
   created_at: string;
 }
 
+export interface Author {
+  id: string;
+  username: string;
+  name: string;
+}
+
 export interface InsertUser {
   username: string;
   name: string;
@@ -29,7 +35,7 @@ export interface Post {
 }
 
 export interface PostWithAuthor extends Post {
-  author: User;
+  author: Author;
   comments: number;
 }
 
@@ -49,7 +55,7 @@ export interface Comment {
 }
 
 export interface CommentWithAuthor extends Comment {
-  author: User;
+  author: Author;
 }
 
 export interface InsertComment {
@@ -0,0 +1,131 @@
+"""
+Query budgets of the read endpoints, enforced with QUERY_BUDGET_MODE=raise
+
+Runs the app against a scratch SQLite database seeded with the benchmark
+dataset (several rows per parent, so an N+1 shows up as extra statements).
+A route that goes over its @query_budget answers 500 and fails here.
+
+    python -m pytest -q tests
+"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(scope="module")
+def app_client(tmp_path_factory):
+    scratch = tmp_path_factory.mktemp("query_budget")
+    # The backend reads its configuration at import time
+    os.environ["DATABASE_URL"] = f"sqlite:///{scratch / 'saarthi.db'}"
+    os.environ["QUERY_BUDGET_MODE"] = "raise"
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    os.environ["LLM_PROVIDER"] = "local"
+    os.environ["DAILY_WISDOM_ENABLED"] = "false"
+    os.environ["RETENTION_ENABLED"] = "false"
+    os.environ["RECOMMENDATIONS_ENABLED"] = "false"
+    os.environ["VERSE_INDEX_DIR"] = str(scratch / "verse_index")
+    os.environ["CHAT_WRITE_JOURNAL_DIR"] = str(scratch / "chat_journal")
+    sys.path.insert(0, str(ROOT / "backend"))
+
+    from fastapi.testclient import TestClient
+    from backend.main import app
+    from backend.database import SessionLocal
+    from benchmarks.dataset import BENCH_ADMIN, BENCH_PASSWORD, DatasetSize, seed_dataset
+
+    with TestClient(app) as client:
+        size = DatasetSize(users=20, posts=30, comments=120, chat_messages=60,
+                           interactions=200, verses_per_emotion=5)
+        dataset = seed_dataset(SessionLocal, size)
+
+        def login(username):
+            response = client.post("/api/auth/login", json={"username": username, "password": BENCH_PASSWORD})
+            assert response.status_code == 200, response.text
+            return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        client.dataset = dataset
+        client.user_headers = login(dataset["usernames"][0])
+        client.admin_headers = login(BENCH_ADMIN)
+        yield client
+
+
+def assert_within_budget(response):
+    assert response.status_code == 200, response.text
+    assert "x-query-count" in response.headers
+
+
+def test_feed(app_client):
+    assert_within_budget(app_client.get("/api/posts"))
+
+
+def test_post_comments(app_client):
+    post_id = app_client.dataset["post_ids"][0]
+    assert_within_budget(app_client.get(f"/api/posts/{post_id}/comments"))
+
+
+def test_chat_history(app_client):
+    assert_within_budget(app_client.get("/api/chat/messages", headers=app_client.user_headers))
+
+
+@pytest.mark.parametrize("path", [
+    "/api/admin/dashboard",
+    "/api/admin/users",
+    "/api/admin/posts",
+    "/api/admin/comments",
+    "/api/admin/chat-messages",
+    "/api/krishna-path/admin/verses",
+])
+def test_admin_lists(app_client, path):
+    assert_within_budget(app_client.get(path, headers=app_client.admin_headers))
+
+
+def test_verses(app_client):
+    emotion_id = app_client.dataset["emotion_ids"][0]
+    verses = app_client.get(f"/api/krishna-path/verses/{emotion_id}")
+    assert_within_budget(verses)
+    assert_within_budget(app_client.get(f"/api/krishna-path/verse/{verses.json()[0]['id']}"))
+    assert_within_budget(app_client.get(f"/api/krishna-path/verses/{emotion_id}/random"))
+    assert_within_budget(app_client.get(f"/api/krishna-path/verses/{emotion_id}/random",
+                                        params={"session_id": "budget-test", "cursor": 0}))
+
+
+def test_emotions_and_scriptures(app_client):
+    assert_within_budget(app_client.get("/api/krishna-path/emotions"))
+    assert_within_budget(app_client.get("/api/scriptures"))
+
+
+def test_budget_overrun_fails(app_client):
+    """The detector itself: an N+1 loop over posts goes over a budget of 1 and answers 500"""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from backend.database import SessionLocal
+    from backend.models import Post, User
+    from backend.query_budget import QueryBudgetMiddleware, count_queries, duplicate_shapes, query_budget
+
+    app = FastAPI()
+    app.add_middleware(QueryBudgetMiddleware, mode="raise")
+
+    def load_authors():
+        db = SessionLocal()
+        try:
+            return [db.query(User).filter(User.id == post.author_id).first().username
+                    for post in db.query(Post).limit(5).all()]
+        finally:
+            db.close()
+
+    @app.get("/n-plus-one")
+    @query_budget(1)
+    def n_plus_one():
+        return load_authors()
+
+    response = TestClient(app).get("/n-plus-one")
+    assert response.status_code == 500
+    assert response.json()["duplicates"][0]["count"] == 5
+
+    with count_queries() as statements:
+        load_authors()
+    assert len(statements) == 6
+    assert duplicate_shapes(statements)[0][1] == 5